@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Benchmark of the request logging middleware.
+
+Compares the requests per second of the previous `BaseHTTPMiddleware`
+implementation of the `LoggerMiddleware` with the pure ASGI one, on the
+health check route and on the Users list route backed by an in-memory
+SQLite database, through an in-process ASGI transport.
+
+Usage:
+    python -m benchmarks.bench_logger_middleware
+"""
+
+import asyncio
+import logging
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from benchmarks.bench_user_serialization import _user_row
+from src.api.health_check_routes.check_routes import health_check_router
+from src.api.v1_routes import user_routes
+from src.db.config.base import Base
+from src.db.connectors.postgres_db import get_pg_read_db
+from src.db.models.v1_models.users_model import UserModel
+from src.middlewares.logger import LoggerMiddleware
+
+REQUEST_COUNT = 2_000
+ROUTES = {"health check": "/api/utils/health_check",
+          "users list": "/api/v1/users?limit=50"}
+
+logger = logging.getLogger(user_routes.settings.app_logger_name)
+
+
+class BaseHTTPLoggerMiddleware(BaseHTTPMiddleware):
+    """
+    The previous `BaseHTTPMiddleware` implementation of the middleware.
+    """
+
+    async def dispatch(self, request, call_next):
+        logger.info("Request details: %s %s", request.method, request.url)
+        response = await call_next(request)
+        logger.info("Response details: %s", response.status_code)
+        return response
+
+
+def _build_app(middleware_class: type, session_maker) -> FastAPI:
+    """
+    Returns an application with the benchmarked routes and middleware.
+    """
+    async def get_db():
+        async with session_maker() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(health_check_router, prefix="/api/utils/health_check")
+    app.include_router(user_routes.router, prefix="/api/v1/users")
+    app.dependency_overrides[get_pg_read_db] = get_db
+    app.add_middleware(middleware_class)
+    return app
+
+
+async def _requests_per_second(app: FastAPI, path: str) -> float:
+    """
+    Returns the requests per second of sequential requests to a path.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport,
+                                 base_url="http://benchmark") as client:
+        for _ in range(100):
+            await client.get(path)
+
+        start = time.perf_counter()
+        for _ in range(REQUEST_COUNT):
+            response = await client.get(path)
+            assert response.status_code == 200
+        return REQUEST_COUNT / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    """
+    Runs the benchmark and prints the results.
+    """
+    # Log through a handler that drops the records, so the benchmark
+    # measures the middleware and not the log file...
+    logger.handlers = [logging.NullHandler()]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:",
+                                 poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(
+            insert(UserModel), [_user_row(i) for i in range(100)])
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    base_http_app = _build_app(BaseHTTPLoggerMiddleware, session_maker)
+    asgi_app = _build_app(LoggerMiddleware, session_maker)
+
+    print(f"Sequential requests per second, {REQUEST_COUNT} requests:")
+    for name, path in ROUTES.items():
+        base_http_rps = await _requests_per_second(base_http_app, path)
+        asgi_rps = await _requests_per_second(asgi_app, path)
+        print(f"  {name}:")
+        print(f"    BaseHTTPMiddleware: {base_http_rps:8.0f} req/s")
+        print(f"    Pure ASGI:          {asgi_rps:8.0f} req/s")
+        print(f"    Speed-up:           {asgi_rps / base_http_rps:8.2f}x")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Benchmark of the authentication cost per request.
+
+Compares the time `get_api_key` spends authenticating a request with:
+
+- an API key looked up in an in-memory SQLite database on every request,
+  which is the cost of every cache miss,
+- an API key found in the cache of API keys,
+- an access token verified from scratch, i.e. the first request of a token
+  in a worker,
+- an access token found in the cache of verified tokens.
+
+Usage:
+    python -m benchmarks.bench_token_verification
+"""
+
+import asyncio
+import secrets
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.core import auth
+from src.db.config.base import Base
+from src.db.models.v1_models.applications_model import ApplicationModel
+
+ROUNDS = 20_000
+API_KEY = "benchmark_api_key"
+
+
+async def _microseconds_per_call(authenticate) -> float:
+    """
+    Returns the microseconds per call of an authentication coroutine.
+    """
+    for _ in range(100):
+        await authenticate()
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await authenticate()
+    return (time.perf_counter() - start) / ROUNDS * 1_000_000
+
+
+async def main() -> None:
+    """
+    Runs the benchmark and prints the results.
+    """
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:",
+                                 poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(insert(ApplicationModel).values(
+            id="benchmark", name="benchmark",
+            api_key=auth.hash_api_key(API_KEY)))
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    if not auth.access_tokens_enabled():
+        auth.settings.app_jwt_secret_key = secrets.token_urlsafe(32)
+
+    async def with_api_key():
+        await auth.get_api_key(None, None, API_KEY, session_maker)
+
+    async def with_uncached_api_key():
+        auth.api_key_cache.clear()
+        await with_api_key()
+
+    application = await auth.authenticate_api_key(None, API_KEY,
+                                                  session_maker)
+    access_token = auth.create_access_token(application)
+    credentials = auth.HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=access_token)
+
+    async def with_access_token():
+        await auth.get_api_key(credentials, None, None, session_maker)
+
+    async def with_uncached_access_token():
+        auth.access_token_cache.clear()
+        await with_access_token()
+
+    print(f"Authentication cost per request, {ROUNDS} requests:")
+    for name, authenticate in (
+            ("API key, database lookup", with_uncached_api_key),
+            ("API key, cached", with_api_key),
+            ("Access token, verified", with_uncached_access_token),
+            ("Access token, cached", with_access_token)):
+        print(f"  {name + ':':26} "
+              f"{await _microseconds_per_call(authenticate):8.2f} us")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
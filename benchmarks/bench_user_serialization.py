@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Benchmark of the read side serialization of User list responses.
+
+Compares the per-row Pydantic path, `UserOutput.model_validate(user)
+.model_dump()` on ORM instances, with the row to dict fast path used by the
+User routes, on a 10k row response read from an in-memory SQLite database.
+
+Usage:
+    python -m benchmarks.bench_user_serialization
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import orjson
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.api.v1_routes.user_routes import USER_OUTPUT_FIELDS, \
+    _rows_to_dicts, _select_user_fields
+from src.db.config.base import Base
+from src.db.models.v1_models.users_model import UserModel
+from src.db.schemas.v1_schemas.user_schemas import UserOutput
+
+ROW_COUNT = 10_000
+ROUNDS = 5
+
+
+def _user_row(index: int) -> dict:
+    """
+    Returns a User row for the benchmark table.
+    """
+    now = datetime.utcnow()
+    return {
+        "id": f"{index:025d}", "username": f"user_{index}",
+        "email": f"user_{index}@example.com", "password": "a_password",
+        "first_name": "First", "last_name": "Last",
+        "phone_number": "0123456789", "address": "Street 1", "city": "City",
+        "state": "State", "country": "Country", "zip_code": "12345",
+        "is_active": True, "is_superuser": False, "created_at": now,
+        "updated_at": now, "deleted_at": None,
+    }
+
+
+async def _best_of(session, build_body) -> float:
+    """
+    Returns the best wall time in milliseconds of a query + serialization.
+    """
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        body = await build_body(session)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert len(orjson.loads(body)) == ROW_COUNT
+    return min(timings)
+
+
+async def _pydantic_path(session) -> bytes:
+    """
+    Serializes the Users through the per-row Pydantic validation.
+    """
+    result = await session.execute(
+        select(UserModel).filter(UserModel.deleted_at.is_(None)))
+    return orjson.dumps([UserOutput.model_validate(user).model_dump()
+                         for user in result.scalars().all()])
+
+
+async def _fast_path(session) -> bytes:
+    """
+    Serializes the Users through the row to dict fast path.
+    """
+    result = await session.execute(_select_user_fields(USER_OUTPUT_FIELDS))
+    return orjson.dumps(_rows_to_dicts(result.all(), USER_OUTPUT_FIELDS))
+
+
+async def main() -> None:
+    """
+    Runs the benchmark and prints the results.
+    """
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(
+            insert(UserModel), [_user_row(i) for i in range(ROW_COUNT)])
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        pydantic_ms = await _best_of(session, _pydantic_path)
+        session.expunge_all()
+        fast_ms = await _best_of(session, _fast_path)
+    await engine.dispose()
+
+    print(f"Users list response of {ROW_COUNT} rows, best of {ROUNDS}:")
+    print(f"  Pydantic per-row path: {pydantic_ms:8.1f} ms")
+    print(f"  Row to dict fast path: {fast_ms:8.1f} ms")
+    print(f"  Speed-up:              {pydantic_ms / fast_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
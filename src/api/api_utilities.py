@@ -4,11 +4,20 @@
 
 """
 Utility routes for the FastAPI application.
+
+The health checks are public. The metrics and traces expose the requests
+and SQL of every application, so they also require the admin key, see
+`get_admin_api_key`.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from src.api.health_check_routes import check_routes
+from src.api.metrics_routes import metrics_routes
+from src.api.trace_routes import trace_routes
+from src.core.auth import get_admin_api_key, get_api_key
+from src.core.rate_limit import rate_limit_by_api_key, \
+    rate_limit_by_ip, rate_limit_failed_auth_by_ip
 
 api_utility_router = APIRouter(
     prefix="/api/utils",
@@ -21,5 +30,24 @@ api_utility_router = APIRouter(
 api_utility_router.include_router(
     check_routes.health_check_router,
     prefix="/health_check",
-    tags=["health"]
+    tags=["health"],
+    dependencies=[Depends(rate_limit_by_ip)]
+)
+
+api_utility_router.include_router(
+    metrics_routes.metrics_router,
+    prefix="/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(rate_limit_failed_auth_by_ip),
+                  Depends(get_api_key), Depends(get_admin_api_key),
+                  Depends(rate_limit_by_api_key)]
+)
+
+api_utility_router.include_router(
+    trace_routes.trace_router,
+    prefix="/traces",
+    tags=["tracing"],
+    dependencies=[Depends(rate_limit_failed_auth_by_ip),
+                  Depends(get_api_key), Depends(get_admin_api_key),
+                  Depends(rate_limit_by_api_key)]
 )
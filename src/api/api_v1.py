@@ -11,9 +11,10 @@ is included in the main FastAPI application instance in the src/main.py
 module.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from src.api.v1_routes import user_routes
+from src.api.v1_routes import application_routes, auth_routes, user_routes
+from src.core.auth import get_admin_api_key
 
 api_v1_router = APIRouter(
     prefix="/api/v1",
@@ -28,3 +29,16 @@ api_v1_router.include_router(
     prefix="/users",
     tags=["users"]
 )
+
+api_v1_router.include_router(
+    application_routes.router,
+    prefix="/applications",
+    tags=["applications"],
+    dependencies=[Depends(get_admin_api_key)]
+)
+
+api_v1_router.include_router(
+    auth_routes.router,
+    prefix="/auth",
+    tags=["auth"]
+)
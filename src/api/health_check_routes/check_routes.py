@@ -6,16 +6,31 @@
 Utility routes for the FastAPI application.
 """
 
+import asyncio
 import logging
+import time
+from collections.abc import Awaitable, Callable
 
 from fastapi import APIRouter, status
-from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
 
 from src.core.env_config import get_settings
+from src.core.responses import ORJSONResponse
+from src.db.connectors.mongo_db import MongoDBConnector
+from src.db.connectors.postgres_db import session_manager
+from src.utils.tracing import trace
+from src.utils.ttl_cache import TTLCache
 
 health_check_router = APIRouter()
 settings = get_settings()
-logger = logging.getLogger(settings.app_logger_name or "application_logger")
+logger = logging.getLogger(
+    f"{settings.app_logger_name or 'application_logger'}.health_check")
+
+# The last readiness result, so a storm of probes cannot turn into a storm
+# of database pings, and the readiness check in flight that concurrent
+# probes wait for instead of starting their own...
+readiness_cache = TTLCache(max_size=1, ttl=settings.health_check_cache_ttl)
+readiness_in_flight: dict[str, asyncio.Task] = {}
 
 
 # Health check endpoint
@@ -27,8 +42,107 @@ async def health_check() -> ORJSONResponse:
     :return: JSON response with status code 200
     :rtype: ORJSONResponse
     """
-    logger.info("Health check endpoint called...")
+    logger.debug("Health check endpoint called...")
     return ORJSONResponse(
         status_code=status.HTTP_200_OK,
         content="Server is OK"
     )
+
+
+async def _ping_postgres() -> None:
+    """
+    Ping Postgres with a connection from the application pool.
+    """
+    async with session_manager.get_engine().connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+async def _ping_mongo() -> None:
+    """
+    Ping MongoDB with the application client, without the logging of
+    `MongoDBConnector.test_connection`, which would flood the logs with
+    every probe.
+    """
+    with trace("mongo.ping"):
+        await MongoDBConnector(
+            uri=settings.mongo_db_url).client.admin.command("ping")
+
+
+# The dependencies the application needs to serve requests...
+READINESS_CHECKS: dict[str, Callable[[], Awaitable[None]]] = {
+    "postgres": _ping_postgres,
+    "mongo": _ping_mongo,
+}
+
+
+# Readiness check endpoint
+@health_check_router.get("/ready")
+async def readiness_check() -> ORJSONResponse:
+    """
+    Readiness check endpoint to verify the application can reach its
+    dependencies. The dependencies are checked concurrently, each within
+    `health_check_timeout` seconds, and the result is cached for
+    `health_check_cache_ttl` seconds.
+
+    :return: JSON response with the status and latency of every dependency,
+        with status code 200 if all are reachable and 503 otherwise
+    :rtype: ORJSONResponse
+    """
+    result = readiness_cache.get("readiness")
+    if result is None:
+        if (task := readiness_in_flight.get("readiness")) is None:
+            task = asyncio.create_task(_check_readiness())
+            readiness_in_flight["readiness"] = task
+            task.add_done_callback(
+                lambda _: readiness_in_flight.pop("readiness", None))
+        result = await asyncio.shield(task)
+
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK if result["status"] == "ready"
+        else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=result
+    )
+
+
+async def _check_readiness() -> dict:
+    """
+    Check all the dependencies concurrently and cache the result.
+
+    :return: The overall status and the result of every dependency.
+    :rtype: dict
+    """
+    results = await asyncio.gather(
+        *(_check_dependency(name, check)
+          for name, check in READINESS_CHECKS.items()))
+    checks = dict(zip(READINESS_CHECKS, results))
+
+    ready = all(check["status"] == "ok" for check in checks.values())
+    result = {"status": "ready" if ready else "not_ready", "checks": checks}
+    readiness_cache.set("readiness", result)
+    return result
+
+
+async def _check_dependency(name: str,
+                            check: Callable[[], Awaitable[None]]) -> dict:
+    """
+    Run the check of a dependency with a hard timeout.
+
+    :param name: The name of the dependency.
+    :type name: str
+    :param check: The check raising if the dependency is not reachable.
+    :type check: Callable[[], Awaitable[None]]
+    :return: The status, latency and error, if any, of the dependency.
+    :rtype: dict
+    """
+    started_at = time.perf_counter()
+    try:
+        await asyncio.wait_for(check(), timeout=settings.health_check_timeout)
+        result = {"status": "ok"}
+    except asyncio.TimeoutError:
+        result = {"status": "error", "error": "Timed out"}
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.warning("Readiness check of %s failed: %s", name, e)
+        result = {"status": "error", "error": type(e).__name__}
+
+    result["latency_ms"] = round((time.perf_counter() - started_at) * 1000, 3)
+    return result
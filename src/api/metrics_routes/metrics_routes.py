@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Metrics routes for the FastAPI application.
+"""
+
+from fastapi import APIRouter, status
+
+from src.core.responses import ORJSONResponse
+from src.db.connectors.postgres_db import session_manager
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/pools")
+async def pool_metrics() -> ORJSONResponse:
+    """
+    Connection pool metrics endpoint with the size, checked out and idle
+    connections, overflow, waiters, checkout latency histogram, connection
+    age and recycle count of every Postgres pool of this worker.
+
+    :return: JSON response with the statistics keyed by pool name
+    :rtype: ORJSONResponse
+    """
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"pools": session_manager.pool_stats()}
+    )
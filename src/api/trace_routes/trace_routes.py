@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Trace routes for the FastAPI application.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Query, status
+
+from src.core.responses import ORJSONResponse
+from src.utils import tracing
+
+trace_router = APIRouter()
+
+
+@trace_router.get("/")
+async def recent_spans(
+        trace_id: Optional[str] = None,
+        limit: int = Query(default=100, ge=1, le=10000)) -> ORJSONResponse:
+    """
+    Recent spans endpoint with the latest finished spans of the sampled
+    traces of this worker, newest first, from the in-memory ring buffer.
+
+    :param trace_id: Only return the spans of this trace
+    :type trace_id: Optional[str]
+    :param limit: The maximum number of spans to return
+    :type limit: int
+    :return: JSON response with the spans
+    :rtype: ORJSONResponse
+    """
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"spans": tracing.exporter.recent(trace_id=trace_id,
+                                                  limit=limit)}
+    )
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Defines the Application API routes for the FastAPI application.
+
+The applications are the clients of the API, authenticated by their API
+key, see `src.core.auth`. The key of a new application is generated by the
+API and returned only once, in the response that creates the application.
+
+Managing the applications requires the admin key, `auth_admin_api_key`, as
+a `x-admin-key` header, on top of an API key. The id and the status of an
+application are always set by the API.
+
+The first application is created from the command line, e.g.:
+
+    python -m src.api.v1_routes.application_routes "my_app" "https://..."
+"""
+
+import asyncio
+import logging
+import sys
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import Response
+
+from src.core.auth import generate_api_key, hash_api_key, \
+    invalidate_api_key
+from src.core.custom_exceptions import ConflictException, \
+    InternalServerException, NotFoundException
+from src.core.env_config import get_settings
+from src.core.responses import ORJSONResponse
+from src.db.connectors.postgres_db import get_pg_db, mark_client_write, \
+    session_manager
+from src.db.models.v1_models.applications_model import ApplicationModel
+from src.db.schemas.v1_schemas.application_schemas import ApplicationCreate
+from src.utils.nano_id import generate_nano_id
+
+# Initialize the API router
+router = APIRouter()
+
+# Initialize environment settings & logger
+settings = get_settings()
+logger = logging.getLogger(
+    settings.app_logger_name or "application_logger")
+
+# The fields written from the request body, the id and API key are
+# generated, and the status and timestamps are set by the model defaults...
+APPLICATION_INPUT_FIELDS = {"name", "description", "url", "rate_limit",
+                            "rate_limit_burst"}
+
+
+@router.post("",
+             name="create_application_v1_in_pg_db",
+             description="Register a new Application and get its API key",
+             operation_id="create_application_v1_in_pg_db",
+             response_class=ORJSONResponse,
+             status_code=status.HTTP_201_CREATED)
+async def create_application(
+        request: Request,
+        application: ApplicationCreate,
+        db: AsyncSession = Depends(get_pg_db)) -> ORJSONResponse:
+    """
+    Register a new Application.
+
+    A new API key is generated for the Application, any `api_key` of the
+    request body is ignored. Only the digest of the key is stored, so the
+    response is the only place the key can be read.
+    """
+    try:
+        new_application = await _insert_application(db, application)
+        mark_client_write(request)
+    except IntegrityError as e:
+        await db.rollback()
+        raise ConflictException(
+            message="Application with given details already exists") from e
+    except Exception as e:
+        await db.rollback()
+        logger.error("Unexpected error occurred: %s", e, exc_info=True)
+        raise InternalServerException(message="Internal Server Error") from e
+
+    return ORJSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content=new_application
+    )
+
+
+async def _insert_application(db: AsyncSession,
+                              application: ApplicationCreate) -> dict:
+    """
+    Insert an Application with a new API key and commit it.
+
+    :return: The Application, with its API key in clear.
+    :rtype: dict
+    """
+    api_key = generate_api_key()
+    api_key_hash = hash_api_key(api_key)
+    result = await db.execute(
+        insert(ApplicationModel)
+        .values(**application.model_dump(include=APPLICATION_INPUT_FIELDS),
+                id=generate_nano_id(), api_key=api_key_hash)
+        .returning(ApplicationModel.id, ApplicationModel.name,
+                   ApplicationModel.description, ApplicationModel.url,
+                   ApplicationModel.is_active, ApplicationModel.rate_limit,
+                   ApplicationModel.rate_limit_burst,
+                   ApplicationModel.created_at, ApplicationModel.updated_at)
+    )
+    new_application = dict(result.mappings().one())
+    await db.commit()
+    invalidate_api_key(api_key_hash)
+    return {**new_application, "api_key": api_key}
+
+
+@router.post("/{application_id}/deactivate",
+             name="deactivate_application_v1_in_pg_db",
+             description="Deactivate an Application and revoke its API key",
+             operation_id="deactivate_application_v1_in_pg_db",
+             status_code=status.HTTP_204_NO_CONTENT)
+async def deactivate_application(
+        request: Request,
+        application_id: str,
+        db: AsyncSession = Depends(get_pg_db)) -> Response:
+    """
+    Deactivate an Application, with a single UPDATE ... RETURNING round
+    trip. Its API key is evicted from the authentication cache of this
+    worker at once, and from the caches of the other workers within
+    `auth_api_key_cache_ttl` seconds.
+    """
+    try:
+        result = await db.execute(
+            update(ApplicationModel)
+            .where(ApplicationModel.id == application_id,
+                   ApplicationModel.is_active.is_(True))
+            .values(is_active=False, updated_at=datetime.utcnow())
+            .returning(ApplicationModel.api_key)
+            .execution_options(synchronize_session=False)
+        )
+        api_key_hash = result.scalar_one_or_none()
+        await db.commit()
+        mark_client_write(request)
+    except Exception as e:
+        await db.rollback()
+        logger.error("Unexpected error occurred: %s", e, exc_info=True)
+        raise InternalServerException(message="Internal Server Error") from e
+
+    if api_key_hash is None:
+        raise NotFoundException(message="Application not found")
+
+    invalidate_api_key(api_key_hash)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+async def _create_application_from_command_line(name: str, url: str) -> None:
+    """
+    Register an Application and print its API key.
+    """
+    async with session_manager.get_session_maker()() as db:
+        new_application = await _insert_application(
+            db, ApplicationCreate(name=name, description=name, url=url))
+    await session_manager.close_session()
+    print(f"Application {new_application['id']} created, API key: "
+          f"{new_application['api_key']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_create_application_from_command_line(*sys.argv[1:3]))
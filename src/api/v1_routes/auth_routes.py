@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Defines the authentication API routes for the FastAPI application.
+"""
+
+from fastapi import APIRouter, Depends, status
+
+from src.core.auth import AuthenticatedApplication, authenticate_api_key, \
+    create_access_token
+from src.core.env_config import get_settings
+from src.core.responses import ORJSONResponse
+
+# Initialize the API router
+router = APIRouter()
+
+# Initialize environment settings
+settings = get_settings()
+
+
+@router.post("/token",
+             name="create_access_token_v1",
+             description="Exchange an API key for a short-lived access token",
+             operation_id="create_access_token_v1",
+             response_class=ORJSONResponse)
+async def create_token(
+        application: AuthenticatedApplication = Depends(
+            authenticate_api_key)) -> ORJSONResponse:
+    """
+    Exchange the API key of an Application for an access token, to send as
+    `Authorization: Bearer <token>` instead of the API key. Only an API key
+    is accepted, so an access token cannot be used to renew itself.
+    """
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "access_token": create_access_token(application),
+            "token_type": "bearer",
+            "expires_in": settings.app_jwt_expire_seconds,
+        }
+    )
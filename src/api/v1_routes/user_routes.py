@@ -7,20 +7,39 @@ Defines the User API routes for the FastAPI application.
 """
 
 import logging
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import datetime
+from functools import partial
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import ORJSONResponse
-from sqlalchemy import select
+import orjson
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query, \
+    Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import ARRAY, Column, ColumnElement, Row, Select, String, \
+    any_, bindparam, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from starlette.responses import Response
 
-from src.core.custom_exceptions import ConflictException, \
-    InternalServerException, NotFoundException
+from src.core.custom_exceptions import BadRequestException, \
+    ConflictException, InternalServerException, NotFoundException
 from src.core.env_config import get_settings
-from src.db.connectors.postgres_db import get_pg_db
+from src.core.responses import ORJSONResponse
+from src.db.connectors.postgres_db import get_pg_db, get_pg_read_db, \
+    get_pg_read_session_factory, get_pg_session_factory, \
+    is_primary_session, mark_client_write
 from src.db.models.v1_models.users_model import UserModel
-from src.db.schemas.v1_schemas.user_schemas import UserCreate, UserOutput
+from src.db.schemas.v1_schemas.user_schemas import UserBatch, \
+    UserBatchLookup, UserCreate, UserOutput, UserPage, UserUpdate
+from src.utils.conditional_requests import is_not_modified, \
+    make_body_etag, make_etag, not_modified_response, validator_headers
+from src.utils.insert_coalescer import InsertCoalescer
+from src.utils.pagination import decode_cursor, encode_cursor
+from src.utils.sparse_fields import parse_fields
+from src.utils.ttl_cache import TTLCache
 
 # Initialize the API router
 router = APIRouter()
@@ -30,6 +49,36 @@ settings = get_settings()
 logger = logging.getLogger(
     settings.app_logger_name or "application_logger")
 
+# In-process read-through cache of Users by id, with username and email
+# aliases pointing to the id. Every write of a User invalidates its id, and
+# the cache is only filled from the primary database, with the generation
+# of the cache from before the read, so neither the replication lag of a
+# replica nor a write racing the read can cache a stale User...
+user_cache = TTLCache(max_size=settings.user_cache_max_size,
+                      ttl=settings.user_cache_ttl)
+user_alias_cache = TTLCache(max_size=2 * settings.user_cache_max_size,
+                            ttl=settings.user_cache_ttl)
+
+# The fields of the User output contract, which are all User columns...
+USER_OUTPUT_FIELDS = tuple(UserOutput.model_fields)
+
+# The timestamps of a User, which are only ever set by the server...
+USER_TIMESTAMP_FIELDS = frozenset({"created_at", "updated_at", "deleted_at"})
+
+# The bulk route reads its body manually to accept both JSON and NDJSON...
+BULK_REQUEST_BODY_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {"type": "array",
+                           "items": UserCreate.model_json_schema()}
+            },
+            "application/x-ndjson": {"schema": {"type": "string"}},
+        },
+    }
+}
+
 
 @router.options("", operation_id="options_v1_user_routes")
 def options_user_routes() -> Response:
@@ -49,19 +98,35 @@ def options_user_routes() -> Response:
              response_class=ORJSONResponse,
              status_code=status.HTTP_201_CREATED)
 async def create_user(
+        request: Request,
         user: UserCreate,
-        db: AsyncSession = Depends(get_pg_db)) -> ORJSONResponse:
+        db: AsyncSession = Depends(get_pg_db),
+        session_factory: async_sessionmaker[AsyncSession] = Depends(
+            get_pg_session_factory)) -> ORJSONResponse:
     """
     Create a new User.
+
+    The User is written with a single INSERT ... RETURNING round trip, the
+    returned row is the response body. With `pg_db_insert_coalescing`
+    enabled, the Users created by concurrent requests are written together
+    in batches instead, see `InsertCoalescer`.
     """
+    if settings.pg_db_insert_coalescing:
+        return await _create_user_coalesced(request, user, session_factory)
+
     try:
-        new_user = UserModel(**user.dict())
-        db.add(new_user)
+        result = await db.execute(
+            insert(UserModel)
+            .values(**_new_user_row(user, datetime.utcnow()))
+            .returning(*_user_columns(USER_OUTPUT_FIELDS))
+        )
+        new_user = result.one()
         await db.commit()
-        await db.refresh(new_user)
+        mark_client_write(request)
+        user_cache.invalidate(new_user.id)
         return ORJSONResponse(
             status_code=status.HTTP_201_CREATED,
-            content=UserOutput.model_validate(new_user).model_dump()
+            content=_rows_to_dicts([new_user], USER_OUTPUT_FIELDS)[0]
         )
     except IntegrityError as e:
         await db.rollback()
@@ -73,39 +138,753 @@ async def create_user(
         raise InternalServerException(message="Internal Server Error") from e
 
 
+@router.post("/bulk",
+             name="create_users_bulk_v1_in_pg_db",
+             description="Create a batch of new Users",
+             operation_id="create_users_bulk_v1_in_pg_db",
+             response_class=ORJSONResponse,
+             status_code=status.HTTP_201_CREATED,
+             responses={207: {"description": "Some rows were not created"}},
+             openapi_extra=BULK_REQUEST_BODY_OPENAPI)
+async def create_users_bulk(
+        request: Request,
+        db: AsyncSession = Depends(get_pg_db)) -> ORJSONResponse:
+    """
+    Create a batch of new Users.
+
+    The batch is sent either as a JSON array or as newline delimited JSON
+    (`Content-Type: application/x-ndjson`). Every row is validated on its
+    own, and the valid rows are written with one multi-row INSERT per chunk
+    of `pg_db_bulk_chunk_size` rows inside a single transaction. Rows that
+    conflict with existing Users are skipped instead of failing the batch.
+
+    The response holds one result per row, in request order, with the
+    status `created`, `conflict` or `invalid`. The status code is 201 when
+    every row was created and 207 otherwise.
+    """
+    raw_rows = _parse_bulk_body(
+        await request.body(), request.headers.get("content-type", ""))
+
+    now = datetime.utcnow()
+    results: list[dict] = []
+    valid_rows: dict[int, dict] = {}
+    for index, raw_row in enumerate(raw_rows):
+        try:
+            valid_rows[index] = _new_user_row(
+                UserCreate.model_validate(raw_row), now)
+            results.append({"index": index, "status": "created",
+                            "id": valid_rows[index]["id"]})
+        except ValidationError as e:
+            results.append({"index": index, "status": "invalid",
+                            "errors": e.errors(include_url=False,
+                                               include_context=False)})
+
+    try:
+        inserted_ids = {user["id"] for user in
+                        await _insert_users(db, list(valid_rows.values()))}
+        await db.commit()
+        mark_client_write(request)
+        for user_id in inserted_ids:
+            user_cache.invalidate(user_id)
+    except Exception as e:
+        await db.rollback()
+        logger.error("Unexpected error occurred: %s", e, exc_info=True)
+        raise InternalServerException(message="Internal Server Error") from e
+
+    created = 0
+    for index in valid_rows:
+        if results[index]["id"] in inserted_ids:
+            inserted_ids.discard(results[index]["id"])
+            created += 1
+        else:
+            results[index]["status"] = "conflict"
+
+    return ORJSONResponse(
+        status_code=(status.HTTP_201_CREATED if created == len(results)
+                     else status.HTTP_207_MULTI_STATUS),
+        content={"created": created, "results": results}
+    )
+
+
+def _new_user_row(user: UserCreate, now: datetime) -> dict:
+    """
+    Build the row of a new User, with the timestamps set by the server
+    instead of the ones sent by the client.
+
+    :param user: The validated User to create.
+    :type user: UserCreate
+    :param now: The creation time of the User.
+    :type now: datetime
+    :return: The row to insert.
+    :rtype: dict
+    """
+    return {**user.model_dump(exclude=USER_TIMESTAMP_FIELDS),
+            "created_at": now, "updated_at": now, "deleted_at": None}
+
+
+def _parse_bulk_body(body: bytes, content_type: str) -> list:
+    """
+    Parse the body of a bulk request into a list of raw rows.
+
+    :param body: The raw request body.
+    :type body: bytes
+    :param content_type: The content type of the request.
+    :type content_type: str
+    :return: The raw rows of the batch.
+    :rtype: list
+    :raises BadRequestException: If the body is malformed or too large.
+    """
+    try:
+        if content_type.startswith("application/x-ndjson"):
+            rows = [orjson.loads(line) for line in body.splitlines()
+                    if line.strip()]
+        else:
+            rows = orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        raise BadRequestException(message="Malformed JSON body") from e
+
+    if not isinstance(rows, list) or not rows:
+        raise BadRequestException(
+            message="Expected a non-empty batch of Users")
+    if len(rows) > settings.api_bulk_max_rows:
+        raise BadRequestException(
+            message=f"Batch exceeds {settings.api_bulk_max_rows} rows")
+
+    return rows
+
+
+async def _insert_users(session: AsyncSession, rows: list[dict],
+                        field_names: Sequence[str] = ("id",)) -> list[dict]:
+    """
+    Insert Users with one multi-row INSERT per chunk, skipping the rows that
+    conflict with a unique constraint (id, username or email).
+
+    :param session: The database session to insert with.
+    :type session: AsyncSession
+    :param rows: The validated User rows to insert.
+    :type rows: list[dict]
+    :param field_names: The User fields to return of the inserted rows.
+    :type field_names: Sequence[str]
+    :return: The requested fields of the inserted rows.
+    :rtype: list[dict]
+    """
+    dialect_insert = (sqlite.insert if session.bind.dialect.name == "sqlite"
+                      else postgresql.insert)
+    chunk_size = settings.pg_db_bulk_chunk_size
+    inserted_users: list[dict] = []
+
+    for start in range(0, len(rows), chunk_size):
+        result = await session.execute(
+            dialect_insert(UserModel)
+            .values(rows[start:start + chunk_size])
+            .on_conflict_do_nothing()
+            .returning(*_user_columns(field_names))
+        )
+        inserted_users.extend(_rows_to_dicts(result.all(), field_names))
+
+    return inserted_users
+
+
+async def _create_user_coalesced(
+        request: Request, user: UserCreate,
+        session_factory: async_sessionmaker[AsyncSession]) -> \
+        ORJSONResponse:
+    """
+    Create a new User through the insert coalescer of the application,
+    which writes the Users of concurrent requests with one multi-row INSERT
+    and one COMMIT per batch.
+
+    :param request: The incoming request.
+    :type request: Request
+    :param user: The User to create.
+    :type user: UserCreate
+    :param session_factory: The factory to open the batch sessions with.
+    :type session_factory: async_sessionmaker[AsyncSession]
+    :return: The created User.
+    :rtype: ORJSONResponse
+    :raises ConflictException: If the User conflicts with an existing one.
+    """
+    coalescer = getattr(request.app.state, "user_insert_coalescer", None)
+    if coalescer is None:
+        coalescer = InsertCoalescer(
+            partial(_flush_coalesced_users, session_factory),
+            window=settings.pg_db_insert_coalescing_window,
+            max_batch_size=settings.pg_db_insert_coalescing_max_rows)
+        request.app.state.user_insert_coalescer = coalescer
+
+    try:
+        new_user = await coalescer.submit(
+            _new_user_row(user, datetime.utcnow()))
+    except ConflictException:
+        raise
+    except Exception as e:
+        logger.error("Unexpected error occurred: %s", e, exc_info=True)
+        raise InternalServerException(message="Internal Server Error") from e
+
+    mark_client_write(request)
+    user_cache.invalidate(new_user["id"])
+    return ORJSONResponse(status_code=status.HTTP_201_CREATED,
+                          content=new_user)
+
+
+async def close_user_insert_coalescer(app_instance: FastAPI) -> None:
+    """
+    Write the Users still pending in the insert coalescer of the
+    application, if it was started, and wait for its running batches. The
+    application lifespan calls this before closing the connection pools.
+
+    :param app_instance: The FastAPI application.
+    :type app_instance: FastAPI
+    """
+    coalescer = getattr(app_instance.state, "user_insert_coalescer", None)
+    if coalescer is not None:
+        await coalescer.close()
+
+
+async def _flush_coalesced_users(
+        session_factory: async_sessionmaker[AsyncSession],
+        rows: list[dict]) -> list[dict | ConflictException]:
+    """
+    Write a coalesced batch of Users in one transaction.
+
+    :param session_factory: The factory to open the batch session with.
+    :type session_factory: async_sessionmaker[AsyncSession]
+    :param rows: The User rows of the batch.
+    :type rows: list[dict]
+    :return: The created User, or a ConflictException, for every row.
+    :rtype: list[dict | ConflictException]
+    """
+    async with session_factory() as session:
+        inserted_users = {
+            user["id"]: user for user in
+            await _insert_users(session, rows, USER_OUTPUT_FIELDS)}
+        await session.commit()
+
+    return [inserted_users.pop(row["id"], None) or ConflictException(
+        message="User with given details already exists") for row in rows]
+
+
 @router.get("",
             response_class=ORJSONResponse,
+            responses={200: {"model": UserPage}},
             operation_id="get_all_users_v1_in_pg_db")
-async def get_all_users(
-        db: AsyncSession = Depends(get_pg_db)) -> ORJSONResponse:
+async def get_all_users(  # pylint: disable=R0913,R0917
+        request: Request,
+        limit: int = Query(default=settings.api_page_size_default, ge=1,
+                           le=settings.api_page_size_max),
+        after: Optional[str] = Query(default=None),
+        fields: Optional[str] = Query(
+            default=None,
+            description="Comma separated User fields to return, e.g. "
+                        "`id,username,email`"),
+        ids: Optional[str] = Query(
+            default=None,
+            description="Comma separated User ids to look up as a batch, "
+                        "returned as a `UserBatch` instead of a page"),
+        db: AsyncSession = Depends(get_pg_read_db)) -> ORJSONResponse:
     """
-    Retrieve all Users that are not soft-deleted.
+    Retrieve a page of Users that are not soft-deleted.
+
+    Users are ordered by their primary key and paginated with an opaque
+    keyset cursor. The `next` cursor of a page is passed as the `after`
+    query parameter to get the following page, and is `null` on the last
+    page. A sparse fieldset in `fields` limits both the selected columns
+    and the returned fields.
+
+    With `ids`, the given Users are looked up as a batch instead, see
+    `POST /users/batch`.
+
+    The response carries an ETag of its body, and a request with a
+    matching `If-None-Match` gets an empty 304 Not Modified response.
     """
+    after_id = decode_cursor(after) if after else None
+    field_names = (parse_fields(fields, USER_OUTPUT_FIELDS)
+                   or USER_OUTPUT_FIELDS)
+
+    if ids is not None:
+        return _conditional_body_response(
+            request, await _batch_lookup_response(
+                db, [user_id.strip() for user_id in ids.split(",")
+                     if user_id.strip()], field_names))
+
     try:
         async with db as session:
+            query = _select_user_fields(field_names)
+            if after_id is not None:
+                query = query.filter(UserModel.id > after_id)
+
+            # Fetch one extra row to know if there is a next page...
             result = await session.execute(
-                select(UserModel)
-                .options()
-                .filter(UserModel.deleted_at.is_(None))
-            )
+                query.order_by(UserModel.id).limit(limit + 1))
+            rows = result.all()
 
-            if users := result.unique().scalars().all():
-                return ORJSONResponse(
-                    status_code=status.HTTP_200_OK,
-                    content=[UserOutput.model_validate(user).model_dump() for
-                             user in users]
-                )
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1].id)
 
-            raise NotFoundException(message="No users found")
-    except NotFoundException as e:
-        logger.error(e)
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
-        ) from e
+            return _conditional_body_response(request, ORJSONResponse(
+                status_code=status.HTTP_200_OK,
+                content={
+                    "data": _rows_to_dicts(rows, field_names),
+                    "next": next_cursor,
+                }
+            ))
     except Exception as e:
         logger.error(e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal Server Error"
         ) from e
+
+
+@router.get("/export",
+            response_class=StreamingResponse,
+            responses={200: {"content": {"application/x-ndjson": {}}}},
+            operation_id="export_users_v1_in_pg_db")
+async def export_users(
+        session_factory: async_sessionmaker[AsyncSession] = Depends(
+            get_pg_read_session_factory)) -> StreamingResponse:
+    """
+    Export all Users that are not soft-deleted as newline delimited JSON.
+
+    The rows are read through a server-side cursor in chunks of
+    `pg_db_stream_chunk_size` and written to the client chunk by chunk, so
+    memory usage stays flat regardless of the size of the table.
+    """
+    return StreamingResponse(
+        _stream_users_ndjson(session_factory),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="users.ndjson"'}
+    )
+
+
+async def _stream_users_ndjson(
+        session_factory: async_sessionmaker[AsyncSession]
+) -> AsyncIterator[bytes]:
+    """
+    Yield the non soft-deleted Users as chunks of newline delimited JSON.
+
+    :param session_factory: The factory to open the streaming session with.
+    :type session_factory: async_sessionmaker[AsyncSession]
+    :yield: A chunk of newline delimited JSON encoded Users.
+    :rtype: AsyncIterator[bytes]
+    """
+    chunk_size = settings.pg_db_stream_chunk_size
+
+    async with session_factory() as session:
+        result = await session.stream(
+            _select_user_fields(USER_OUTPUT_FIELDS)
+            .order_by(UserModel.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for rows in result.partitions():
+            yield b"".join(
+                orjson.dumps(user, option=orjson.OPT_APPEND_NEWLINE)
+                for user in _rows_to_dicts(rows, USER_OUTPUT_FIELDS)
+            )
+
+
+def _select_user_fields(field_names: Sequence[str]) -> Select:
+    """
+    Build a SELECT of the given User columns for the Users that are not
+    soft-deleted. The id column is always selected, after the requested
+    ones, since keyset pagination is built from it.
+
+    The `deleted_at IS NULL` filter matches the predicate of the partial
+    `ix_users_active_*` indexes, so the planner can serve active User reads
+    and the keyset ordering on id from them.
+
+    :param field_names: The names of the columns to select.
+    :type field_names: Sequence[str]
+    :return: The SELECT statement.
+    :rtype: Select
+    """
+    return (
+        select(*_user_columns(dict.fromkeys([*field_names, "id"])))
+        .filter(UserModel.deleted_at.is_(None))
+    )
+
+
+def _user_columns(field_names: Iterable[str]) -> list[Column]:
+    """
+    Get the User table columns with the given names.
+
+    :param field_names: The names of the columns.
+    :type field_names: Iterable[str]
+    :return: The columns, in the given order.
+    :rtype: list[Column]
+    """
+    columns = UserModel.__table__.c
+    return [columns[name] for name in field_names]
+
+
+def _rows_to_dicts(rows: Sequence[Row], field_names: Sequence[str]) -> \
+        list[dict]:
+    """
+    Turn rows from `_select_user_fields` into orjson serializable dicts.
+
+    This is the read side fast path that skips the per-row Pydantic
+    validation of `UserOutput`. The rows come straight from the columns
+    `UserOutput` is made of and already hold the output types, so the
+    result matches the `UserOutput` contract documented in the OpenAPI
+    schema.
+
+    :param rows: The selected rows.
+    :type rows: Sequence[Row]
+    :param field_names: The requested field names, in selected order.
+    :type field_names: Sequence[str]
+    :return: One dict per row with the requested fields.
+    :rtype: list[dict]
+    """
+    return [dict(zip(field_names, row)) for row in rows]
+
+
+@router.post("/batch",
+             response_class=ORJSONResponse,
+             responses={200: {"model": UserBatch}},
+             operation_id="batch_lookup_users_v1_in_pg_db")
+async def batch_lookup_users(
+        lookup: UserBatchLookup,
+        fields: Optional[str] = Query(
+            default=None,
+            description="Comma separated User fields to return, e.g. "
+                        "`id,username,email`"),
+        db: AsyncSession = Depends(get_pg_read_db)) -> ORJSONResponse:
+    """
+    Retrieve a batch of Users that are not soft-deleted by their ids.
+
+    This is the POST variant of `GET /users?ids=` for id sets too large for
+    a URL. The Users are resolved with a single `id = ANY(:ids)` query, and
+    returned in the order of the requested ids, with `null` in `data` and
+    the id in `missing` for each id that was not found. At most
+    `api_batch_max_ids` ids are accepted per request.
+    """
+    field_names = (parse_fields(fields, USER_OUTPUT_FIELDS)
+                   or USER_OUTPUT_FIELDS)
+    return await _batch_lookup_response(db, lookup.ids, field_names)
+
+
+async def _batch_lookup_response(session: AsyncSession, user_ids: list[str],
+                                 field_names: Sequence[str]) -> \
+        ORJSONResponse:
+    """
+    Look up a batch of Users by id and build the `UserBatch` response.
+
+    Cached Users are served from the cache, all the others are read with a
+    single query, and cached if read from the primary database.
+
+    :param session: The database session to read with.
+    :type session: AsyncSession
+    :param user_ids: The requested User ids, in response order.
+    :type user_ids: list[str]
+    :param field_names: The User fields to return.
+    :type field_names: Sequence[str]
+    :return: The batch of Users, with explicit misses.
+    :rtype: ORJSONResponse
+    :raises BadRequestException: If no ids or too many ids are requested.
+    """
+    if not user_ids:
+        raise BadRequestException(message="No User ids requested")
+    if len(user_ids) > settings.api_batch_max_ids:
+        raise BadRequestException(
+            message=f"Batch exceeds {settings.api_batch_max_ids} ids")
+
+    users: dict[str, dict] = {}
+    uncached_ids = []
+    for user_id in dict.fromkeys(user_ids):
+        if (user := user_cache.get(user_id)) is not None:
+            users[user_id] = user
+        else:
+            uncached_ids.append(user_id)
+
+    if uncached_ids:
+        generation = user_cache.generation
+        result = await session.execute(
+            _select_user_fields(USER_OUTPUT_FIELDS)
+            .filter(_id_in(session, uncached_ids)))
+        for user in _rows_to_dicts(result.all(), USER_OUTPUT_FIELDS):
+            if is_primary_session(session):
+                _cache_user(user, generation)
+            users[user["id"]] = user
+
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "data": [{name: users[user_id][name] for name in field_names}
+                     if user_id in users else None for user_id in user_ids],
+            "missing": [user_id for user_id in user_ids
+                        if user_id not in users],
+        }
+    )
+
+
+def _id_in(session: AsyncSession, user_ids: list[str]) -> ColumnElement:
+    """
+    Build the filter matching Users with any of the given ids.
+
+    On Postgres this is `id = ANY(:ids)` with the ids bound as one array
+    parameter, which keeps a single statement shape for any number of
+    ids. Other dialects fall back to an `IN` list.
+
+    :param session: The database session the filter is executed with.
+    :type session: AsyncSession
+    :param user_ids: The User ids to match.
+    :type user_ids: list[str]
+    :return: The filter expression.
+    :rtype: ColumnElement
+    """
+    if session.bind.dialect.name == "postgresql":
+        return UserModel.id == any_(
+            bindparam("user_ids", user_ids, type_=ARRAY(String)))
+    return UserModel.id.in_(user_ids)
+
+
+@router.get("/lookup",
+            response_class=ORJSONResponse,
+            responses={200: {"model": UserOutput}},
+            operation_id="lookup_user_v1_in_pg_db")
+async def lookup_user(
+        request: Request,
+        username: Optional[str] = Query(default=None),
+        email: Optional[str] = Query(default=None),
+        db: AsyncSession = Depends(get_pg_read_db)) -> ORJSONResponse:
+    """
+    Retrieve a User that is not soft-deleted by its username or its email.
+    Exactly one of the two query parameters has to be given. Conditional
+    requests are handled as for `GET /users/{user_id}`.
+    """
+    if (username is None) == (email is None):
+        raise BadRequestException(
+            message="Provide exactly one of username or email")
+
+    field, value = ("username", username) if username else ("email", email)
+    if (user := await _get_user_by(db, field, value)) is None:
+        raise NotFoundException(message="User not found")
+
+    return _conditional_user_response(request, user, USER_OUTPUT_FIELDS)
+
+
+@router.get("/{user_id}",
+            response_class=ORJSONResponse,
+            responses={200: {"model": UserOutput}},
+            operation_id="get_user_v1_in_pg_db")
+async def get_user(
+        request: Request,
+        user_id: str,
+        fields: Optional[str] = Query(
+            default=None,
+            description="Comma separated User fields to return, e.g. "
+                        "`id,username,email`"),
+        db: AsyncSession = Depends(get_pg_read_db)) -> ORJSONResponse:
+    """
+    Retrieve a User that is not soft-deleted by its id.
+
+    The response carries a strong ETag and a Last-Modified date from the
+    `updated_at` timestamp of the User. A request with a matching
+    `If-None-Match`, or an `If-Modified-Since` at or after the last
+    update, gets an empty 304 Not Modified response.
+    """
+    field_names = (parse_fields(fields, USER_OUTPUT_FIELDS)
+                   or USER_OUTPUT_FIELDS)
+
+    if (user := await _get_user_by(db, "id", user_id)) is None:
+        raise NotFoundException(message="User not found")
+
+    return _conditional_user_response(request, user, field_names)
+
+
+def _conditional_user_response(request: Request, user: dict,
+                               field_names: Sequence[str]) -> Response:
+    """
+    Build the response of a single User, or an empty 304 Not Modified
+    response if the client already holds the current representation. The
+    ETag is derived from the id, the `updated_at` timestamp and the
+    returned fields, so the 304 path never serializes the User.
+
+    :param request: The incoming request.
+    :type request: Request
+    :param user: The User with all the `USER_OUTPUT_FIELDS`.
+    :type user: dict
+    :param field_names: The User fields to return.
+    :type field_names: Sequence[str]
+    :return: The User response or the 304 Not Modified response.
+    :rtype: Response
+    """
+    etag = make_etag(user["id"], user["updated_at"], *field_names)
+    if is_not_modified(request, etag, user["updated_at"]):
+        return not_modified_response(etag, user["updated_at"])
+
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={name: user[name] for name in field_names},
+        headers=validator_headers(etag, user["updated_at"])
+    )
+
+
+def _conditional_body_response(request: Request,
+                               response: ORJSONResponse) -> Response:
+    """
+    Add an ETag of the serialized body to a response, or replace it with
+    an empty 304 Not Modified response if the client already holds it.
+
+    :param request: The incoming request.
+    :type request: Request
+    :param response: The rendered response.
+    :type response: ORJSONResponse
+    :return: The response or the 304 Not Modified response.
+    :rtype: Response
+    """
+    etag = make_body_etag(response.body)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    response.headers.update(validator_headers(etag))
+    return response
+
+
+async def _get_user_by(session: AsyncSession, field: str, value: str) -> \
+        Optional[dict]:
+    """
+    Read-through lookup of a User that is not soft-deleted by its id,
+    username or email. Cached Users are served without touching the
+    database, and Users read from the primary database are cached.
+
+    :param session: The database session to read with on a cache miss.
+    :type session: AsyncSession
+    :param field: The unique field to look up by, `id`, `username` or
+        `email`.
+    :type field: str
+    :param value: The value of the field.
+    :type value: str
+    :return: The User, or None if there is no such User.
+    :rtype: Optional[dict]
+    """
+    # Usernames and emails are cached as aliases of the User id. An alias
+    # is only trusted if the cached User still has that username or email,
+    # so an alias that went stale with an update is a cache miss...
+    user_id = value if field == "id" else user_alias_cache.get((field, value))
+    if user_id is not None:
+        user = user_cache.get(user_id)
+        if user is not None and user[field] == value:
+            return user
+
+    generation = user_cache.generation
+    result = await session.execute(
+        _select_user_fields(USER_OUTPUT_FIELDS)
+        .filter(UserModel.__table__.c[field] == value))
+    if (row := result.one_or_none()) is None:
+        return None
+
+    user = _rows_to_dicts([row], USER_OUTPUT_FIELDS)[0]
+    if is_primary_session(session):
+        _cache_user(user, generation)
+    return user
+
+
+def _cache_user(user: dict, generation: int) -> None:
+    """
+    Cache a User by its id, and its username and email as aliases of the
+    id, unless a User was invalidated since the User was read. An alias
+    without its User is harmless, it is checked against the cached User.
+
+    :param user: The User with all the `USER_OUTPUT_FIELDS`.
+    :type user: dict
+    :param generation: The generation of the User cache before the read.
+    :type generation: int
+    """
+    user_cache.set(user["id"], user, generation=generation)
+    for alias_field in ("username", "email"):
+        if user[alias_field] is not None:
+            user_alias_cache.set((alias_field, user[alias_field]), user["id"])
+
+
+@router.patch("/{user_id}",
+              response_class=ORJSONResponse,
+              responses={200: {"model": UserOutput}},
+              operation_id="update_user_v1_in_pg_db")
+async def update_user(
+        request: Request,
+        user_id: str,
+        user: UserUpdate,
+        db: AsyncSession = Depends(get_pg_db)) -> ORJSONResponse:
+    """
+    Partially update a User that is not soft-deleted.
+
+    Only the fields present in the body are written, with a single
+    UPDATE ... RETURNING round trip, and the updated row is returned. The
+    id and the timestamps of the User are never written from the body, and
+    no field can be set to null.
+    """
+    values = user.model_dump(exclude_unset=True,
+                             exclude={"id", *USER_TIMESTAMP_FIELDS})
+    if not values:
+        raise BadRequestException(message="No fields to update")
+    if null_fields := sorted(field for field, value in values.items()
+                             if value is None):
+        raise BadRequestException(
+            message=f"Fields cannot be null: {', '.join(null_fields)}")
+
+    try:
+        result = await db.execute(
+            update(UserModel)
+            .where(UserModel.id == user_id, UserModel.deleted_at.is_(None))
+            .values(**values, updated_at=datetime.utcnow())
+            .returning(*_user_columns(USER_OUTPUT_FIELDS))
+            .execution_options(synchronize_session=False)
+        )
+        updated_user = result.one_or_none()
+        await db.commit()
+        mark_client_write(request)
+        user_cache.invalidate(user_id)
+    except IntegrityError as e:
+        await db.rollback()
+        raise ConflictException(
+            message="User with given details already exists") from e
+    except Exception as e:
+        await db.rollback()
+        logger.error("Unexpected error occurred: %s", e, exc_info=True)
+        raise InternalServerException(message="Internal Server Error") from e
+
+    if updated_user is None:
+        raise NotFoundException(message="User not found")
+
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=_rows_to_dicts([updated_user], USER_OUTPUT_FIELDS)[0]
+    )
+
+
+@router.delete("/{user_id}",
+               status_code=status.HTTP_204_NO_CONTENT,
+               operation_id="delete_user_v1_in_pg_db")
+async def delete_user(
+        request: Request,
+        user_id: str,
+        db: AsyncSession = Depends(get_pg_db)) -> Response:
+    """
+    Soft-delete a User by setting its `deleted_at` timestamp, with a single
+    UPDATE ... RETURNING round trip.
+    """
+    now = datetime.utcnow()
+    try:
+        result = await db.execute(
+            update(UserModel)
+            .where(UserModel.id == user_id, UserModel.deleted_at.is_(None))
+            .values(deleted_at=now, updated_at=now)
+            .returning(UserModel.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted_id = result.scalar_one_or_none()
+        await db.commit()
+        mark_client_write(request)
+        user_cache.invalidate(user_id)
+    except Exception as e:
+        await db.rollback()
+        logger.error("Unexpected error occurred: %s", e, exc_info=True)
+        raise InternalServerException(message="Internal Server Error") from e
+
+    if deleted_id is None:
+        raise NotFoundException(message="User not found")
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -3,48 +3,399 @@
 
 """
 This module contains the authentication logic for the FastAPI application.
+
+The applications accessing the API are registered in the `applications`
+table, with the SHA-256 digest of their API key, so a leaked table does not
+leak usable keys. The keys are random 256-bit tokens, so a fast hash is as
+safe as a slow password hash for them, and the digest can be looked up with
+an index.
+
+The lookups are cached per worker, so most authentications cost a
+dictionary lookup instead of a database query:
+
+- The digests of valid keys map to their application, with its rate
+  limits, for `auth_api_key_cache_ttl` seconds. Deactivating an
+  application evicts its key at once in the worker handling the
+  deactivation, and in the other workers within
+  `auth_api_key_revocation_interval` seconds, see `ApiKeyRevocations`.
+- The digests of unknown keys are cached for
+  `auth_api_key_negative_cache_ttl` seconds, so retrying a wrong key does
+  not reach the database either.
+
+An application can also exchange its API key for a short-lived access
+token, a JWT signed with `app_jwt_secret_key`, and send it as a
+`Authorization: Bearer` header. The token carries the application and its
+rate limits, so verifying it needs no lookup at all, and the verified
+tokens are cached by signature until they expire, so a token is only
+verified once per worker. A token stays valid until it expires, up to
+`app_jwt_expire_seconds` after its application is deactivated.
+
+The access tokens are disabled until `app_jwt_secret_key` is set to a
+secret of at least 32 characters: a known or guessable secret would let
+anyone forge a token for any application, with any rate limits. While they
+are disabled, no token is issued, and every bearer token is rejected.
+
+The applications themselves are managed with the admin key,
+`auth_admin_api_key`, sent as a `x-admin-key` header, see
+`get_admin_api_key`. Application management over the API is disabled while
+the admin key is not set, and the applications are then only managed from
+the command line.
 """
 
-import os
-from fastapi import Security, HTTPException, status
-from fastapi.security import APIKeyQuery, APIKeyHeader
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
 
+from fastapi import Depends, HTTPException, Security, status
+from fastapi.security import APIKeyQuery, APIKeyHeader, \
+    HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.env_config import get_settings
+from src.db.connectors.postgres_db import get_pg_session_factory
+from src.db.models.v1_models.applications_model import ApplicationModel
+from src.utils.jwt_tokens import InvalidTokenError, decode_jwt, encode_jwt
+from src.utils.request_timing import measure
+from src.utils.tracing import span
+from src.utils.ttl_cache import TTLCache
+
+settings = get_settings()
+logger = logging.getLogger(
+    f"{settings.app_logger_name or 'application_logger'}.auth")
 
 # Auth headers & query params
 api_key_query = APIKeyQuery(name="api_key", auto_error=False)
 api_key_header = APIKeyHeader(name="x-api-key", auto_error=False)
+bearer_token = HTTPBearer(auto_error=False)
+admin_api_key_header = APIKeyHeader(name="x-admin-key", auto_error=False)
+
+# Applications by API key digest, and the digests of the unknown keys...
+api_key_cache = TTLCache(max_size=settings.auth_api_key_cache_max_size,
+                         ttl=settings.auth_api_key_cache_ttl)
+invalid_api_key_cache = TTLCache(
+    max_size=settings.auth_api_key_cache_max_size,
+    ttl=settings.auth_api_key_negative_cache_ttl)
+
+# The minimum length of the secret key signing the access tokens...
+JWT_SECRET_KEY_MIN_LENGTH = 32
+
+# Verified access tokens by signature, each until the token expires...
+access_token_cache = TTLCache(max_size=settings.auth_token_cache_max_size,
+                              ttl=settings.app_jwt_expire_seconds)
+
+# How far back the polls for revocations look, to cover the clock skew of
+# the workers and the updates committed after a poll started...
+REVOCATION_LOOKBACK = timedelta(seconds=5)
+
+
+class AuthenticatedApplication(NamedTuple):
+    """
+    The application of a valid API key.
+    """
+    id: str
+    rate_limit: Optional[float] = None
+    rate_limit_burst: Optional[int] = None
+
+
+# pylint: disable-next=too-few-public-methods
+class ApiKeyRevocations:
+    """
+    Evicts the API keys of the applications deactivated or deleted by any
+    worker from the caches of this worker. The `applications` table is
+    polled for the inactive rows updated since the last poll, at most every
+    `auth_api_key_revocation_interval` seconds, so a revoked key is
+    rejected by every worker within that interval instead of within the
+    TTL of its cache entry.
+    """
+
+    def __init__(self, *caches: TTLCache):
+        """
+        Constructor method for the ApiKeyRevocations class.
+
+        :param caches: The caches to evict the API key digests from.
+        :type caches: TTLCache
+        """
+        self.caches = caches
+        self.polled_at = time.monotonic()
+        self.updated_since = datetime.utcnow() - REVOCATION_LOOKBACK
+
+    async def poll(
+            self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        """
+        Evict the API keys of the applications deactivated or deleted since
+        the last poll, unless the last poll was less than the polling
+        interval ago. A failed poll is logged and retried after the
+        interval.
+
+        :param session_factory: The session factory of the primary database.
+        :type session_factory: async_sessionmaker[AsyncSession]
+        """
+        if time.monotonic() - self.polled_at \
+                < settings.auth_api_key_revocation_interval:
+            return
+
+        self.polled_at = time.monotonic()
+        started_at = datetime.utcnow()
+        try:
+            async with session_factory() as db:
+                api_key_hashes = (await db.scalars(
+                    select(ApplicationModel.api_key)
+                    .where(ApplicationModel.updated_at > self.updated_since,
+                           or_(ApplicationModel.is_active.is_(False),
+                               ApplicationModel.deleted_at.is_not(None)))
+                )).all()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("Polling the API key revocations failed: %r", e)
+            return
+
+        self.updated_since = started_at - REVOCATION_LOOKBACK
+        for api_key_hash in api_key_hashes:
+            for cache in self.caches:
+                cache.invalidate(api_key_hash)
+
+
+# The revocations of the cached API keys, by the other workers...
+api_key_revocations = ApiKeyRevocations(api_key_cache)
+
+
+def generate_api_key() -> str:
+    """
+    Generate a new random API key.
+
+    :return: The API key, 43 URL safe characters.
+    :rtype: str
+    """
+    return secrets.token_urlsafe(32)
+
+
+def hash_api_key(api_key: str) -> str:
+    """
+    Hash an API key the way it is stored in the `applications` table.
+
+    :param api_key: The API key.
+    :type api_key: str
+    :return: The hex SHA-256 digest of the API key.
+    :rtype: str
+    """
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def invalidate_api_key(api_key_hash: str) -> None:
+    """
+    Evict an API key from the caches of this worker, e.g. when its
+    application is created or deactivated. The other workers evict it on
+    their next poll of the revocations, see `ApiKeyRevocations`.
+
+    :param api_key_hash: The digest of the API key.
+    :type api_key_hash: str
+    """
+    api_key_cache.invalidate(api_key_hash)
+    invalid_api_key_cache.invalidate(api_key_hash)
 
-# Allowed API keys for authentication of applications accessing the API
-API_KEYS = [
-    os.getenv("API_KEY_1", None),
-    os.getenv("API_KEY_2", None)
-]
 
 async def get_api_key(
+        bearer_credentials: Optional[HTTPAuthorizationCredentials] = Security(
+            bearer_token),
         query_api_key: str = Security(api_key_query),
         header_api_key: str = Security(api_key_header),
-) -> str:
+        session_factory: async_sessionmaker[AsyncSession] = Depends(
+            get_pg_session_factory),
+) -> AuthenticatedApplication:
+    """
+    Validate the access token, or else the API key, of the request.
+
+    A request with a `Bearer` token is authenticated with the token only,
+    see `verify_access_token`, and a request without one with its API key,
+    see `authenticate_api_key`.
+
+    :param bearer_credentials: The credentials of the Authorization header.
+    :type bearer_credentials: Optional[HTTPAuthorizationCredentials]
+    :param query_api_key: The API key provided in the query parameters.
+    :type query_api_key: str
+    :param header_api_key: The API key provided in the headers.
+    :type header_api_key: str
+    :param session_factory: The session factory of the primary database,
+        only used when the API key is not cached.
+    :type session_factory: async_sessionmaker[AsyncSession]
+    :return: The authenticated application.
+    :rtype: AuthenticatedApplication
+    :raises HTTPException: If the token or API key is invalid or missing.
+    """
+    if bearer_credentials is not None:
+        with measure("auth"), span("auth"):
+            return verify_access_token(bearer_credentials.credentials)
+    return await authenticate_api_key(query_api_key, header_api_key,
+                                      session_factory)
+
+
+async def authenticate_api_key(
+        query_api_key: str = Security(api_key_query),
+        header_api_key: str = Security(api_key_header),
+        session_factory: async_sessionmaker[AsyncSession] = Depends(
+            get_pg_session_factory),
+) -> AuthenticatedApplication:
     """
     Validate the API key provided in the query parameters or headers.
 
     This function checks if the API key provided in the query parameters or
-    headers matches any of the predefined API keys. If a valid API key is
-    found, it is returned. Otherwise, an HTTP 401 Unauthorized exception is
-    raised.
+    headers belongs to an active application. If it does, the application
+    is returned. Otherwise, an HTTP 401 Unauthorized exception is raised.
 
     :param query_api_key: The API key provided in the query parameters.
     :type query_api_key: str
     :param header_api_key: The API key provided in the headers.
     :type header_api_key: str
-    :return: The valid API key.
-    :rtype: str
+    :param session_factory: The session factory of the primary database,
+        only used when the API key is not cached.
+    :type session_factory: async_sessionmaker[AsyncSession]
+    :return: The application of the API key.
+    :rtype: AuthenticatedApplication
     :raises HTTPException: If the API key is invalid or missing.
     """
-    if api_key_query in API_KEYS:
-        return query_api_key
-    if header_api_key in API_KEYS:
-        return header_api_key
+    with measure("auth"), span("auth"):
+        for api_key in (query_api_key, header_api_key):
+            if api_key and (application := await _authenticate(
+                    api_key, session_factory)):
+                return application
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid or missing API Key",
     )
+
+
+async def get_admin_api_key(
+        admin_api_key: str = Security(admin_api_key_header)) -> None:
+    """
+    Validate the admin key of the request, required to manage the
+    applications. Every request is rejected while `auth_admin_api_key` is
+    not set.
+
+    :param admin_api_key: The admin key provided in the headers.
+    :type admin_api_key: str
+    :raises HTTPException: If the admin key is invalid, missing or not set.
+    """
+    if not settings.auth_admin_api_key or not admin_api_key \
+            or not hmac.compare_digest(admin_api_key.encode(),
+                                       settings.auth_admin_api_key.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or missing admin key",
+        )
+
+
+def access_tokens_enabled() -> bool:
+    """
+    Check if the access tokens are enabled, i.e. if `app_jwt_secret_key` is
+    set to a secret of at least `JWT_SECRET_KEY_MIN_LENGTH` characters.
+
+    :return: True if access tokens can be issued and accepted.
+    :rtype: bool
+    """
+    return len(settings.app_jwt_secret_key) >= JWT_SECRET_KEY_MIN_LENGTH
+
+
+def create_access_token(application: AuthenticatedApplication) -> str:
+    """
+    Create an access token for an application, valid for
+    `app_jwt_expire_seconds` seconds.
+
+    :param application: The authenticated application.
+    :type application: AuthenticatedApplication
+    :return: The signed JWT.
+    :rtype: str
+    :raises HTTPException: If the access tokens are disabled.
+    """
+    if not access_tokens_enabled():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Access tokens are not enabled",
+        )
+    now = int(time.time())
+    return encode_jwt({
+        "sub": application.id,
+        "iat": now,
+        "exp": now + settings.app_jwt_expire_seconds,
+        "rate_limit": application.rate_limit,
+        "rate_limit_burst": application.rate_limit_burst,
+    }, settings.app_jwt_secret_key, settings.app_algorithm)
+
+
+def verify_access_token(token: str) -> AuthenticatedApplication:
+    """
+    Verify an access token, from the cache of verified tokens if it was
+    already verified by this worker.
+
+    :param token: The access token.
+    :type token: str
+    :return: The application of the token.
+    :rtype: AuthenticatedApplication
+    :raises HTTPException: If the token is invalid or expired.
+    """
+    if not access_tokens_enabled():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired access token",
+        )
+
+    signing_input, _, signature = token.rpartition(".")
+    if (cached := access_token_cache.get(signature)) is not None \
+            and cached[0] == signing_input:
+        return cached[1]
+
+    try:
+        claims = decode_jwt(token, settings.app_jwt_secret_key,
+                            settings.app_algorithm)
+    except InvalidTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired access token",
+        ) from e
+
+    application = AuthenticatedApplication(
+        claims.get("sub"), claims.get("rate_limit"),
+        claims.get("rate_limit_burst"))
+    access_token_cache.set(signature, (signing_input, application),
+                           ttl=claims["exp"] - time.time())
+    return application
+
+
+async def _authenticate(
+        api_key: str,
+        session_factory: async_sessionmaker[AsyncSession]
+) -> Optional[AuthenticatedApplication]:
+    """
+    Get the active application of an API key, from the caches or else from
+    the database.
+    """
+    api_key_hash = hash_api_key(api_key)
+    if api_key_cache:
+        await api_key_revocations.poll(session_factory)
+    if (application := api_key_cache.get(api_key_hash)) is not None:
+        return application
+    if invalid_api_key_cache.get(api_key_hash):
+        return None
+
+    generation = api_key_cache.generation
+    async with session_factory() as db:
+        row = (await db.execute(
+            select(ApplicationModel.id, ApplicationModel.api_key,
+                   ApplicationModel.rate_limit,
+                   ApplicationModel.rate_limit_burst)
+            .where(ApplicationModel.api_key == api_key_hash,
+                   ApplicationModel.is_active.is_(True),
+                   ApplicationModel.deleted_at.is_(None))
+        )).one_or_none()
+
+    if row is None or not hmac.compare_digest(row.api_key, api_key_hash):
+        invalid_api_key_cache.set(api_key_hash, True)
+        return None
+
+    application = AuthenticatedApplication(
+        row.id, row.rate_limit, row.rate_limit_burst)
+    api_key_cache.set(api_key_hash, application, generation=generation)
+    return application
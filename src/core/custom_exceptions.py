@@ -138,6 +138,18 @@ class NotFoundException(BaseCustomException):
             message, 404, 'NotFoundException')
 
 
+class RateLimitException(BaseCustomException):
+    """
+    Exception raised when a client exceeds its rate limit.
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        self.detail = message
+        self.retry_after = retry_after
+        super().__init__(
+            message, 429, 'RateLimitException')
+
+
 class ValidationException(BaseCustomException):
     """
     Exception raised for errors when a validation error occurs.
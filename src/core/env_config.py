@@ -8,7 +8,7 @@ This module contains the configuration settings for the FastAPI application.
 
 from functools import lru_cache
 
-from pydantic import Field
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -41,26 +41,104 @@ class Settings(BaseSettings):
     app_reload: bool = Field(
         default=True,
         json_schema_extra={"env_name": "APP_RELOAD"})
+    # The worker processes sharing the database connections budget, read
+    # from WEB_CONCURRENCY first, which sets the workers of the uvicorn
+    # command line, so the budget cannot be split for fewer workers than
+    # actually run...
+    app_workers: int = Field(
+        default=1,
+        validation_alias=AliasChoices("WEB_CONCURRENCY", "APP_WORKERS"),
+        json_schema_extra={"env_name": "APP_WORKERS"})
     app_logger_name: str = Field(
         default="application_logger",
         json_schema_extra={"env_name": "LOGGER_NAME"})
 
+    # --- API settings -------------------------------------------------------
+    api_page_size_default: int = Field(
+        default=50,
+        json_schema_extra={"env_name": "API_PAGE_SIZE_DEFAULT"})
+    api_page_size_max: int = Field(
+        default=500,
+        json_schema_extra={"env_name": "API_PAGE_SIZE_MAX"})
+    api_bulk_max_rows: int = Field(
+        default=10000,
+        json_schema_extra={"env_name": "API_BULK_MAX_ROWS"})
+    api_batch_max_ids: int = Field(
+        default=1000,
+        json_schema_extra={"env_name": "API_BATCH_MAX_IDS"})
+    api_server_timing: bool = Field(
+        default=False,
+        json_schema_extra={"env_name": "API_SERVER_TIMING"})
+
+    # --- Health Check settings ----------------------------------------------
+    health_check_timeout: float = Field(
+        default=2.0,
+        json_schema_extra={"env_name": "HEALTH_CHECK_TIMEOUT"})
+    health_check_cache_ttl: float = Field(
+        default=5.0,
+        json_schema_extra={"env_name": "HEALTH_CHECK_CACHE_TTL"})
+
+    # --- Cache settings -----------------------------------------------------
+    user_cache_max_size: int = Field(
+        default=10000,
+        json_schema_extra={"env_name": "USER_CACHE_MAX_SIZE"})
+    user_cache_ttl: float = Field(
+        default=30.0,
+        json_schema_extra={"env_name": "USER_CACHE_TTL"})
+
     # --- Secret Keys (JWT) --------------------------------------------------
     app_algorithm: str = Field(
         default="HS256",
         json_schema_extra={"env_name": "APP_ALGORITHM"})
     app_jwt_secret_key: str = Field(
-        default="a_secret_key",
+        default="",
         json_schema_extra={"env_name": "APP_JWT_SECRET_KEY"})
+    app_jwt_expire_seconds: int = Field(
+        default=300,
+        json_schema_extra={"env_name": "APP_JWT_EXPIRE_SECONDS"})
 
     # --- Applications registered with the API -------------------------------
-    app_1_api_key: str = Field(
-        default=None,
-        json_schema_extra={"env_name": "APP_1_API_KEY"})
+    auth_admin_api_key: str = Field(
+        default="",
+        json_schema_extra={"env_name": "AUTH_ADMIN_API_KEY"})
+    auth_api_key_cache_max_size: int = Field(
+        default=10000,
+        json_schema_extra={"env_name": "AUTH_API_KEY_CACHE_MAX_SIZE"})
+    auth_api_key_cache_ttl: float = Field(
+        default=30.0,
+        json_schema_extra={"env_name": "AUTH_API_KEY_CACHE_TTL"})
+    auth_api_key_negative_cache_ttl: float = Field(
+        default=5.0,
+        json_schema_extra={"env_name": "AUTH_API_KEY_NEGATIVE_CACHE_TTL"})
+    auth_api_key_revocation_interval: float = Field(
+        default=1.0,
+        json_schema_extra={"env_name": "AUTH_API_KEY_REVOCATION_INTERVAL"})
+    auth_token_cache_max_size: int = Field(
+        default=10000,
+        json_schema_extra={"env_name": "AUTH_TOKEN_CACHE_MAX_SIZE"})
 
-    # app_2_api_key: str = Field(
-    #     default=None,
-    #     json_schema_extra={"env_name": "APP_1_API_KEY"})
+    # --- Rate limit settings ------------------------------------------------
+    rate_limit_enabled: bool = Field(
+        default=True,
+        json_schema_extra={"env_name": "RATE_LIMIT_ENABLED"})
+    rate_limit_backend: str = Field(
+        default="memory",
+        json_schema_extra={"env_name": "RATE_LIMIT_BACKEND"})
+    rate_limit_default_rate: float = Field(
+        default=50.0,
+        json_schema_extra={"env_name": "RATE_LIMIT_DEFAULT_RATE"})
+    rate_limit_default_burst: int = Field(
+        default=100,
+        json_schema_extra={"env_name": "RATE_LIMIT_DEFAULT_BURST"})
+    rate_limit_ip_rate: float = Field(
+        default=20.0,
+        json_schema_extra={"env_name": "RATE_LIMIT_IP_RATE"})
+    rate_limit_ip_burst: int = Field(
+        default=40,
+        json_schema_extra={"env_name": "RATE_LIMIT_IP_BURST"})
+    rate_limit_max_buckets: int = Field(
+        default=100000,
+        json_schema_extra={"env_name": "RATE_LIMIT_MAX_BUCKETS"})
 
     # --- Console Logger settings --------------------------------------------
     console_logger_level: str = Field(
@@ -98,6 +176,42 @@ class Settings(BaseSettings):
     file_logger_propagate: bool = Field(
         default=False,
         json_schema_extra={"env_name": "FILE_LOGGER_PROPAGATE"})
+    file_logger_json: bool = Field(
+        default=False,
+        json_schema_extra={"env_name": "FILE_LOGGER_JSON"})
+
+    # --- Logger sampling settings -------------------------------------------
+    logger_sampling_rates: dict[str, float] = Field(
+        default={},
+        json_schema_extra={"env_name": "LOGGER_SAMPLING_RATES"})
+
+    # --- Tracing settings ---------------------------------------------------
+    tracing_sample_rate: float = Field(
+        default=0.0,
+        json_schema_extra={"env_name": "TRACING_SAMPLE_RATE"})
+    tracing_buffer_size: int = Field(
+        default=1000,
+        json_schema_extra={"env_name": "TRACING_BUFFER_SIZE"})
+    tracing_file_name: str = Field(
+        default="fastapi_traces.jsonl",
+        json_schema_extra={"env_name": "TRACING_FILE_NAME"})
+    tracing_file_size: int = Field(
+        default=1000000,
+        json_schema_extra={"env_name": "TRACING_FILE_SIZE"})
+    tracing_file_count: int = Field(
+        default=3,
+        json_schema_extra={"env_name": "TRACING_FILE_COUNT"})
+
+    # --- WebSocket settings -------------------------------------------------
+    websocket_send_queue_size: int = Field(
+        default=100,
+        json_schema_extra={"env_name": "WEBSOCKET_SEND_QUEUE_SIZE"})
+    websocket_slow_consumer_policy: str = Field(
+        default="drop_oldest",
+        json_schema_extra={"env_name": "WEBSOCKET_SLOW_CONSUMER_POLICY"})
+    websocket_send_timeout: float = Field(
+        default=5.0,
+        json_schema_extra={"env_name": "WEBSOCKET_SEND_TIMEOUT"})
 
     # --- Postgres Database --------------------------------------------------
     pg_db_url: str = Field(
@@ -131,6 +245,15 @@ class Settings(BaseSettings):
     pg_db_max_overflow: int = Field(
         default=0,
         json_schema_extra={"env_name": "PG_DB_MAX_OVERFLOW"})
+    pg_db_pool_min_size: int = Field(
+        default=5,
+        json_schema_extra={"env_name": "PG_DB_POOL_MIN_SIZE"})
+    pg_db_max_connections: int = Field(
+        default=90,
+        json_schema_extra={"env_name": "PG_DB_MAX_CONNECTIONS"})
+    pg_db_pool_recycle: int = Field(
+        default=-1,
+        json_schema_extra={"env_name": "PG_DB_POOL_RECYCLE"})
     pg_db_echo: bool = Field(
         default=False,
         json_schema_extra={"env_name": "PG_DB_ECHO"})
@@ -149,6 +272,39 @@ class Settings(BaseSettings):
     pg_db_expire_on_commit: bool = Field(
         default=False,
         json_schema_extra={"env_name": "PG_DB_EXPIRE_ON_COMMIT"})
+    pg_db_stream_chunk_size: int = Field(
+        default=1000,
+        json_schema_extra={"env_name": "PG_DB_STREAM_CHUNK_SIZE"})
+    pg_db_bulk_chunk_size: int = Field(
+        default=1000,
+        json_schema_extra={"env_name": "PG_DB_BULK_CHUNK_SIZE"})
+    pg_db_insert_coalescing: bool = Field(
+        default=False,
+        json_schema_extra={"env_name": "PG_DB_INSERT_COALESCING"})
+    pg_db_insert_coalescing_window: float = Field(
+        default=0.005,
+        json_schema_extra={"env_name": "PG_DB_INSERT_COALESCING_WINDOW"})
+    pg_db_insert_coalescing_max_rows: int = Field(
+        default=500,
+        json_schema_extra={"env_name": "PG_DB_INSERT_COALESCING_MAX_ROWS"})
+    pg_db_slow_query_threshold: float = Field(
+        default=0.5,
+        json_schema_extra={"env_name": "PG_DB_SLOW_QUERY_THRESHOLD"})
+    pg_db_slow_query_explain: bool = Field(
+        default=False,
+        json_schema_extra={"env_name": "PG_DB_SLOW_QUERY_EXPLAIN"})
+    pg_db_n_plus_one_threshold: int = Field(
+        default=10,
+        json_schema_extra={"env_name": "PG_DB_N_PLUS_ONE_THRESHOLD"})
+    pg_db_read_replica_urls: list[str] = Field(
+        default=[],
+        json_schema_extra={"env_name": "PG_DB_READ_REPLICA_URLS"})
+    pg_db_read_your_writes_window: float = Field(
+        default=5.0,
+        json_schema_extra={"env_name": "PG_DB_READ_YOUR_WRITES_WINDOW"})
+    pg_db_read_your_writes_clients: int = Field(
+        default=10000,
+        json_schema_extra={"env_name": "PG_DB_READ_YOUR_WRITES_CLIENTS"})
     pg_db_volume_path: str = Field(
         default="/var/lib/postgresql/data",
         json_schema_extra={"env_name": "PG_DB_VOLUME_PATH"})
@@ -7,14 +7,15 @@ Exception handlers module for the FastAPI application.
 """
 
 import logging
+import math
 
 from fastapi import Request, HTTPException
-from fastapi.responses import ORJSONResponse
 
 from src.core.custom_exceptions import AuthException, BadRequestException, \
     ConflictException, DatabaseException, InternalServerException, \
-    NotFoundException, ValidationException
+    NotFoundException, RateLimitException, ValidationException
 from src.core.env_config import get_settings
+from src.core.responses import ORJSONResponse
 
 settings = get_settings()
 logger = logging.getLogger(
@@ -96,6 +97,21 @@ async def not_found_exception_handler(
     )
 
 
+async def rate_limit_exception_handler(
+        _request: Request,
+        exc: RateLimitException) -> ORJSONResponse:
+    """
+    Exception handler for RateLimitException exceptions, telling the client
+    when to retry in the `Retry-After` header.
+    """
+    logger.debug("RateLimitException: %s", exc)
+    return ORJSONResponse(
+        status_code=exc.status_code,
+        content={"message": exc.detail},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    )
+
+
 async def validation_exception_handler(
         _request: Request,
         exc: ValidationException) -> ORJSONResponse:
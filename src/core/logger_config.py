@@ -4,20 +4,110 @@
 
 """
 This module contains the logger configuration for the FastAPI application.
+
+The application logger only puts its records on a queue, with a
+`QueueHandler`, and a `QueueListener` thread formats and writes them to the
+console and to a size rotated log file. Logging from the event loop never
+waits for the console or the disk. High-volume child loggers can be sampled
+with the `logger_sampling_rates` setting.
 """
 
+import atexit
 import datetime
-import logging.config
+import logging
 import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener, \
+    RotatingFileHandler
 
+import orjson
 import uvicorn
 
 from src.core.env_config import get_settings
 
+# The queue listeners of the configured loggers, keyed by logger name...
+_queue_listeners: dict[str, QueueListener] = {}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a log record as a single line JSON object.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Format the record as JSON.
+
+        :param record: The log record.
+        :type record: logging.LogRecord
+        :return: The JSON object of the record.
+        :rtype: str
+        """
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "name": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry).decode("utf-8")
+
+
+# pylint: disable-next=too-few-public-methods
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one in every `1 / rate` records of the loggers with a sampling
+    rate, matched by logger name or by the name of a parent logger. Records
+    at WARNING level and above are never dropped.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        """
+        Constructor method for the SamplingFilter class.
+
+        :param rates: The fraction of the records to keep, keyed by logger
+            name, e.g. `{"application_logger.web_socket": 0.01}`.
+        :type rates: dict[str, float]
+        """
+        super().__init__()
+        self._intervals = {name: round(1 / rate) if rate > 0 else 0
+                           for name, rate in rates.items()}
+        self._counters: dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Decide if a record is logged.
+
+        :param record: The log record.
+        :type record: logging.LogRecord
+        :return: True to log the record.
+        :rtype: bool
+        """
+        if record.levelno >= logging.WARNING:
+            return True
+
+        name = record.name
+        while name not in self._intervals:
+            if "." not in name:
+                return True
+            name = name.rsplit(".", 1)[0]
+
+        interval = self._intervals[name]
+        if interval == 0:
+            return False
+        count = self._counters.get(name, 0)
+        self._counters[name] = count + 1
+        return count % interval == 0
+
 
 def init_logger(input_logger_name: str = None) -> logging.Logger:
     """
     Initialize the logger for the FastAPI application.
+
+    Calling it again replaces the handlers and the queue listener of the
+    logger, so it is safe to call more than once.
     """
 
     # Initialize settings from environment configuration
@@ -25,7 +115,7 @@ def init_logger(input_logger_name: str = None) -> logging.Logger:
     logger_name = (settings.app_logger_name or input_logger_name
                    or 'application_logger')
 
-    # Define the logging configuration dictionary
+    # Define the log file path
     log_dir = settings.file_logger_dir or 'logs'
     startup_time = datetime.datetime.utcnow().strftime('%Y-%m-%d')
     file_name = str(startup_time + "_" + settings.file_logger_file_name or
@@ -33,55 +123,67 @@ def init_logger(input_logger_name: str = None) -> logging.Logger:
     os.makedirs(log_dir, exist_ok=True)
     log_file_path = os.path.join(log_dir, file_name)
 
-    log_config = {
-        'version': 1,
-        'disable_existing_loggers': False,
-        'formatters': {
-            'uvicorn_console': {
-                '()': uvicorn.logging.DefaultFormatter,
-                'fmt': '%(levelprefix)s %(asctime)s | %(message)s',
-                'datefmt': '%Y-%m-%d %H:%M:%S',
-            },
-            'uvicorn_access': {
-                '()': uvicorn.logging.AccessFormatter,
-                'fmt': '%(levelprefix)s %(asctime)s | %(client_addr)s - '
-                       '"%(request_line)s" %(status_code)s',
-                'datefmt': '%Y-%m-%d %H:%M:%S',
-            },
-            'default': {
-                'format': '%(asctime)s - %(name)s - '
-                          '%(levelname)s - %(message)s',
-                'datefmt': '%Y-%m-%d %H:%M:%S',
-            }
-        },
-        'handlers': {
-            'console_logger_handler': {
-                'class': 'logging.StreamHandler',
-                'level': settings.console_logger_level or 'DEBUG',
-                'formatter': 'uvicorn_console',
-                'stream': 'ext://sys.stdout',
-            },
-            'file_logger_handler': {
-                'class': 'logging.FileHandler',
-                'level': settings.file_logger_level or 'INFO',
-                'formatter': 'default',
-                'filename': log_file_path,
-                'mode': settings.file_logger_mode or 'w',
-            }
-        },
-        'loggers': {
-            logger_name: {
-                'level': settings.console_logger_level or 'DEBUG',
-                'handlers': ['console_logger_handler', 'file_logger_handler'],
-                'propagate': False,
-            }
-        },
-    }
-
-    # Apply the logging configuration
-    logging.config.dictConfig(log_config)
-
-    # Get the loggers
+    # Create the handlers writing the records, on the listener thread...
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(settings.console_logger_level or 'DEBUG')
+    console_handler.setFormatter(uvicorn.logging.DefaultFormatter(
+        fmt='%(levelprefix)s %(asctime)s | %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'))
+
+    file_handler = RotatingFileHandler(
+        log_file_path,
+        mode=settings.file_logger_mode or 'a',
+        maxBytes=settings.file_logger_file_size,
+        backupCount=settings.file_logger_file_count,
+        encoding='utf-8')
+    file_handler.setLevel(settings.file_logger_level or 'INFO')
+    file_handler.setFormatter(
+        JsonFormatter(datefmt='%Y-%m-%dT%H:%M:%S%z')
+        if settings.file_logger_json else
+        logging.Formatter(settings.file_logger_format,
+                          datefmt='%Y-%m-%d %H:%M:%S'))
+
+    # Create the handler putting the records on the queue...
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    if settings.logger_sampling_rates:
+        queue_handler.addFilter(
+            SamplingFilter(settings.logger_sampling_rates))
+
+    # Replace the handlers and listener of a previous initialization...
+    shutdown_logger(logger_name)
     logger = logging.getLogger(logger_name)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+
+    logger.setLevel(settings.console_logger_level or 'DEBUG')
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    listener = QueueListener(log_queue, console_handler, file_handler,
+                             respect_handler_level=True)
+    listener.start()
+    _queue_listeners[logger_name] = listener
 
     return logger
+
+
+def shutdown_logger(logger_name: str = None) -> None:
+    """
+    Stop the queue listener of a logger, after it wrote the queued records,
+    and close its handlers.
+
+    :param logger_name: The name of the logger, defaults to all loggers.
+    :type logger_name: str
+    """
+    names = [logger_name] if logger_name else list(_queue_listeners)
+    for name in names:
+        if (listener := _queue_listeners.pop(name, None)) is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
+
+# Write the queued records when the process exits...
+atexit.register(shutdown_logger)
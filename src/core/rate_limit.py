@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+This module contains the rate limiting of the FastAPI application.
+
+The routes authenticated with an API key are limited per application, with
+the `rate_limit` and `rate_limit_burst` of the application, or the default
+limits when they are not set. The public routes, the health probes, are
+limited per client IP. A request over the limit is rejected with 429 Too
+Many Requests and a `Retry-After` header.
+
+The failed authentications on the authenticated routes take a token from
+the bucket of the client IP too, see `rate_limit_failed_auth_by_ip`, since
+every unknown API key costs a query of the primary database. Once the
+bucket of an address is empty, its requests are rejected before their API
+key is looked up, until the bucket holds a token again.
+
+The token buckets are kept by the backend selected with
+`rate_limit_backend`, see `src.utils.rate_limiter`:
+
+- `memory`: in the worker process, the limits apply per worker.
+- `sql`: in the primary Postgres database, the limits apply across every
+  worker.
+
+The health probes are always limited in the worker process, so a probe
+never queries the database it may be probing, and a storm of probes never
+turns into a storm of queries. A backend that fails, e.g. while the
+database is unreachable, lets the requests through instead of failing
+them.
+"""
+
+import logging
+import time
+from collections.abc import AsyncIterator
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, status
+
+from src.core.auth import AuthenticatedApplication, get_api_key
+from src.core.custom_exceptions import RateLimitException
+from src.core.env_config import get_settings
+from src.db.connectors.postgres_db import session_manager
+from src.utils.rate_limiter import InMemoryRateLimitBackend, \
+    RateLimitBackend, SqlRateLimitBackend
+from src.utils.request_timing import measure
+from src.utils.ttl_cache import TTLCache
+
+settings = get_settings()
+logger = logging.getLogger(
+    f"{settings.app_logger_name or 'application_logger'}.rate_limit")
+
+# Client addresses out of tokens after a failed authentication, with the
+# monotonic time their bucket holds a token again, so their requests are
+# rejected without looking up their API key in the meantime...
+blocked_addresses = TTLCache(max_size=settings.rate_limit_max_buckets, ttl=0)
+
+
+def create_rate_limit_backend(name: str) -> RateLimitBackend:
+    """
+    Create the rate limit backend of a name.
+
+    :param name: The name of the backend, `memory` or `sql`.
+    :type name: str
+    :return: The backend.
+    :rtype: RateLimitBackend
+    :raises ValueError: If there is no backend of the name.
+    """
+    if name == "memory":
+        return InMemoryRateLimitBackend(
+            max_size=settings.rate_limit_max_buckets)
+    if name == "sql":
+        return SqlRateLimitBackend(session_manager.get_session_maker)
+    raise ValueError(f"Unknown rate limit backend: {name}")
+
+
+rate_limit_backend = create_rate_limit_backend(settings.rate_limit_backend)
+probe_rate_limit_backend = create_rate_limit_backend("memory")
+
+
+async def rate_limit_by_api_key(
+        application: AuthenticatedApplication = Depends(get_api_key)) -> None:
+    """
+    Take a token from the bucket of the application of the API key.
+
+    :param application: The application of the API key.
+    :type application: AuthenticatedApplication
+    :raises RateLimitException: If the application exceeds its limit.
+    """
+    await _acquire(
+        f"application:{application.id}",
+        application.rate_limit or settings.rate_limit_default_rate,
+        application.rate_limit_burst or settings.rate_limit_default_burst)
+
+
+async def rate_limit_by_ip(request: Request) -> None:
+    """
+    Take a token from the bucket of the IP address of the client, kept in
+    the worker process whatever the `rate_limit_backend`.
+
+    :param request: The request.
+    :type request: Request
+    :raises RateLimitException: If the client exceeds the limit.
+    """
+    await _acquire(_ip_key(request), settings.rate_limit_ip_rate,
+                   settings.rate_limit_ip_burst, probe_rate_limit_backend)
+
+
+async def rate_limit_failed_auth_by_ip(
+        request: Request) -> AsyncIterator[None]:
+    """
+    Take a token from the bucket of the IP address of the client when the
+    authentication of the request fails. Declared before the
+    authentication, it rejects the requests of an address out of tokens
+    before their API key is looked up.
+
+    :param request: The request.
+    :type request: Request
+    :raises RateLimitException: If the client exceeds the limit.
+    """
+    key = _ip_key(request)
+    if settings.rate_limit_enabled \
+            and (blocked_until := blocked_addresses.get(key)) is not None:
+        raise RateLimitException(message="Rate limit exceeded",
+                                 retry_after=blocked_until - time.monotonic())
+
+    try:
+        yield
+    except HTTPException as e:
+        if e.status_code != status.HTTP_401_UNAUTHORIZED \
+                or not settings.rate_limit_enabled:
+            raise
+        retry_after = await _take(rate_limit_backend, key,
+                                  settings.rate_limit_ip_rate,
+                                  settings.rate_limit_ip_burst)
+        if retry_after > 0:
+            blocked_addresses.set(key, time.monotonic() + retry_after,
+                                  ttl=retry_after)
+            raise RateLimitException(message="Rate limit exceeded",
+                                     retry_after=retry_after) from e
+        raise
+
+
+def _ip_key(request: Request) -> str:
+    """
+    Get the bucket key of the IP address of the client of a request.
+    """
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def _acquire(key: str, rate: float, burst: int,
+                   backend: Optional[RateLimitBackend] = None) -> None:
+    """
+    Take a token from the bucket of a key, from the `rate_limit_backend`
+    unless another backend is given, or raise a RateLimitException.
+    """
+    if not settings.rate_limit_enabled:
+        return
+
+    retry_after = await _take(backend or rate_limit_backend, key, rate, burst)
+    if retry_after > 0:
+        raise RateLimitException(message="Rate limit exceeded",
+                                 retry_after=retry_after)
+
+
+async def _take(backend: RateLimitBackend, key: str, rate: float,
+                burst: int) -> float:
+    """
+    Take a token from the bucket of a key, returning the seconds to wait
+    for one. A request is let through if the backend fails.
+    """
+    with measure("rate_limit"):
+        try:
+            return await backend.acquire(key, rate, burst)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("Rate limit backend failed, letting the request "
+                           "through: %r", e)
+            return 0.0
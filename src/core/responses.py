@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Response classes module for the FastAPI application.
+"""
+
+from typing import Any
+
+from fastapi.responses import ORJSONResponse as FastAPIORJSONResponse
+
+from src.utils.request_timing import measure
+from src.utils.tracing import span
+
+
+class ORJSONResponse(FastAPIORJSONResponse):
+    """
+    The FastAPI `ORJSONResponse`, with the serialization of the content
+    measured as the `serialize` phase of the request timings and traced as
+    a `serialize` span.
+    """
+
+    def render(self, content: Any) -> bytes:
+        """
+        Serialize the content with orjson.
+
+        :param content: The content of the response.
+        :type content: Any
+        :return: The serialized content.
+        :rtype: bytes
+        """
+        with measure("serialize"), span("serialize"):
+            return super().render(content)
@@ -15,11 +15,13 @@ Each class includes a detailed docstring with information about its purpose.
 """
 
 import logging
-
-from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import ConnectionFailure
+from typing import TYPE_CHECKING
 
 from src.core.env_config import get_settings
+from src.utils.tracing import trace
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient
 
 settings = get_settings()
 logger = logging.getLogger(settings.app_logger_name)
@@ -42,7 +44,7 @@ class MongoDBConnector:
     _instance = None
     _uri = None
 
-    def __new__(cls, uri) -> AsyncIOMotorClient:
+    def __new__(cls, uri) -> "AsyncIOMotorClient":
         """
         Creates a single instance of the MongoDBConnector class.
 
@@ -51,9 +53,14 @@ class MongoDBConnector:
         :return: The MongoDBConnector instance.
         :rtype: MongoDBConnector
         """
-        logger.info("Initializing the MongoDBConnector instance...")
-
         if cls._instance is None:
+            logger.info("Initializing the MongoDBConnector instance...")
+
+            # Motor and pymongo are imported on first use, they are slow to
+            # import and not needed by processes that never talk to Mongo...
+            # pylint: disable=import-outside-toplevel
+            from motor.motor_asyncio import AsyncIOMotorClient
+
             cls._instance = super(MongoDBConnector, cls).__new__(cls)
             cls._uri = uri
             cls._client = AsyncIOMotorClient(cls._uri)
@@ -75,13 +82,17 @@ class MongoDBConnector:
         """
         Asynchronously tests the connection to the MongoDB deployment.
         """
+        # pylint: disable=import-outside-toplevel
+        from pymongo.errors import ConnectionFailure
+
         logger.info("Testing the MongoDB Connection...")
 
         try:
-            await self._client.admin.command('ping')
-            print("Successfully CONNECTED to MongoDB!")
+            with trace("mongo.ping"):
+                await self._client.admin.command('ping')
+            logger.info("Successfully connected to MongoDB...")
         except ConnectionFailure as e:
-            print(f"Failed to connect to MongoDB:\n{e}")
+            logger.error("Failed to connect to MongoDB: %s", e)
             raise
 
     def get_collection(self, collection_name: str):
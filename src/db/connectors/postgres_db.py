@@ -10,15 +10,24 @@ PostgreSQL database connection using SQLAlchemy's asynchronous engine and
 session maker.
 """
 
+import asyncio
 import logging
+import math
+import time
 from asyncio import current_task
 from collections.abc import AsyncIterator
+from itertools import count
+from typing import Optional
 
+from fastapi import Request
 from sqlalchemy.ext.asyncio import async_sessionmaker, async_scoped_session, \
-    create_async_engine, AsyncSession
+    create_async_engine, AsyncConnection, AsyncEngine, AsyncSession
 
 from src.core.custom_exceptions import DatabaseException
 from src.core.env_config import get_settings
+from src.utils import sql_instrumentation
+from src.utils.pool_metrics import InstrumentedAsyncAdaptedQueuePool
+from src.utils.ttl_cache import TTLCache
 
 settings = get_settings()
 logger = logging.getLogger(settings.app_logger_name)
@@ -29,6 +38,12 @@ class PgsqlDbSessionManager:
     A session manager class for the Postgres database connection within a
     FastAPI application. This class manages the creation and disposal of
     asynchronous database sessions using SQLAlchemy.
+
+    The engines, and with them the connection pools, are not created when
+    the instance is, but opened with `open` and `warm_up` and disposed with
+    `close_session` by the application lifespan, or opened on first use by
+    processes without the lifespan. The same pool is shared by the ORM
+    sessions and the raw SQL connections of a worker.
     """
 
     def __init__(self, db_connection_str: str = None):
@@ -36,8 +51,8 @@ class PgsqlDbSessionManager:
         Constructor method for the PgsqlDbSessionManager class to
         initialize the database connection instance.
 
-        This method sets up the database connection string, creates the
-        asynchronous database engine, session maker, and scoped session.
+        This method sets up the database connection string. The engine,
+        session maker and scoped session are created by `open`.
 
         :param db_connection_str: The database connection string.
         :type db_connection_str: str
@@ -56,32 +71,123 @@ class PgsqlDbSessionManager:
             self._postgres_database_url = db_connection_str.replace(
                 "postgresql://", "postgresql+asyncpg://")
 
-        # Create the async database engine...
+        self.pgsql_db_engine: Optional[AsyncEngine] = None
+        self.session_maker: Optional[async_sessionmaker[AsyncSession]] = None
+        self.scoped_session: Optional[async_scoped_session] = None
+        self.read_replicas: list[
+            tuple[AsyncEngine, async_sessionmaker[AsyncSession]]] = []
+        self._read_replica_counter = count()
+
+    def open(self) -> None:
+        """
+        Create the database engines and session makers, if they are not
+        created yet. No connection is opened until the first checkout or
+        until `warm_up` is awaited.
+        """
+        if self.pgsql_db_engine is not None:
+            return
+
+        pool_size, max_overflow = get_pool_limits()
+        logger.info("Opening the database pools with pool_size=%s and "
+                    "max_overflow=%s per worker...", pool_size, max_overflow)
+
+        # Create the async database engine and session maker...
+        self.pgsql_db_engine, self.session_maker = \
+            self._create_engine_and_session_maker(
+                self._postgres_database_url, pool_size, max_overflow)
+
+        # Create the read replica engines and session makers...
+        self.read_replicas = [
+            self._create_engine_and_session_maker(
+                replica_url.replace("postgresql://", "postgresql+asyncpg://"),
+                pool_size, max_overflow)
+            for replica_url in settings.pg_db_read_replica_urls
+        ]
+
+        # Create the scoped session...
+        logger.info("Creating the scoped session...")
+        self.scoped_session = async_scoped_session(
+            self.session_maker,
+            scopefunc=current_task,
+        )
+
+    async def warm_up(self) -> None:
+        """
+        Open `pg_db_pool_min_size` connections in every pool and return
+        them to the pool, so the first requests after a start do not pay
+        for the connection handshakes.
+
+        A database that cannot be reached is logged and does not fail the
+        start of the application, the pools connect on demand instead and
+        the readiness check reports the database as unreachable.
+        """
+        self.open()
+        connection_count = min(settings.pg_db_pool_min_size,
+                               get_pool_limits()[0])
+        if connection_count < 1:
+            return
+
+        logger.info("Pre-warming %s connections per database pool...",
+                    connection_count)
+        engines = [self.pgsql_db_engine,
+                   *(engine for engine, _ in self.read_replicas)]
+        connections = await asyncio.gather(
+            *(engine.connect().start()
+              for engine in engines for _ in range(connection_count)),
+            return_exceptions=True)
+        await asyncio.gather(
+            *(connection.close() for connection in connections
+              if not isinstance(connection, BaseException)),
+            return_exceptions=True)
+
+        if errors := [connection for connection in connections
+                      if isinstance(connection, Exception)]:
+            logger.warning("Pre-warming failed for %s of %s connections, "
+                           "the databases may be unreachable: %r",
+                           len(errors), len(connections), errors[0])
+
+    @staticmethod
+    def _create_engine_and_session_maker(
+            database_url: str, pool_size: int, max_overflow: int) -> \
+            tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
+        """
+        Create an async database engine, with its own connection pool, and
+        a session maker bound to it.
+
+        :param database_url: The asyncpg database connection string.
+        :type database_url: str
+        :param pool_size: The number of connections kept in the pool.
+        :type pool_size: int
+        :param max_overflow: The number of connections opened on top of
+            the pool size under load.
+        :type max_overflow: int
+        :return: The engine and the session maker.
+        :rtype: tuple[AsyncEngine, async_sessionmaker[AsyncSession]]
+        """
         logger.info("Creating the async database engine...")
-        self.pgsql_db_engine = create_async_engine(
-            self._postgres_database_url,
+        engine = create_async_engine(
+            database_url,
             future=settings.pg_db_future,
             echo=settings.pg_db_echo,
-            pool_size=settings.pg_db_connection_pool_size,
-            max_overflow=settings.pg_db_max_overflow,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_pre_ping=settings.pg_db_pre_ping,
+            pool_recycle=settings.pg_db_pool_recycle,
+            poolclass=InstrumentedAsyncAdaptedQueuePool,
         )
+        engine.pool.metrics.listen(engine.pool)
+        sql_instrumentation.listen(engine)
 
-        # Create the async session maker...
         logger.info("Creating the async session maker...")
-        self.session_maker = async_sessionmaker(
+        session_maker = async_sessionmaker(
             autocommit=settings.pg_db_auto_commit,
             autoflush=settings.pg_db_auto_flush,
-            bind=self.pgsql_db_engine,
+            bind=engine,
             class_=AsyncSession,
             expire_on_commit=settings.pg_db_expire_on_commit,
         )
 
-        # Create the scoped session...
-        logger.info("Creating the scoped session...")
-        self.scoped_session = async_scoped_session(
-            self.session_maker,
-            scopefunc=current_task,
-        )
+        return engine, session_maker
 
     def get_session(self) -> AsyncSession:
         """
@@ -90,40 +196,130 @@ class PgsqlDbSessionManager:
         :return: A new asynchronous database session.
         :rtype: AsyncSession
         """
-        return self.session_maker()
+        return self.get_session_maker()()
+
+    def get_session_maker(self) -> async_sessionmaker[AsyncSession]:
+        """
+        Get the session maker of the primary database, opening the engines
+        on first use if the lifespan did not open them.
+
+        :return: The session maker of the primary database.
+        :rtype: async_sessionmaker[AsyncSession]
+        """
+        if self.session_maker is None:
+            self.open()
+        return self.session_maker
+
+    def get_engine(self) -> AsyncEngine:
+        """
+        Get the engine of the primary database, for raw SQL connections
+        sharing the pool of the ORM sessions, opening the engines on first
+        use if the lifespan did not open them.
+
+        :return: The engine of the primary database.
+        :rtype: AsyncEngine
+        """
+        if self.pgsql_db_engine is None:
+            self.open()
+        return self.pgsql_db_engine
+
+    def get_read_session_maker(self) -> async_sessionmaker[AsyncSession]:
+        """
+        Get the session maker of a read replica for read-only work.
+
+        Replicas are picked round-robin, skipping ahead to the replica with
+        the fewest checked out connections, so a replica with slow queries
+        does not keep receiving its share of the reads. Without replicas the
+        primary session maker is returned.
+
+        :return: The session maker of the selected read replica.
+        :rtype: async_sessionmaker[AsyncSession]
+        """
+        if self.pgsql_db_engine is None:
+            self.open()
+        if not self.read_replicas:
+            return self.session_maker
+
+        start = next(self._read_replica_counter) % len(self.read_replicas)
+        candidates = self.read_replicas[start:] + self.read_replicas[:start]
+        _, session_maker = min(
+            candidates, key=lambda replica: replica[0].pool.checkedout())
+        return session_maker
+
+    def pool_stats(self) -> dict[str, dict]:
+        """
+        Get the statistics of the connection pools, see `PoolMetrics`.
+
+        :return: The statistics of the primary pool, keyed `primary`, and of
+            the read replica pools, keyed `replica_<index>`. Empty if the
+            pools are not opened.
+        :rtype: dict[str, dict]
+        """
+        if self.pgsql_db_engine is None:
+            return {}
+
+        engines = {"primary": self.pgsql_db_engine} | {
+            f"replica_{index}": engine
+            for index, (engine, _) in enumerate(self.read_replicas)}
+        return {name: engine.pool.metrics.snapshot(engine.pool)
+                for name, engine in engines.items()}
 
     async def close_session(self):
         """
         Close the asynchronous database session. This method disposes of
-        the database engine, effectively closing all active sessions.
+        the database engines, effectively closing all pooled connections.
 
         :raises DatabaseException: If the database engine is not initialized.
         :return: None
         """
-        if self.pgsql_db_engine is not None:
+        if self.pgsql_db_engine is None:
             raise DatabaseException("Database engine is not initialized...")
-        await self.pgsql_db_engine.dispose()
 
-    @staticmethod
-    def get_db_connection_str() -> str:
-        """
-         Get the Postgres database connection string.
+        engines = [self.pgsql_db_engine,
+                   *(engine for engine, _ in self.read_replicas)]
+        await asyncio.gather(*(engine.dispose() for engine in engines))
 
-        :return: The Postgres database connection string.
-        :rtype: str
-        """
-        return f"""
-        dbname={settings.pg_db_name}
-        user={settings.pg_db_username}
-        password={settings.pg_db_password}
-        host={settings.pg_db_host}
-        port={settings.pg_db_port}
-        """
+        self.pgsql_db_engine = None
+        self.session_maker = None
+        self.scoped_session = None
+        self.read_replicas = []
+
+
+def get_pool_limits() -> tuple[int, int]:
+    """
+    Get the pool size and max overflow of a connection pool in a worker.
 
+    All the workers of the application share the `pg_db_max_connections`
+    budget of the database server, so a worker gets its share of it and the
+    configured `pg_db_connection_pool_size` and `pg_db_max_overflow` are
+    capped to fit in that share.
 
-# Initialize the PgsqlDbSessionManager instance
+    :return: The pool size and the max overflow of a worker.
+    :rtype: tuple[int, int]
+    """
+    worker_connections = max(
+        1, settings.pg_db_max_connections // max(1, settings.app_workers))
+    pool_size = max(1, min(settings.pg_db_connection_pool_size,
+                           worker_connections))
+    max_overflow = max(0, min(settings.pg_db_max_overflow,
+                              worker_connections - pool_size))
+    return pool_size, max_overflow
+
+
+# Initialize the PgsqlDbSessionManager instance, its pools are opened and
+# disposed by the application lifespan...
 session_manager = PgsqlDbSessionManager()
 
+# Clients that wrote recently, whose reads go to the primary database so
+# they read their own writes despite the replication lag of the replicas...
+recent_writers = TTLCache(max_size=settings.pg_db_read_your_writes_clients,
+                          ttl=settings.pg_db_read_your_writes_window)
+
+# The cookie carrying the time of the last write of a client, so that the
+# reads of the client stay on the primary in every worker, not only in the
+# worker that handled the write...
+WRITE_TIME_COOKIE = "last_write_at"
+
 
 async def get_pg_db() -> AsyncIterator[AsyncSession]:
     """
@@ -147,3 +343,143 @@ async def get_pg_db() -> AsyncIterator[AsyncSession]:
         raise
     finally:
         await session.close()
+
+
+def get_pg_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    Get the session factory of the database. This is used by routes that
+    need to own the lifetime of their session, e.g. streaming responses
+    where the session has to stay open until the last chunk is sent, which
+    outlives the request scoped session from `get_pg_db`.
+
+    :return: The asynchronous session factory.
+    :rtype: async_sessionmaker[AsyncSession]
+    """
+    return session_manager.get_session_maker()
+
+
+async def get_pg_connection() -> AsyncIterator[AsyncConnection]:
+    """
+    Get a connection to the database for raw SQL, checked out from the
+    same pool as the ORM sessions. The connection is returned to the pool,
+    with its transaction rolled back unless committed, when the request is
+    done.
+
+    :yield: An asynchronous database connection.
+    :rtype: AsyncIterator[AsyncConnection]
+    """
+    async with session_manager.get_engine().connect() as connection:
+        yield connection
+
+
+async def get_pg_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """
+    Get a new session for read-only work. The session is bound to a read
+    replica, unless the client wrote within the read-your-writes window,
+    in which case it is bound to the primary database.
+
+    :param request: The incoming request.
+    :type request: Request
+    :yield: A new asynchronous database session.
+    :rtype: AsyncIterator[AsyncSession]
+    """
+    session = get_pg_read_session_factory(request)()
+    try:
+        yield session
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+def get_pg_read_session_factory(request: Request) -> \
+        async_sessionmaker[AsyncSession]:
+    """
+    Get the session factory for read-only work that owns the lifetime of
+    its sessions, with the same replica selection as `get_pg_read_db`.
+
+    :param request: The incoming request.
+    :type request: Request
+    :return: The asynchronous session factory.
+    :rtype: async_sessionmaker[AsyncSession]
+    """
+    if recent_writers.get(get_client_identity(request)) \
+            or _sent_recent_write_time(request):
+        return session_manager.get_session_maker()
+    return session_manager.get_read_session_maker()
+
+
+def mark_client_write(request: Request) -> None:
+    """
+    Record that the client of the request wrote to the primary database,
+    so its reads stay on the primary for the read-your-writes window. The
+    write is recorded in this worker, and its time is sent back to the
+    client in the `WRITE_TIME_COOKIE` for the other workers, see
+    `ReadYourWritesMiddleware`.
+
+    :param request: The request that wrote.
+    :type request: Request
+    """
+    if session_manager.read_replicas:
+        recent_writers.set(get_client_identity(request), True)
+        request.state.last_write_at = time.time()
+
+
+def write_time_cookie(last_write_at: float) -> str:
+    """
+    Build the `Set-Cookie` header value carrying the time of the last write
+    of a client, which expires with the read-your-writes window.
+
+    :param last_write_at: The time of the write, in seconds since the epoch.
+    :type last_write_at: float
+    :return: The `Set-Cookie` header value.
+    :rtype: str
+    """
+    max_age = math.ceil(settings.pg_db_read_your_writes_window)
+    return (f"{WRITE_TIME_COOKIE}={last_write_at:.6f}; Max-Age={max_age}; "
+            f"Path=/; HttpOnly; SameSite=lax")
+
+
+def _sent_recent_write_time(request: Request) -> bool:
+    """
+    Check if the request carries the time of a write within the
+    read-your-writes window. A time in the future is ignored, so a client
+    cannot pin its reads to the primary.
+    """
+    try:
+        last_write_at = float(request.cookies.get(WRITE_TIME_COOKIE, ""))
+    except ValueError:
+        return False
+    return 0 <= time.time() - last_write_at \
+        <= settings.pg_db_read_your_writes_window
+
+
+def is_primary_session(session: AsyncSession) -> bool:
+    """
+    Check if a session reads from the primary database, i.e. if it is not
+    bound to a read replica that may lag behind the primary.
+
+    :param session: The database session.
+    :type session: AsyncSession
+    :return: True if the session reads the latest committed data.
+    :rtype: bool
+    """
+    return all(session.bind is not engine
+               for engine, _ in session_manager.read_replicas)
+
+
+def get_client_identity(request: Request) -> str:
+    """
+    Get the identity of the client of a request: its API key if it sent
+    one, otherwise its address.
+
+    :param request: The incoming request.
+    :type request: Request
+    :return: The client identity.
+    :rtype: str
+    """
+    if api_key := (request.headers.get("x-api-key")
+                   or request.query_params.get("api_key")):
+        return f"key:{api_key}"
+    return f"host:{request.client.host if request.client else ''}"
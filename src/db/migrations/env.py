@@ -19,6 +19,8 @@ from src.db.config.base import Base  # Import your Base
 # Import all db models here...
 from src.db.models.v1_models.users_model import UserModel
 from src.db.models.v1_models.applications_model import ApplicationModel
+from src.db.models.v1_models.rate_limit_buckets_model import \
+    RateLimitBucketModel
 
 # Load environment variables from .env file
 load_dotenv()
@@ -0,0 +1,46 @@
+"""partial indexes for active users
+
+Revision ID: 8c1e5b0142b4
+Revises: f559f3e35328
+Create Date: 2026-10-18 09:15:42.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1e5b0142b4'
+down_revision: Union[str, None] = 'f559f3e35328'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partial indexes covering the access paths of the users that are not
+# soft-deleted. The predicate must match the `deleted_at IS NULL` filter of
+# the queries for the planner to pick them.
+ACTIVE_USER_INDEXES = {
+    'ix_users_active_id': ['id'],
+    'ix_users_active_username': ['username'],
+    'ix_users_active_email': ['email'],
+}
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY does not lock out writes on a live table,
+    # but it cannot run inside a transaction block...
+    with op.get_context().autocommit_block():
+        for index_name, columns in ACTIVE_USER_INDEXES.items():
+            op.create_index(
+                index_name, 'users', columns, unique=False,
+                postgresql_where=sa.text('deleted_at IS NULL'),
+                postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name in ACTIVE_USER_INDEXES:
+            op.drop_index(
+                index_name, table_name='users',
+                postgresql_concurrently=True)
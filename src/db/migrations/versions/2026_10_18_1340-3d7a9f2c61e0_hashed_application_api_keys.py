@@ -0,0 +1,34 @@
+"""hashed application api keys
+
+Revision ID: 3d7a9f2c61e0
+Revises: 8c1e5b0142b4
+Create Date: 2026-10-18 13:40:27.561930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d7a9f2c61e0'
+down_revision: Union[str, None] = '8c1e5b0142b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The API keys are stored as their hex SHA-256 digest, see
+    # `src.core.auth.hash_api_key`, and looked up by digest...
+    op.execute(
+        "UPDATE applications "
+        "SET api_key = encode(sha256(convert_to(api_key, 'UTF8')), 'hex') "
+        "WHERE api_key IS NOT NULL")
+    op.create_index(op.f('ix_applications_api_key'), 'applications',
+                    ['api_key'], unique=True)
+
+
+def downgrade() -> None:
+    # The digests cannot be turned back into the API keys, the applications
+    # need new keys after a downgrade...
+    op.drop_index(op.f('ix_applications_api_key'), table_name='applications')
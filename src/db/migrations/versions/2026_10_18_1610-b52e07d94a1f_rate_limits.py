@@ -0,0 +1,39 @@
+"""rate limits
+
+Revision ID: b52e07d94a1f
+Revises: 3d7a9f2c61e0
+Create Date: 2026-10-18 16:10:03.882417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52e07d94a1f'
+down_revision: Union[str, None] = '3d7a9f2c61e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('applications',
+                  sa.Column('rate_limit', sa.Float(), nullable=True))
+    op.add_column('applications',
+                  sa.Column('rate_limit_burst', sa.Integer(), nullable=True))
+    op.create_table('rate_limit_buckets',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.Float(), nullable=False),
+    sa.Column('id', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rate_limit_buckets')
+    op.drop_column('applications', 'rate_limit_burst')
+    op.drop_column('applications', 'rate_limit')
@@ -8,7 +8,7 @@ Application model for the database
 
 from datetime import datetime
 
-from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy import Column, String, Boolean, DateTime, Float, Integer
 from sqlalchemy.orm import Mapped
 
 from src.db.config.base import Base
@@ -25,7 +25,12 @@ class ApplicationModel(Base):
     description: Mapped[str] = Column(String)
     url: Mapped[str] = Column(String)
     is_active: Mapped[bool] = Column(Boolean, default=True)
-    api_key: Mapped[str] = Column(String)
+    # The SHA-256 digest of the API key, the key itself is never stored...
+    api_key: Mapped[str] = Column(String, unique=True, index=True)
+
+    # Requests per second and burst size, NULL for the default limits...
+    rate_limit: Mapped[float] = Column(Float, default=None)
+    rate_limit_burst: Mapped[int] = Column(Integer, default=None)
 
     # Timestamps
     created_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow)
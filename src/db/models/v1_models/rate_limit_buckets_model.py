@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Rate limit bucket model for the database
+"""
+
+from sqlalchemy import Column, Float, String
+from sqlalchemy.orm import Mapped
+
+from src.db.config.base import Base
+
+
+# pylint: disable-next=too-few-public-methods
+class RateLimitBucketModel(Base):
+    """
+    Rate limit token bucket model for the database, see
+    `src.utils.rate_limiter.SqlRateLimitBackend`
+    """
+    __tablename__ = 'rate_limit_buckets'
+
+    key: Mapped[str] = Column(String, unique=True, nullable=False)
+    tokens: Mapped[float] = Column(Float, nullable=False)
+    # Epoch seconds of the last token taken...
+    updated_at: Mapped[float] = Column(Float, nullable=False)
@@ -8,7 +8,7 @@ User model for the database
 
 from datetime import datetime
 
-from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy import Column, String, Boolean, DateTime, Index, text
 from sqlalchemy.orm import Mapped
 
 from src.db.config.base import Base
@@ -19,6 +19,16 @@ class UserModel(Base):
     User model for the database
     """
     __tablename__ = 'users'
+    __table_args__ = (
+        # Partial indexes for the Users that are not soft-deleted, which is
+        # what every User query filters on with `deleted_at IS NULL`...
+        Index('ix_users_active_id', 'id',
+              postgresql_where=text('deleted_at IS NULL')),
+        Index('ix_users_active_username', 'username',
+              postgresql_where=text('deleted_at IS NULL')),
+        Index('ix_users_active_email', 'email',
+              postgresql_where=text('deleted_at IS NULL')),
+    )
 
     id: Mapped[str] = Column(String, primary_key=True, index=True)
     username: Mapped[str] = Column(String, unique=True, index=True)
@@ -25,7 +25,9 @@ class ApplicationCreate(BaseModel):
     description: str
     url: str
     is_active: bool = True
-    api_key: str
+    api_key: Optional[str] = None
+    rate_limit: Optional[float] = Field(default=None, gt=0)
+    rate_limit_burst: Optional[int] = Field(default=None, ge=1)
 
     # Timestamps
     created_at: datetime = datetime.utcnow()
@@ -49,6 +51,8 @@ class ApplicationUpdate(BaseModel):
     url: Optional[str] = None
     is_active: Optional[bool] = None
     api_key: Optional[str] = None
+    rate_limit: Optional[float] = Field(default=None, gt=0)
+    rate_limit_burst: Optional[int] = Field(default=None, ge=1)
 
     # Timestamps
     updated_at: Optional[datetime] = datetime.utcnow()
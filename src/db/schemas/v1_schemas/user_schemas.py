@@ -11,7 +11,7 @@ from collections import namedtuple
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field, field_serializer
+from pydantic import BaseModel, Field, field_serializer, field_validator
 
 from src.db.schemas.schema_config import standard_model_config
 from src.utils.nano_id import generate_nano_id
@@ -49,6 +49,12 @@ class UserCreate(BaseModel):
         """ Serialize datetime to UTC datetime """
         return value if value else None
 
+    @field_validator('id', mode='before')
+    @classmethod
+    def generate_missing_id(cls, value: Optional[str]) -> str:
+        """ Generate the id of a User sent with a null id """
+        return generate_nano_id() if value is None else value
+
     model_config = standard_model_config
 
 
@@ -56,26 +62,26 @@ class UserUpdate(BaseModel):
     """
     Schema for updating an existing User instance.
     """
-    id: Optional[str]
-    username: Optional[str]
-    email: Optional[str]
-    password: Optional[str]
-    first_name: Optional[str]
-    last_name: Optional[str]
-    phone_number: Optional[str]
-    address: Optional[str]
-    city: Optional[str]
-    state: Optional[str]
-    country: Optional[str]
-    zip_code: Optional[str]
+    id: Optional[str] = None
+    username: Optional[str] = None
+    email: Optional[str] = None
+    password: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    phone_number: Optional[str] = None
+    address: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    country: Optional[str] = None
+    zip_code: Optional[str] = None
 
     # User roles
-    is_active: Optional[bool]
-    is_superuser: Optional[bool]
+    is_active: Optional[bool] = None
+    is_superuser: Optional[bool] = None
 
     # Timestamps
-    updated_at: Optional[datetime] = datetime.utcnow()
-    deleted_at: Optional[datetime]
+    updated_at: Optional[datetime] = None
+    deleted_at: Optional[datetime] = None
 
     @field_serializer('updated_at', 'deleted_at')
     def serialize_datetime(self, value: Optional[datetime]) -> \
@@ -83,6 +89,8 @@ class UserUpdate(BaseModel):
         """ Serialize datetime to UTC datetime """
         return value if value else None
 
+    model_config = standard_model_config
+
 
 class UserSimple(BaseModel):
     """
@@ -156,3 +164,27 @@ class UserOutput(UserCreate):
         """
         user_named_tuple = namedtuple('User', self.model_fields.keys())
         return user_named_tuple(**self.model_dump())
+
+
+class UserPage(BaseModel):
+    """
+    Schema for a keyset paginated page of User instances.
+    """
+    data: list[UserOutput]
+    next: Optional[str] = None
+
+
+class UserBatchLookup(BaseModel):
+    """
+    Schema for looking up a batch of User instances by their ids.
+    """
+    ids: list[str] = Field(min_length=1)
+
+
+class UserBatch(BaseModel):
+    """
+    Schema for a batch of User instances, in the order of the requested ids
+    with `null` for the ids that were not found.
+    """
+    data: list[Optional[UserOutput]]
+    missing: list[str]
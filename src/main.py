@@ -10,26 +10,34 @@ import os
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Depends
-from psycopg_pool import AsyncConnectionPool
 from starlette.middleware.cors import CORSMiddleware
 
 from src.api.api_utilities import api_utility_router
 from src.api.api_v1 import api_v1_router
 from src.api.api_v1_ws_router import api_ws_router
-from src.core.auth import get_api_key
+from src.api.v1_routes.user_routes import close_user_insert_coalescer
+from src.core.auth import JWT_SECRET_KEY_MIN_LENGTH, access_tokens_enabled, \
+    get_api_key
 from src.core.custom_exceptions import AuthException, BadRequestException, \
     ConflictException, DatabaseException, InternalServerException, \
-    NotFoundException, ValidationException, HTTPException
+    NotFoundException, RateLimitException, ValidationException, \
+    HTTPException
 from src.core.env_config import get_settings
 from src.core.exception_handlers import auth_exception_handler, \
     bad_request_exception_handler, conflict_exception_handler, \
     database_exception_handler, http_exception_handler, \
     internal_server_exception_handler, not_found_exception_handler, \
-    validation_exception_handler
+    rate_limit_exception_handler, validation_exception_handler
 from src.core.logger_config import init_logger
+from src.core.rate_limit import rate_limit_by_api_key, \
+    rate_limit_failed_auth_by_ip
 from src.db.connectors.mongo_db import MongoDBConnector
-from src.db.connectors.postgres_db import PgsqlDbSessionManager
+from src.db.connectors.postgres_db import session_manager
 from src.middlewares.logger import LoggerMiddleware
+from src.middlewares.read_your_writes import ReadYourWritesMiddleware
+from src.middlewares.request_timing import RequestTimingMiddleware
+from src.middlewares.tracing import TracingMiddleware
+from src.utils import tracing
 
 # Initialize settings from environment configuration
 settings = get_settings()
@@ -48,19 +56,22 @@ async def app_lifespan(app_instance: FastAPI):
     # Initialize the application settings
     logger.info("Initializing the FastAPI application...")
     app_instance.settings = settings
+    if not access_tokens_enabled():
+        logger.warning("APP_JWT_SECRET_KEY is not set to a secret of at "
+                       "least %s characters, access tokens are disabled.",
+                       JWT_SECRET_KEY_MIN_LENGTH)
 
     # Initialize the database connector instances
     logger.info("Initializing the database managers...")
-    postgres_connector = PgsqlDbSessionManager()
     mongo_connector = MongoDBConnector(uri=settings.mongo_db_url)
 
     # sqlite_connector = SQLiteConnector()
 
-    # Initialize the database connection pool
+    # Open and pre-warm the database connection pool, shared by the ORM
+    # sessions and the raw SQL connections of this worker...
     logger.info("Initializing the async database connection pool...")
-    app_instance.async_pool = AsyncConnectionPool(
-        conninfo=postgres_connector.get_db_connection_str()
-    )
+    session_manager.open()
+    await session_manager.warm_up()
 
     logger.info("Application lifespan startup complete.")
 
@@ -68,11 +79,18 @@ async def app_lifespan(app_instance: FastAPI):
 
     logger.info("Shutting down the FastAPI application...")
 
+    # Write the coalesced User inserts still pending, before their pool is
+    # closed...
+    await close_user_insert_coalescer(app_instance)
+
     # Close the database connection pool
     logger.info("Closing the database session managers...")
-    await app_instance.async_pool.close()
+    await session_manager.close_session()
     await mongo_connector.close_connection()
 
+    # Write the spans still queued for the trace file
+    tracing.exporter.close()
+
     logger.info("Application shutdown complete")
 
 
@@ -94,6 +112,7 @@ app.add_exception_handler(DatabaseException, database_exception_handler)
 app.add_exception_handler(InternalServerException,
                           internal_server_exception_handler)
 app.add_exception_handler(NotFoundException, not_found_exception_handler)
+app.add_exception_handler(RateLimitException, rate_limit_exception_handler)
 app.add_exception_handler(ValidationException, validation_exception_handler)
 app.add_exception_handler(HTTPException, http_exception_handler)
 
@@ -101,6 +120,7 @@ app.add_exception_handler(HTTPException, http_exception_handler)
 origins = ["*"]
 
 # Middleware
+app.add_middleware(ReadYourWritesMiddleware)
 app.add_middleware(LoggerMiddleware)
 app.add_middleware(
     CORSMiddleware,
@@ -109,6 +129,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TracingMiddleware)
+app.add_middleware(RequestTimingMiddleware)  # Outermost, added last
 
 # Include api routers
 app.include_router(
@@ -118,7 +140,8 @@ app.include_router(
 
 app.include_router(
     api_v1_router,
-    dependencies=[Depends(get_api_key)]
+    dependencies=[Depends(rate_limit_failed_auth_by_ip),
+                  Depends(get_api_key), Depends(rate_limit_by_api_key)]
 )
 
 app.include_router(
@@ -134,9 +157,10 @@ if __name__ == "__main__":
 
     # Uvicorn Run Server
     uvicorn.run(
-        app,
+        "src.main:app",
         host=settings.app_host,
         port=settings.app_port,
         reload=settings.app_reload,
+        workers=settings.app_workers,
         log_config=uvicorn.config.LOGGING_CONFIG
     )
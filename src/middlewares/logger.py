@@ -6,67 +6,94 @@
 This module contains the logger configuration for the FastAPI application.
 """
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from src.core.env_config import get_settings
-from src.core.logger_config import init_logger
+from src.utils.request_timing import get_request_timings
+from src.utils.sql_instrumentation import get_request_sql_stats
 
 
-class LoggerMiddleware(BaseHTTPMiddleware):
+class LoggerMiddleware:
     """
-    Middleware class for logging requests
+    Pure ASGI middleware class for logging requests.
+
+    One line is logged per HTTP request when its response is complete, with
+    the method, path, status code, duration and response size, followed by
+    the phase timings and SQL statistics of the request, see
+    `RequestTimingMiddleware`. The response is passed through message by
+    message, so nothing is buffered and streaming responses keep streaming.
     """
 
-    def __init__(self, app):
+    def __init__(self, app: ASGIApp):
         """
         Constructor method for the LoggerMiddleware class
 
         :param app: FastAPI application instance
-        :type app: FastAPI
+        :type app: ASGIApp
         """
         settings = get_settings()
 
-        super().__init__(app)
-        self.logger = init_logger(settings.app_logger_name)
+        self.app = app
+        self.logger = logging.getLogger(settings.app_logger_name)
 
-    async def dispatch(self, request: Request, call_next) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
         """
         Log the request and response
 
-        :param request: Request object
-        :type request: Request
-        :param call_next: Next middleware to call
-        :type call_next: Callable
-        :return: Response object
-        :rtype: Response
+        :param scope: The ASGI connection scope
+        :type scope: Scope
+        :param receive: The ASGI receive channel
+        :type receive: Receive
+        :param send: The ASGI send channel
+        :type send: Send
         """
-        # Log the request
-        self.log_request_details(request)
-
-        # Call the next middleware
-        response = await call_next(request)
-
-        # Log the response
-        self.log_response_details(response)
-
-        return response
-
-    def log_request_details(self, request: Request):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.log_request_details(
+                scope, status_code, time.perf_counter() - started_at,
+                response_size)
+
+    def log_request_details(self, scope: Scope, status_code: int,
+                            duration: float, response_size: int) -> None:
         """
-        Log detailed information about the request
-
-        :param request: Request object
-        :type request: Request
-        """
-        self.logger.info("Request details: %s %s", request.method, request.url)
-
-    def log_response_details(self, response: Response):
-        """
-        Log detailed information about the response
-
-        :param response: Response object
-        :type response: Response
+        Log detailed information about the request and its response
+
+        :param scope: The ASGI connection scope of the request
+        :type scope: Scope
+        :param status_code: The status code of the response
+        :type status_code: int
+        :param duration: The seconds it took to send the response
+        :type duration: float
+        :param response_size: The bytes of the response body
+        :type response_size: int
         """
-        self.logger.info("Response details: %s", response.status_code)
+        summary = ""
+        if (timings := get_request_timings()) and timings.phases:
+            summary += f" {timings.log_summary()}"
+        if (sql_stats := get_request_sql_stats()) and sql_stats.statements:
+            summary += f" {sql_stats.log_summary()}"
+
+        self.logger.info("%s %s %s %.2fms %sB%s", scope["method"],
+                         scope["path"], status_code, duration * 1000,
+                         response_size, summary)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+This module contains the read-your-writes middleware for the FastAPI
+application.
+"""
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.db.connectors.postgres_db import write_time_cookie
+
+
+# pylint: disable-next=too-few-public-methods
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware class sending the time of a write to the client
+    in a cookie, when the request wrote to the primary database, see
+    `mark_client_write`. The client sends the cookie back with its next
+    requests, so whichever worker handles them routes its reads to the
+    primary for the read-your-writes window.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Constructor method for the ReadYourWritesMiddleware class
+
+        :param app: FastAPI application instance
+        :type app: ASGIApp
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        """
+        Add the write time cookie to the response of a request that wrote
+
+        :param scope: The ASGI connection scope
+        :type scope: Scope
+        :param receive: The ASGI receive channel
+        :type receive: Receive
+        :param send: The ASGI send channel
+        :type send: Send
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and (
+                    last_write_at := scope.get("state", {}).get(
+                        "last_write_at")) is not None:
+                headers = MutableHeaders(scope=message)
+                headers.append("Set-Cookie", write_time_cookie(last_write_at))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+This module contains the request timing middleware for the FastAPI
+application.
+"""
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.env_config import get_settings
+from src.utils.request_timing import start_request_timings
+from src.utils.sql_instrumentation import start_request_sql_stats
+
+
+# pylint: disable-next=too-few-public-methods
+class RequestTimingMiddleware:
+    """
+    Pure ASGI middleware class starting the phase timings and the SQL
+    statistics of every HTTP request, see `src.utils.request_timing` and
+    `src.utils.sql_instrumentation`, and sending the timings to the client
+    in a `Server-Timing` header when `api_server_timing` is enabled.
+
+    It has to be the outermost middleware, so the timings exist for the
+    other middlewares, e.g. the access log of the `LoggerMiddleware`.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Constructor method for the RequestTimingMiddleware class
+
+        :param app: FastAPI application instance
+        :type app: ASGIApp
+        """
+        self.app = app
+        self.settings = get_settings()
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        """
+        Time the request and add the Server-Timing header to the response
+
+        :param scope: The ASGI connection scope
+        :type scope: Scope
+        :param receive: The ASGI receive channel
+        :type receive: Receive
+        :param send: The ASGI send channel
+        :type send: Send
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = start_request_timings()
+        start_request_sql_stats()
+        if not self.settings.api_server_timing:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.server_timing())
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+This module contains the tracing middleware for the FastAPI application.
+"""
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.tracing import trace
+
+
+# pylint: disable-next=too-few-public-methods
+class TracingMiddleware:
+    """
+    Pure ASGI middleware class starting a sampled trace for every HTTP
+    request, see `src.utils.tracing`. The spans recorded while the request
+    is handled, e.g. its SQL statements, are the children of its root span.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Constructor method for the TracingMiddleware class
+
+        :param app: FastAPI application instance
+        :type app: ASGIApp
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        """
+        Record the request as the root span of a trace
+
+        :param scope: The ASGI connection scope
+        :type scope: Scope
+        :param receive: The ASGI receive channel
+        :type receive: Receive
+        :param send: The ASGI send channel
+        :type send: Send
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with trace("http.request", method=scope["method"],
+                   path=scope["path"]) as root:
+            if root is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    root.attributes["status_code"] = message["status"]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+This module provides utility functions for conditional GET requests.
+
+Responses carry a strong `ETag`, and a `Last-Modified` date when the
+resource has one. A client that sends the values back in `If-None-Match`
+or `If-Modified-Since` gets an empty `304 Not Modified` response if the
+resource did not change, which saves the bandwidth and, when the ETag can
+be derived without the body, the serialization of the response.
+
+Example:
+    from src.utils.conditional_requests import is_not_modified, make_etag
+
+    etag = make_etag(user["id"], user["updated_at"])
+    if is_not_modified(request, etag, user["updated_at"]):
+        return not_modified_response(etag, user["updated_at"])
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def make_etag(*parts: object) -> str:
+    """
+    Make a strong ETag from the parts that identify a version of a resource
+    representation, e.g. its id and its last update timestamp.
+
+    :param parts: The parts identifying the representation.
+    :type parts: object
+    :return: The quoted ETag.
+    :rtype: str
+    """
+    digest = hashlib.blake2b(
+        "\x1f".join(str(part) for part in parts).encode("utf-8"),
+        digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def make_body_etag(body: bytes) -> str:
+    """
+    Make a strong ETag from a serialized response body, for representations
+    without a single last update timestamp such as list pages.
+
+    :param body: The serialized response body.
+    :type body: bytes
+    :return: The quoted ETag.
+    :rtype: str
+    """
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def http_date(value: datetime) -> str:
+    """
+    Format a datetime as an HTTP date. Naive datetimes are taken as UTC,
+    which is how the timestamps are stored in the database.
+
+    :param value: The datetime to format.
+    :type value: datetime
+    :return: The HTTP date, e.g. `Sun, 18 Oct 2026 09:15:42 GMT`.
+    :rtype: str
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str,
+                    last_modified: Optional[datetime] = None) -> bool:
+    """
+    Check if the representation the client holds is still current.
+
+    `If-None-Match` takes precedence over `If-Modified-Since`, as required
+    by RFC 9110. ETags are compared with the weak comparison used for GET
+    requests.
+
+    :param request: The incoming request.
+    :type request: Request
+    :param etag: The current ETag of the representation.
+    :type etag: str
+    :param last_modified: The last modification of the resource, if known.
+    :type last_modified: Optional[datetime]
+    :return: True if a 304 Not Modified response can be sent.
+    :rtype: bool
+    """
+    if (if_none_match := request.headers.get("if-none-match")) is not None:
+        if if_none_match.strip() == "*":
+            return True
+        current = etag.removeprefix("W/")
+        return any(candidate.strip().removeprefix("W/") == current
+                   for candidate in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+
+    # HTTP dates have a one second resolution...
+    return last_modified.replace(microsecond=0) <= since
+
+
+def not_modified_response(etag: str,
+                          last_modified: Optional[datetime] = None) -> \
+        Response:
+    """
+    Build an empty 304 Not Modified response with the validators.
+
+    :param etag: The current ETag of the representation.
+    :type etag: str
+    :param last_modified: The last modification of the resource, if known.
+    :type last_modified: Optional[datetime]
+    :return: The 304 Not Modified response.
+    :rtype: Response
+    """
+    return Response(status_code=304,
+                    headers=validator_headers(etag, last_modified))
+
+
+def validator_headers(etag: str,
+                      last_modified: Optional[datetime] = None) -> \
+        dict[str, str]:
+    """
+    Build the validator headers of a response.
+
+    :param etag: The current ETag of the representation.
+    :type etag: str
+    :param last_modified: The last modification of the resource, if known.
+    :type last_modified: Optional[datetime]
+    :return: The `ETag`, `Last-Modified` and `Cache-Control` headers.
+    :rtype: dict[str, str]
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+This module provides a write coalescer that groups concurrent inserts into
+batches (group commit).
+
+Every caller submits its own row and awaits its own result, while the
+coalescer gathers the rows arriving within a short time window, or until a
+maximum batch size is reached, and hands them to a single flush function.
+The flush function writes the batch with one statement in one transaction
+and returns one result per row, which can be an exception for the rows
+that failed on their own, e.g. because of a unique constraint conflict.
+
+Example:
+    from src.utils.insert_coalescer import InsertCoalescer
+
+    async def flush(rows: list[dict]) -> list[dict | Exception]:
+        ...  # One multi-row INSERT and one COMMIT for all the rows
+
+    coalescer = InsertCoalescer(flush, window=0.005, max_batch_size=500)
+    user = await coalescer.submit({"username": "a_username", ...})
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional
+
+from src.core.env_config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(settings.app_logger_name or "application_logger")
+
+FlushFunction = Callable[[list[Any]], Awaitable[list[Any]]]
+
+
+class InsertCoalescer:
+    """
+    Coalesces concurrently submitted rows into batches written by a single
+    flush call per batch.
+    """
+
+    def __init__(self, flush: FlushFunction, window: float,
+                 max_batch_size: int):
+        """
+        Constructor method for the InsertCoalescer class.
+
+        :param flush: The coroutine function writing a batch of rows. It
+            returns one result per row, in order, where an exception is
+            raised to the caller that submitted the row.
+        :type flush: FlushFunction
+        :param window: The seconds to wait for more rows after the first
+            row of a batch arrived.
+        :type window: float
+        :param max_batch_size: The number of rows that flushes a batch
+            without waiting for the window to end.
+        :type max_batch_size: int
+        """
+        self._flush = flush
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._pending: list[tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    async def submit(self, row: Any) -> Any:
+        """
+        Submit a row to the next batch and wait for its own result.
+
+        :param row: The row to insert.
+        :type row: Any
+        :return: The result of the flush function for the row.
+        :rtype: Any
+        :raises Exception: The exception the flush function returned for
+            the row, or raised for the whole batch.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._start_flush)
+
+        return await future
+
+    async def close(self) -> None:
+        """
+        Flush the pending rows and wait for all the running flushes.
+        """
+        if self._pending:
+            self._start_flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+    def _start_flush(self) -> None:
+        """
+        Hand the pending rows over to a new flush task.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._flush_batch(batch))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush_batch(self, batch: list[tuple[Any, asyncio.Future]]) \
+            -> None:
+        """
+        Flush a batch and resolve the future of every row in it.
+
+        :param batch: The rows of the batch with their futures.
+        :type batch: list[tuple[Any, asyncio.Future]]
+        """
+        logger.debug("Flushing a coalesced batch of %s rows...", len(batch))
+        try:
+            results = await self._flush([row for row, _ in batch])
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
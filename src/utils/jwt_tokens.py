@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+This module provides JSON Web Tokens (JWT) signed with HMAC.
+
+Only the HMAC algorithms (HS256, HS384 and HS512) are supported, which is
+all a service signing and verifying its own tokens needs, with the standard
+library and orjson instead of a JWT dependency. The algorithm of a token
+has to be the expected one, so a token claiming `"alg": "none"` or another
+algorithm is rejected before its signature is checked.
+
+Example:
+    from src.utils.jwt_tokens import decode_jwt, encode_jwt
+
+    token = encode_jwt({"sub": "id", "exp": 1700000000}, "secret", "HS256")
+    claims = decode_jwt(token, "secret", "HS256")
+"""
+
+import base64
+import hashlib
+import hmac
+import time
+from typing import Optional
+
+import orjson
+
+HASH_FUNCTIONS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+
+class InvalidTokenError(ValueError):
+    """
+    Raised when a token is malformed, badly signed or expired.
+    """
+
+
+def _base64url_encode(data: bytes) -> str:
+    """
+    Encode bytes with the unpadded base64url alphabet of JWT.
+    """
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _base64url_decode(data: str) -> bytes:
+    """
+    Decode unpadded base64url.
+    """
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def sign(signing_input: str, secret: str, algorithm: str) -> str:
+    """
+    Sign the header and payload segments of a token.
+
+    :param signing_input: The `<header>.<payload>` segments.
+    :type signing_input: str
+    :param secret: The secret key.
+    :type secret: str
+    :param algorithm: The HMAC algorithm, e.g. `HS256`.
+    :type algorithm: str
+    :return: The signature segment.
+    :rtype: str
+    :raises ValueError: If the algorithm is not supported.
+    """
+    if algorithm not in HASH_FUNCTIONS:
+        raise ValueError(f"Unsupported JWT algorithm: {algorithm}")
+    return _base64url_encode(hmac.new(
+        secret.encode(), signing_input.encode(),
+        HASH_FUNCTIONS[algorithm]).digest())
+
+
+def encode_jwt(claims: dict, secret: str, algorithm: str) -> str:
+    """
+    Encode and sign a token.
+
+    :param claims: The claims of the payload.
+    :type claims: dict
+    :param secret: The secret key.
+    :type secret: str
+    :param algorithm: The HMAC algorithm, e.g. `HS256`.
+    :type algorithm: str
+    :return: The token.
+    :rtype: str
+    """
+    signing_input = ".".join((
+        _base64url_encode(orjson.dumps({"alg": algorithm, "typ": "JWT"})),
+        _base64url_encode(orjson.dumps(claims))))
+    return f"{signing_input}.{sign(signing_input, secret, algorithm)}"
+
+
+def decode_jwt(token: str, secret: str, algorithm: str,
+               now: Optional[float] = None) -> dict:
+    """
+    Verify a token and decode its claims.
+
+    :param token: The token.
+    :type token: str
+    :param secret: The secret key.
+    :type secret: str
+    :param algorithm: The expected HMAC algorithm, e.g. `HS256`.
+    :type algorithm: str
+    :param now: The current epoch time, defaults to the system time.
+    :type now: Optional[float]
+    :return: The claims of the payload.
+    :rtype: dict
+    :raises InvalidTokenError: If the token is malformed, not signed with
+        the secret and algorithm, or expired.
+    """
+    try:
+        signing_input, signature = token.rsplit(".", 1)
+        header_segment, payload_segment = signing_input.split(".")
+        header = orjson.loads(_base64url_decode(header_segment))
+    except ValueError as e:
+        raise InvalidTokenError("Malformed token") from e
+
+    if not isinstance(header, dict) or header.get("alg") != algorithm:
+        raise InvalidTokenError("Unexpected token algorithm")
+    if not hmac.compare_digest(
+            signature.encode(),
+            sign(signing_input, secret, algorithm).encode()):
+        raise InvalidTokenError("Invalid token signature")
+
+    try:
+        claims = orjson.loads(_base64url_decode(payload_segment))
+    except ValueError as e:
+        raise InvalidTokenError("Malformed token") from e
+    if not isinstance(claims, dict):
+        raise InvalidTokenError("Malformed token")
+
+    expires_at = claims.get("exp")
+    if not isinstance(expires_at, (int, float)) \
+            or expires_at <= (time.time() if now is None else now):
+        raise InvalidTokenError("Expired token")
+    return claims
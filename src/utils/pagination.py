@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+This module provides utility functions for keyset (cursor) pagination.
+
+Cursors are opaque to the API clients. Internally a cursor is the URL safe
+base64 encoding of the sort key of the last row on the previous page, which
+lets the next page be resolved with an indexed `WHERE key > :after` lookup
+instead of an `OFFSET` scan.
+
+Example:
+    from src.utils.pagination import decode_cursor, encode_cursor
+
+    cursor = encode_cursor("V1StGXR8_Z5jdHi6B-myT")
+    last_key = decode_cursor(cursor)  # "V1StGXR8_Z5jdHi6B-myT"
+"""
+
+import base64
+import binascii
+
+import orjson
+
+from src.core.custom_exceptions import BadRequestException
+
+
+def encode_cursor(last_key: str) -> str:
+    """
+    Encode the sort key of the last row on a page into an opaque cursor.
+
+    :param last_key: The sort key of the last row on the page.
+    :type last_key: str
+    :return: The opaque cursor pointing after the given key.
+    :rtype: str
+    """
+    payload = orjson.dumps({"k": last_key})
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """
+    Decode an opaque cursor back into the sort key it points after.
+
+    :param cursor: The opaque cursor received from the client.
+    :type cursor: str
+    :return: The sort key of the last row on the previous page.
+    :rtype: str
+    :raises BadRequestException: If the cursor is malformed.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        payload = orjson.loads(base64.urlsafe_b64decode(cursor + padding))
+        last_key = payload["k"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise BadRequestException(message="Invalid pagination cursor") from e
+
+    if not isinstance(last_key, str):
+        raise BadRequestException(message="Invalid pagination cursor")
+
+    return last_key
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+This module provides telemetry for the SQLAlchemy connection pools.
+
+The `InstrumentedAsyncAdaptedQueuePool` is a drop-in pool class for async
+engines that times every checkout and counts the callers waiting for one.
+Its `PoolMetrics` also follow the pool events to track the age of the open
+connections and how often a pooled connection was reconnected, which
+happens when it is recycled after `pool_recycle` seconds or invalidated.
+
+Example:
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from src.utils.pool_metrics import InstrumentedAsyncAdaptedQueuePool
+
+    engine = create_async_engine(
+        url, poolclass=InstrumentedAsyncAdaptedQueuePool)
+    engine.pool.metrics.listen(engine.pool)
+    engine.pool.metrics.snapshot(engine.pool)  # {"size": 5, ...}
+"""
+
+import time
+from bisect import bisect_left
+from typing import Any, Optional
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, PoolProxiedConnection
+
+from src.utils.request_timing import record_phase
+from src.utils.tracing import start_span
+
+# Upper bounds of the checkout latency buckets, in seconds...
+CHECKOUT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                            0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """
+    A fixed bucket histogram of latencies, in the cumulative layout used by
+    Prometheus, where every bucket counts the observations up to its bound.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = CHECKOUT_LATENCY_BUCKETS):
+        """
+        Constructor method for the LatencyHistogram class.
+
+        :param buckets: The sorted upper bounds of the buckets in seconds.
+        :type buckets: tuple[float, ...]
+        """
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """
+        Record a latency.
+
+        :param seconds: The latency in seconds.
+        :type seconds: float
+        """
+        self._counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def snapshot(self) -> dict:
+        """
+        Get the cumulative bucket counts and the totals of the histogram.
+
+        :return: The buckets keyed by their upper bound, the count, the sum
+            and the maximum of the latencies in seconds.
+        :rtype: dict
+        """
+        buckets, cumulative = {}, 0
+        for bound, count in zip((*self.buckets, "+Inf"), self._counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"buckets": buckets, "count": self.count,
+                "sum": round(self.sum, 6), "max": round(self.max, 6)}
+
+
+class PoolMetrics:
+    """
+    The checkout, wait and connection lifetime statistics of a pool.
+    """
+
+    def __init__(self):
+        """
+        Constructor method for the PoolMetrics class.
+        """
+        self.checkout_latency = LatencyHistogram()
+        self.waiters = 0
+        self.recycles = 0
+        self._connected_at: WeakKeyDictionary[Any, Optional[float]] = \
+            WeakKeyDictionary()
+
+    def listen(self, pool: Pool) -> None:
+        """
+        Follow the connection events of a pool. The listeners are carried
+        over to the pool that replaces it when its engine is disposed.
+
+        :param pool: The pool to follow.
+        :type pool: Pool
+        """
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "close", self._on_close)
+
+    def _on_connect(self, _dbapi_connection: Any, connection_record: Any) \
+            -> None:
+        """
+        Record the time a pooled connection was opened. A record that was
+        connected before is reconnected, i.e. recycled or invalidated.
+        """
+        if connection_record in self._connected_at:
+            self.recycles += 1
+        self._connected_at[connection_record] = time.monotonic()
+
+    def _on_close(self, _dbapi_connection: Any, connection_record: Any) \
+            -> None:
+        """
+        Stop tracking the age of a pooled connection that was closed.
+        """
+        if connection_record in self._connected_at:
+            self._connected_at[connection_record] = None
+
+    def snapshot(self, pool: Pool) -> dict:
+        """
+        Get the statistics of a pool.
+
+        :param pool: The pool the metrics belong to.
+        :type pool: Pool
+        :return: The size and usage of the pool, its checkout latency
+            histogram, and the age and reconnects of its connections.
+        :rtype: dict
+        """
+        now = time.monotonic()
+        ages = [now - connected_at
+                for connected_at in self._connected_at.values()
+                if connected_at is not None]
+
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "waiters": self.waiters,
+            "checkout_latency": self.checkout_latency.snapshot(),
+            "connection_age": {
+                "count": len(ages),
+                "min": round(min(ages), 3) if ages else None,
+                "max": round(max(ages), 3) if ages else None,
+                "mean": round(sum(ages) / len(ages), 3) if ages else None,
+            },
+            "recycles": self.recycles,
+        }
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    An `AsyncAdaptedQueuePool` that measures its checkouts in `metrics`.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """
+        Constructor method for the InstrumentedAsyncAdaptedQueuePool class,
+        taking the arguments of `AsyncAdaptedQueuePool`.
+        """
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self) -> PoolProxiedConnection:
+        """
+        Check out a connection, timing the wait for a free connection and
+        counting the callers waiting at the same time. The wait is also
+        added to the `pool` phase of the current request timings and traced
+        as a `db.pool.checkout` span.
+
+        :return: The checked out connection.
+        :rtype: PoolProxiedConnection
+        """
+        self.metrics.waiters += 1
+        checkout_span = start_span("db.pool.checkout")
+        started_at = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            self.metrics.waiters -= 1
+            checkout_time = time.perf_counter() - started_at
+            self.metrics.checkout_latency.observe(checkout_time)
+            record_phase("pool", checkout_time)
+            if checkout_span is not None:
+                checkout_span.end()
+
+    def recreate(self) -> "InstrumentedAsyncAdaptedQueuePool":
+        """
+        Create a new pool with the same configuration when the engine is
+        disposed, which keeps the metrics of this pool.
+
+        :return: The new pool.
+        :rtype: InstrumentedAsyncAdaptedQueuePool
+        """
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+This module provides token bucket rate limiting.
+
+A bucket holds up to `burst` tokens and is refilled with `rate` tokens per
+second. Every request takes a token, and is rejected while the bucket is
+empty, with the seconds until the next token is refilled. The buckets are
+kept by a backend:
+
+- `InMemoryRateLimitBackend` keeps them in the worker process, which costs
+  no I/O, but every worker of the application allows the full rate.
+- `SqlRateLimitBackend` keeps them in the `rate_limit_buckets` table, so
+  the limits hold across the workers and hosts sharing the database, at the
+  cost of one atomic upsert per request.
+
+Other shared stores are plugged in by subclassing `RateLimitBackend`.
+
+Example:
+    from src.utils.rate_limiter import InMemoryRateLimitBackend
+
+    backend = InMemoryRateLimitBackend(max_size=10000)
+    retry_after = await backend.acquire("application:id", rate=10, burst=20)
+"""
+
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+
+from sqlalchemy import case, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.db.models.v1_models.rate_limit_buckets_model import \
+    RateLimitBucketModel
+from src.utils.ttl_cache import TTLCache
+
+
+# pylint: disable-next=too-few-public-methods
+class RateLimitBackend(ABC):
+    """
+    The interface of the stores of the token buckets.
+    """
+
+    @abstractmethod
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        """
+        Take a token from the bucket of a key.
+
+        :param key: The key of the bucket, e.g. `application:<id>`.
+        :type key: str
+        :param rate: The tokens refilled per second.
+        :type rate: float
+        :param burst: The capacity of the bucket.
+        :type burst: int
+        :return: 0 if a token was taken, else the seconds until the bucket
+            holds a token again.
+        :rtype: float
+        """
+
+
+def retry_after(tokens: float, rate: float) -> float:
+    """
+    Get the seconds until a bucket holds a token again.
+
+    :param tokens: The tokens in the bucket, less than one.
+    :type tokens: float
+    :param rate: The tokens refilled per second.
+    :type rate: float
+    :return: The seconds to wait.
+    :rtype: float
+    """
+    return (1 - tokens) / rate if rate > 0 else float("inf")
+
+
+# pylint: disable-next=too-few-public-methods
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Keeps the token buckets in the worker process. A bucket is dropped once
+    it would be full again, which is the same as keeping it, and the least
+    recently used buckets are dropped beyond `max_size` buckets.
+    """
+
+    def __init__(self, max_size: int,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Constructor method for the InMemoryRateLimitBackend class.
+
+        :param max_size: The maximum number of buckets.
+        :type max_size: int
+        :param clock: The monotonic clock used to refill the buckets.
+        :type clock: Callable[[], float]
+        """
+        self.clock = clock
+        self.buckets = TTLCache(max_size=max_size, ttl=0, clock=clock)
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        """
+        Take a token from the bucket of a key, see `RateLimitBackend`.
+        """
+        now = self.clock()
+        tokens = float(burst)
+        if (bucket := self.buckets.get(key)) is not None:
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+
+        if tokens < 1:
+            return retry_after(tokens, rate)
+
+        tokens -= 1
+        refill_time = (burst - tokens) / rate if rate > 0 else float("inf")
+        self.buckets.set(key, (tokens, now), ttl=refill_time)
+        return 0.0
+
+
+# pylint: disable-next=too-few-public-methods
+class SqlRateLimitBackend(RateLimitBackend):
+    """
+    Keeps the token buckets in the `rate_limit_buckets` table, shared by
+    every worker using the same database. A token is taken with a single
+    INSERT ... ON CONFLICT DO UPDATE, which refills the bucket and takes the
+    token atomically, and only updates the row if the bucket holds a token.
+    """
+
+    def __init__(self,
+                 session_factory: Callable[
+                     [], async_sessionmaker[AsyncSession]],
+                 clock: Callable[[], float] = time.time):
+        """
+        Constructor method for the SqlRateLimitBackend class.
+
+        :param session_factory: Returns the session maker of the database
+            of the buckets, resolved on first use.
+        :type session_factory: Callable[[], async_sessionmaker[AsyncSession]]
+        :param clock: The wall clock used to refill the buckets, shared by
+            the workers.
+        :type clock: Callable[[], float]
+        """
+        self.session_factory = session_factory
+        self.clock = clock
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        """
+        Take a token from the bucket of a key, see `RateLimitBackend`.
+        """
+        now = self.clock()
+        bucket = RateLimitBucketModel.__table__.c
+        refilled = bucket.tokens + (now - bucket.updated_at) * rate
+        refilled = case((refilled > burst, float(burst)), else_=refilled)
+
+        async with self.session_factory()() as db:
+            dialect_insert = (sqlite.insert
+                              if db.bind.dialect.name == "sqlite"
+                              else postgresql.insert)
+            taken = (await db.execute(
+                dialect_insert(RateLimitBucketModel)
+                .values(key=key, tokens=burst - 1.0, updated_at=now)
+                .on_conflict_do_update(
+                    index_elements=[bucket.key],
+                    set_={"tokens": refilled - 1, "updated_at": now},
+                    where=refilled >= 1)
+                .returning(bucket.key)
+            )).scalar_one_or_none()
+            if taken is not None:
+                await db.commit()
+                return 0.0
+
+            tokens = (await db.execute(
+                select(refilled).where(bucket.key == key)
+            )).scalar_one()
+        return retry_after(tokens, rate)
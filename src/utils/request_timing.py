@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+This module provides per-request timing of the phases of a request.
+
+The `RequestTimingMiddleware` starts a `RequestTimings` for every request
+in a context variable. Code running for the request adds the time spent in
+a phase, e.g. authentication, connection pool checkout, SQL execution or
+response serialization, with `measure` or `record_phase`, and the phases
+are reported in the `Server-Timing` header and in the access log. Outside
+of a request the measurements are dropped.
+
+Example:
+    from src.utils.request_timing import measure
+
+    with measure("auth"):
+        ...  # Validate the API key
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+class RequestTimings:
+    """
+    The accumulated durations of the phases of a request.
+    """
+
+    def __init__(self):
+        """
+        Constructor method for the RequestTimings class.
+        """
+        self.started_at = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        """
+        Add time spent in a phase. A phase entered more than once, e.g. one
+        per SQL statement, accumulates its durations.
+
+        :param phase: The name of the phase.
+        :type phase: str
+        :param seconds: The time spent in the phase.
+        :type seconds: float
+        """
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        """
+        Get the time since the request started.
+
+        :return: The elapsed seconds.
+        :rtype: float
+        """
+        return time.perf_counter() - self.started_at
+
+    def server_timing(self) -> str:
+        """
+        Format the phases and the total as a `Server-Timing` header value.
+
+        :return: The header value, e.g. `db;dur=1.52, total;dur=3.07`.
+        :rtype: str
+        """
+        phases = {**self.phases, "total": self.elapsed()}
+        return ", ".join(f"{phase};dur={seconds * 1000:.2f}"
+                         for phase, seconds in phases.items())
+
+    def log_summary(self) -> str:
+        """
+        Format the phases for the access log.
+
+        :return: The phases, e.g. `auth=0.02ms db=1.52ms`.
+        :rtype: str
+        """
+        return " ".join(f"{phase}={seconds * 1000:.2f}ms"
+                        for phase, seconds in self.phases.items())
+
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None)
+
+
+def start_request_timings() -> RequestTimings:
+    """
+    Start the timings of a new request in the current context.
+
+    :return: The timings of the request.
+    :rtype: RequestTimings
+    """
+    timings = RequestTimings()
+    _request_timings.set(timings)
+    return timings
+
+
+def get_request_timings() -> Optional[RequestTimings]:
+    """
+    Get the timings of the current request.
+
+    :return: The timings, or None outside of a request.
+    :rtype: Optional[RequestTimings]
+    """
+    return _request_timings.get()
+
+
+def record_phase(phase: str, seconds: float) -> None:
+    """
+    Add time spent in a phase to the current request, if any.
+
+    :param phase: The name of the phase.
+    :type phase: str
+    :param seconds: The time spent in the phase.
+    :type seconds: float
+    """
+    if (timings := _request_timings.get()) is not None:
+        timings.add(phase, seconds)
+
+
+@contextmanager
+def measure(phase: str) -> Iterator[None]:
+    """
+    Measure the time spent in the block as a phase of the current request.
+
+    :param phase: The name of the phase.
+    :type phase: str
+    """
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - started_at)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+This module provides a utility function to parse sparse fieldsets.
+
+A sparse fieldset is a comma separated list of field names sent by the
+client in a `fields` query parameter, e.g. `?fields=id,username,email`, to
+only receive (and only select from the database) the fields it needs.
+
+Example:
+    from src.utils.sparse_fields import parse_fields
+
+    fields = parse_fields("id,email", UserOutput.model_fields)
+    print(fields)  # Outputs ['id', 'email']
+"""
+
+from collections.abc import Iterable
+from typing import Optional
+
+from src.core.custom_exceptions import BadRequestException
+
+
+def parse_fields(fields: Optional[str],
+                 allowed_fields: Iterable[str]) -> Optional[list[str]]:
+    """
+    Parse and validate a comma separated sparse fieldset.
+
+    :param fields: The comma separated field names, or None.
+    :type fields: Optional[str]
+    :param allowed_fields: The field names the client may ask for.
+    :type allowed_fields: Iterable[str]
+    :return: The requested field names in request order without duplicates,
+        or None if no fieldset was requested.
+    :rtype: Optional[list[str]]
+    :raises BadRequestException: If an unknown field is requested.
+    """
+    if fields is None:
+        return None
+
+    requested = list(dict.fromkeys(
+        name.strip() for name in fields.split(",") if name.strip()))
+    if not requested:
+        raise BadRequestException(message="No fields requested")
+
+    allowed = set(allowed_fields)
+    if unknown := [name for name in requested if name not in allowed]:
+        raise BadRequestException(
+            message=f"Unknown fields requested: {', '.join(unknown)}")
+
+    return requested
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+This module provides instrumentation of the SQL statements of an engine.
+
+The statements executed by an engine that is instrumented with `listen`
+are timed with the engine events:
+
+- Their execution time is added to the `db` phase of the current request
+  timings, see `src.utils.request_timing`, and they are traced as `sql`
+  spans of the current trace, see `src.utils.tracing`.
+- The statements, their execution time and their rows are counted per
+  request in a `RequestSqlStats`, started by `start_request_sql_stats`.
+- Statements slower than `pg_db_slow_query_threshold` are logged, with the
+  `EXPLAIN (ANALYZE, BUFFERS)` plan of SELECT statements on Postgres when
+  `pg_db_slow_query_explain` is enabled.
+- A request that executes the same statement shape, i.e. the statement
+  with its IN lists collapsed, `pg_db_n_plus_one_threshold` times is
+  logged as a probable N+1 query.
+
+Example:
+    from src.utils import sql_instrumentation
+
+    sql_instrumentation.listen(engine)
+"""
+
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.env_config import get_settings
+from src.utils.request_timing import record_phase
+from src.utils.tracing import current_span, start_span
+
+settings = get_settings()
+logger = logging.getLogger(
+    f"{settings.app_logger_name or 'application_logger'}.sql")
+
+_IN_LIST = re.compile(r"\bIN \((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+class RequestSqlStats:
+    """
+    The SQL statements executed for a request.
+    """
+
+    def __init__(self):
+        """
+        Constructor method for the RequestSqlStats class.
+        """
+        self.statements = 0
+        self.duration = 0.0
+        self.rows = 0
+        self.shapes: dict[str, int] = {}
+
+    def add(self, statement: str, seconds: float, rows: int) -> int:
+        """
+        Count an executed statement.
+
+        :param statement: The SQL statement.
+        :type statement: str
+        :param seconds: The execution time of the statement.
+        :type seconds: float
+        :param rows: The rows the driver reported for the statement, or a
+            negative number if it did not report any.
+        :type rows: int
+        :return: The number of statements of the same shape so far.
+        :rtype: int
+        """
+        self.statements += 1
+        self.duration += seconds
+        self.rows += max(rows, 0)
+
+        shape = statement_shape(statement)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+        return self.shapes[shape]
+
+    def log_summary(self) -> str:
+        """
+        Format the statistics for the access log.
+
+        :return: The statistics, e.g. `sql=3 sql_rows=52`.
+        :rtype: str
+        """
+        return f"sql={self.statements} sql_rows={self.rows}"
+
+
+_request_sql_stats: ContextVar[Optional[RequestSqlStats]] = ContextVar(
+    "request_sql_stats", default=None)
+
+
+def start_request_sql_stats() -> RequestSqlStats:
+    """
+    Start counting the SQL statements of a new request in the current
+    context.
+
+    :return: The SQL statistics of the request.
+    :rtype: RequestSqlStats
+    """
+    stats = RequestSqlStats()
+    _request_sql_stats.set(stats)
+    return stats
+
+
+def get_request_sql_stats() -> Optional[RequestSqlStats]:
+    """
+    Get the SQL statistics of the current request.
+
+    :return: The statistics, or None outside of a request.
+    :rtype: Optional[RequestSqlStats]
+    """
+    return _request_sql_stats.get()
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Get the shape of a statement, which is the same for the statements
+    that only differ in their parameters or in the length of their IN lists.
+
+    :param statement: The SQL statement.
+    :type statement: str
+    :return: The shape of the statement.
+    :rtype: str
+    """
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def listen(engine: AsyncEngine) -> None:
+    """
+    Instrument the SQL statements executed by an engine.
+
+    :param engine: The engine to instrument.
+    :type engine: AsyncEngine
+    """
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute",
+                 _after_cursor_execute)
+
+
+# pylint: disable=R0913,R0917
+def _before_cursor_execute(connection: Connection, _cursor: Any,
+                           statement: str, _parameters: Any, context: Any,
+                           _executemany: bool) -> None:
+    """
+    Record the time a statement is sent to the database.
+    """
+    context.sql_span = None
+    if current_span() is not None \
+            and not connection.info.get("sql_explaining"):
+        context.sql_span = start_span(
+            "sql", statement=statement_shape(statement))
+    context.sql_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(connection: Connection, cursor: Any,
+                          statement: str, parameters: Any, context: Any,
+                          _executemany: bool) -> None:
+    """
+    Count the statement for the current request and log it if it is slow
+    or repeated.
+    """
+    if connection.info.get("sql_explaining"):
+        return
+
+    seconds = time.perf_counter() - context.sql_started_at
+    record_phase("db", seconds)
+    if context.sql_span is not None:
+        context.sql_span.attributes["rows"] = cursor.rowcount
+        context.sql_span.end()
+
+    if (stats := _request_sql_stats.get()) is not None:
+        shape_count = stats.add(statement, seconds, cursor.rowcount)
+        if shape_count == settings.pg_db_n_plus_one_threshold:
+            logger.warning(
+                "Probable N+1 query, the same statement ran %s times in "
+                "one request: %s", shape_count, statement_shape(statement))
+
+    threshold = settings.pg_db_slow_query_threshold
+    if 0 < threshold <= seconds:
+        logger.warning("Slow query of %.2fms: %s", seconds * 1000,
+                       statement_shape(statement))
+        if settings.pg_db_slow_query_explain:
+            _log_query_plan(connection, statement, parameters, context)
+
+
+def _log_query_plan(connection: Connection, statement: str, parameters: Any,
+                    context: Any) -> None:
+    """
+    Log the `EXPLAIN (ANALYZE, BUFFERS)` plan of a slow SELECT statement.
+
+    The statement is executed again by the EXPLAIN ANALYZE, so only the
+    plain SELECT statements are explained, and not the statements streamed
+    with a server-side cursor, which still holds the connection.
+    """
+    if (connection.dialect.name != "postgresql"
+            or not statement.lstrip().upper().startswith("SELECT")
+            or context.execution_options.get("stream_results")):
+        return
+
+    connection.info["sql_explaining"] = True
+    try:
+        plan = connection.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+        ).scalars().all()
+        logger.warning("Query plan of the slow query:\n%s", "\n".join(plan))
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.warning("Could not explain the slow query: %s", e)
+    finally:
+        connection.info.pop("sql_explaining", None)
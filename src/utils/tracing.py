@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+This module provides lightweight in-process tracing.
+
+A trace is a tree of spans, e.g. a request with its authentication, SQL
+statements and response serialization, recorded without a collector.
+Traces are sampled when they start, at `tracing_sample_rate`, and the code
+running outside of a sampled trace only pays for a context variable
+lookup. Finished spans are exported to an in-memory ring buffer of the
+last `tracing_buffer_size` spans, served by the traces admin endpoint, and
+as JSON lines to a size rotated file written by a background thread.
+
+Example:
+    from src.utils.tracing import span, trace
+
+    with trace("websocket.broadcast", connections=3):
+        with span("websocket.send"):
+            ...
+"""
+
+import atexit
+import logging
+import os
+import random
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, \
+    RotatingFileHandler
+from queue import SimpleQueue
+from typing import Any, Optional
+
+import orjson
+
+from src.core.env_config import get_settings
+
+settings = get_settings()
+
+
+# pylint: disable-next=too-many-instance-attributes
+class Span:
+    """
+    A timed operation of a trace.
+    """
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes",
+                 "start_time", "_started_at", "duration", "error")
+
+    def __init__(self, name: str, trace_id: str,
+                 parent_id: Optional[str], attributes: dict[str, Any]):
+        """
+        Constructor method for the Span class, starting the span.
+
+        :param name: The name of the operation.
+        :type name: str
+        :param trace_id: The id of the trace of the span.
+        :type trace_id: str
+        :param parent_id: The id of the parent span, None for a root span.
+        :type parent_id: Optional[str]
+        :param attributes: The attributes describing the operation.
+        :type attributes: dict[str, Any]
+        """
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_time = time.time()
+        self._started_at = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def end(self) -> None:
+        """
+        End the span and export it.
+        """
+        self.duration = time.perf_counter() - self._started_at
+        exporter.export(self)
+
+    def to_dict(self) -> dict:
+        """
+        Get the span as a JSON serializable dict.
+
+        :return: The ids, name, attributes, start, duration and error.
+        :rtype: dict
+        """
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "attributes": self.attributes,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3)
+            if self.duration is not None else None,
+            "error": self.error,
+        }
+
+
+class SpanExporter:
+    """
+    Exports the finished spans to a ring buffer and a rotating file.
+    """
+
+    def __init__(self, buffer_size: int, file_path: Optional[str]):
+        """
+        Constructor method for the SpanExporter class.
+
+        :param buffer_size: The number of spans kept in memory.
+        :type buffer_size: int
+        :param file_path: The path of the JSON lines file, or None to only
+            keep the spans in memory.
+        :type file_path: Optional[str]
+        """
+        self.spans: deque[Span] = deque(maxlen=buffer_size)
+        self.file_path = file_path
+        self._queue_handler: Optional[QueueHandler] = None
+        self._listener: Optional[QueueListener] = None
+
+    def export(self, finished_span: Span) -> None:
+        """
+        Export a finished span.
+
+        :param finished_span: The finished span.
+        :type finished_span: Span
+        """
+        self.spans.append(finished_span)
+        if self.file_path:
+            if self._queue_handler is None:
+                self._start_file_writer()
+            self._queue_handler.handle(logging.makeLogRecord(
+                {"msg": orjson.dumps(finished_span.to_dict()).decode()}))
+
+    def recent(self, trace_id: Optional[str] = None,
+               limit: Optional[int] = None) -> list[dict]:
+        """
+        Get the most recent spans, newest first.
+
+        :param trace_id: Only get the spans of this trace.
+        :type trace_id: Optional[str]
+        :param limit: The maximum number of spans.
+        :type limit: Optional[int]
+        :return: The spans as dicts.
+        :rtype: list[dict]
+        """
+        spans = [recent_span.to_dict() for recent_span in reversed(self.spans)
+                 if trace_id is None or recent_span.trace_id == trace_id]
+        return spans[:limit]
+
+    def close(self) -> None:
+        """
+        Stop the file writer thread after it wrote the queued spans.
+        """
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+        self._queue_handler = self._listener = None
+
+    def _start_file_writer(self) -> None:
+        """
+        Start the thread writing the spans to the rotating file.
+        """
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        file_handler = RotatingFileHandler(
+            self.file_path, maxBytes=settings.tracing_file_size,
+            backupCount=settings.tracing_file_count, encoding="utf-8")
+        span_queue = SimpleQueue()
+        self._queue_handler = QueueHandler(span_queue)
+        self._listener = QueueListener(span_queue, file_handler)
+        self._listener.start()
+
+
+exporter = SpanExporter(
+    buffer_size=settings.tracing_buffer_size,
+    file_path=os.path.join(settings.file_logger_dir,
+                           settings.tracing_file_name)
+    if settings.tracing_file_name else None)
+atexit.register(exporter.close)
+
+_current_span: ContextVar[Optional[Span]] = ContextVar(
+    "current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """
+    Get the span of the current context.
+
+    :return: The current span, or None outside of a sampled trace.
+    :rtype: Optional[Span]
+    """
+    return _current_span.get()
+
+
+def start_span(name: str, **attributes: Any) -> Optional[Span]:
+    """
+    Start a child span of the current span, without making it the current
+    span, e.g. for a leaf operation timed by two separate callbacks. The
+    caller ends it with `Span.end`.
+
+    :param name: The name of the operation.
+    :type name: str
+    :param attributes: The attributes describing the operation.
+    :type attributes: Any
+    :return: The span, or None outside of a sampled trace.
+    :rtype: Optional[Span]
+    """
+    if (parent := _current_span.get()) is None:
+        return None
+    return Span(name, parent.trace_id, parent.span_id, attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Record the block as a child span of the current span. Outside of a
+    sampled trace nothing is recorded.
+
+    :param name: The name of the operation.
+    :type name: str
+    :param attributes: The attributes describing the operation.
+    :type attributes: Any
+    :yield: The span, or None outside of a sampled trace.
+    :rtype: Iterator[Optional[Span]]
+    """
+    if (parent := _current_span.get()) is None:
+        yield None
+        return
+
+    with _activate(Span(name, parent.trace_id, parent.span_id,
+                        attributes)) as child:
+        yield child
+
+
+@contextmanager
+def trace(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Record the block as a child span of the current span, or as the root
+    span of a new trace, sampled at `tracing_sample_rate`, if there is no
+    current span.
+
+    :param name: The name of the operation.
+    :type name: str
+    :param attributes: The attributes describing the operation.
+    :type attributes: Any
+    :yield: The span, or None if the trace is not sampled.
+    :rtype: Iterator[Optional[Span]]
+    """
+    if (parent := _current_span.get()) is not None:
+        new_span = Span(name, parent.trace_id, parent.span_id, attributes)
+    elif random.random() < settings.tracing_sample_rate:
+        new_span = Span(name, f"{random.getrandbits(128):032x}", None,
+                        attributes)
+    else:
+        yield None
+        return
+
+    with _activate(new_span) as active_span:
+        yield active_span
+
+
+@contextmanager
+def _activate(active_span: Span) -> Iterator[Span]:
+    """
+    Make a span the current span for the block, record an exception
+    raised in the block, and end the span.
+    """
+    token = _current_span.set(active_span)
+    try:
+        yield active_span
+    except BaseException as e:
+        active_span.error = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        active_span.end()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+This module provides a bounded in-process cache with LRU eviction and a
+time to live (TTL) for every entry.
+
+The cache is meant for hot, small records that are expensive to read from
+a database. It is local to the worker process and not thread-safe, which is
+fine for code running on the asyncio event loop. Entries are evicted when
+they expire, when the least recently used entry has to make room for a new
+one, or explicitly with `invalidate` whenever the source record is written.
+
+A value read while the source record is being written may be stale. The
+`generation` of the cache counts the invalidations, so a reader takes the
+generation before reading the source and passes it to `set`, which does not
+cache the value if an invalidation happened in between.
+
+Example:
+    from src.utils.ttl_cache import TTLCache
+
+    cache = TTLCache(max_size=1000, ttl=30)
+    cache.set("user_id", {"id": "user_id"})
+    cache.get("user_id")  # {"id": "user_id"}
+    cache.invalidate("user_id")
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Optional
+
+
+# pylint: disable-next=too-many-instance-attributes
+class TTLCache:
+    """
+    A bounded least recently used cache where every entry expires after a
+    time to live. Hits, misses and evictions are counted for monitoring.
+    """
+
+    def __init__(self, max_size: int, ttl: float,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Constructor method for the TTLCache class.
+
+        :param max_size: The maximum number of entries in the cache.
+        :type max_size: int
+        :param ttl: The default time to live of an entry in seconds.
+        :type ttl: float
+        :param clock: The monotonic clock used to expire the entries.
+        :type clock: Callable[[], float]
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = \
+            OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+
+    def __len__(self) -> int:
+        """
+        Return the number of entries in the cache, including the expired
+        entries that are not evicted yet.
+
+        :return: The number of entries in the cache.
+        :rtype: int
+        """
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get the value of a key if it is cached and not expired.
+
+        :param key: The key to look up.
+        :type key: Hashable
+        :param default: The value to return on a cache miss.
+        :type default: Any
+        :return: The cached value, or the default on a cache miss.
+        :rtype: Any
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None,
+            generation: Optional[int] = None) -> None:
+        """
+        Cache the value of a key, evicting the least recently used entries
+        if the cache is full.
+
+        :param key: The key to cache the value under.
+        :type key: Hashable
+        :param value: The value to cache.
+        :type value: Any
+        :param ttl: The time to live in seconds, defaults to the cache TTL.
+        :type ttl: Optional[float]
+        :param generation: The generation of the cache when the value was
+            read, the value is not cached if the cache was invalidated since.
+        :type generation: Optional[int]
+        """
+        if generation is not None and generation != self.generation:
+            return
+
+        self._entries[key] = (
+            self._clock() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Remove a key from the cache, if it is cached.
+
+        :param key: The key to remove.
+        :type key: Hashable
+        """
+        self._entries.pop(key, None)
+        self.generation += 1
+
+    def clear(self) -> None:
+        """
+        Remove all the entries from the cache.
+        """
+        self._entries.clear()
+        self.generation += 1
+
+    def stats(self) -> dict:
+        """
+        Get the statistics of the cache.
+
+        :return: The size, limits and counters of the cache.
+        :rtype: dict
+        """
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
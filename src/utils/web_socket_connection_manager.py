@@ -6,18 +6,60 @@ Module containing a WebSocket connection manager class. This class is
 initialized in the router module and used in routes where WebSocket
 are needed to manage the connections for broadcasting messages to all
 active clients.
+
+Every connection has a bounded queue of outgoing messages, drained by its
+own writer task, so sending a message only enqueues it: a broadcast costs
+one `put_nowait` per connection, and a slow or dead client never delays
+the delivery to the others. When the queue of a slow client is full, the
+`websocket_slow_consumer_policy` decides what happens:
+
+- `drop_oldest`: the oldest queued message is dropped for the new one.
+- `drop_newest`: the new message is dropped.
+- `disconnect`: the client is evicted and its socket closed with the code
+  1013 (try again later).
+
+A client whose send fails, or takes longer than `websocket_send_timeout`
+seconds, is evicted as well.
 """
 
+import asyncio
 import logging
+from typing import Optional
 
 from fastapi import WebSocket
+from starlette import status
 
 from src.core.env_config import get_settings
+from src.utils.tracing import trace
 
 # Initialize environment settings & logger
 settings = get_settings()
 logger = logging.getLogger(
-    settings.app_logger_name or "application_logger")
+    f"{settings.app_logger_name or 'application_logger'}.web_socket")
+
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "drop_newest", "disconnect")
+
+
+# pylint: disable-next=too-few-public-methods
+class WebSocketClient:
+    """
+    A connected WebSocket with its queue of outgoing messages and the task
+    writing them to the socket.
+    """
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        """
+        Constructor method for the WebSocketClient class.
+
+        :param websocket: The accepted WebSocket connection.
+        :type websocket: WebSocket
+        :param queue_size: The maximum number of queued messages.
+        :type queue_size: int
+        """
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.dropped_messages = 0
 
 
 class WebSocketConnectionManager:
@@ -25,12 +67,36 @@ class WebSocketConnectionManager:
     Manages the WebSocket connections
     """
 
-    def __init__(self):
+    def __init__(self, queue_size: Optional[int] = None,
+                 slow_consumer_policy: Optional[str] = None,
+                 send_timeout: Optional[float] = None):
         """
         Initializes the WebSocket connection manager class.
+
+        :param queue_size: The maximum number of queued messages per
+            connection, defaults to `websocket_send_queue_size`.
+        :type queue_size: Optional[int]
+        :param slow_consumer_policy: What to do when the queue of a
+            connection is full, defaults to `websocket_slow_consumer_policy`.
+        :type slow_consumer_policy: Optional[str]
+        :param send_timeout: The seconds a send may take before the client
+            is evicted, defaults to `websocket_send_timeout`.
+        :type send_timeout: Optional[float]
+        :raises ValueError: If the slow consumer policy is unknown.
         """
         logger.info("Initializing the WebSocket connection manager...")
-        self.active_connections: list[WebSocket] = []
+        self.queue_size = queue_size or settings.websocket_send_queue_size
+        self.slow_consumer_policy = \
+            slow_consumer_policy or settings.websocket_slow_consumer_policy
+        self.send_timeout = send_timeout or settings.websocket_send_timeout
+        if self.slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: "
+                             f"{self.slow_consumer_policy}")
+
+        self.active_connections: dict[WebSocket, WebSocketClient] = {}
+        self.dropped_messages = 0
+        self.evicted_connections = 0
+        self._closing: set[asyncio.Task] = set()
 
     async def connect(self, websocket: WebSocket) -> None:
         """
@@ -41,40 +107,114 @@ class WebSocketConnectionManager:
         """
         logger.info("WebSocket connection requested...")
         await websocket.accept()
-        self.active_connections.append(websocket)
+        client = WebSocketClient(websocket, self.queue_size)
+        client.writer = asyncio.create_task(self._write(client))
+        self.active_connections[websocket] = client
 
     def disconnect(self, websocket: WebSocket) -> None:
         """
-        Disconnects a WebSocket connection.
+        Disconnects a WebSocket connection, dropping its queued messages.
+        Disconnecting a connection that was evicted does nothing.
 
         :param websocket: The WebSocket connection to be disconnected.
         :type websocket: WebSocket
         """
         logger.info("WebSocket connection closed...")
-        self.active_connections.remove(websocket)
+        if (client := self.active_connections.pop(websocket, None)) \
+                is not None:
+            client.writer.cancel()
 
     async def send_personal_message(
             self, message: str, websocket: WebSocket) -> None:
         """
-        Sends a personal message to a specific WebSocket connection.
+        Queues a personal message for a specific WebSocket connection.
 
         :param message: The message to be sent.
         :type message: str
         :param websocket: The WebSocket connection to send the message to.
         :type websocket: WebSocket
         """
-        logger.info("Sending personal message over web socket...")
-        await websocket.send_text(message)
+        logger.debug("Sending personal message over web socket...")
+        if (client := self.active_connections.get(websocket)) is not None:
+            self._enqueue(client, message)
 
     async def broadcast(self, message: str) -> None:
         """
-        Broadcasts a message to all active WebSocket connections.
+        Queues a message for all active WebSocket connections, without
+        waiting for it to be sent.
 
         :param message: The message to be broadcasted.
         :type message: str
         """
-        logger.info("Broadcasting message...")
-        for connection in self.active_connections:
-            logger.info("Sending message to connection...")
-            await connection.send_text(message)
-        logger.info("Broadcast completed.")
+        with trace("websocket.broadcast", message_size=len(message),
+                   connections=len(self.active_connections)):
+            for client in list(self.active_connections.values()):
+                self._enqueue(client, message)
+        logger.debug("Broadcast queued for %s connections.",
+                     len(self.active_connections))
+
+    def _enqueue(self, client: WebSocketClient, message: str) -> None:
+        """
+        Queue a message for a client, applying the slow consumer policy if
+        its queue is full.
+        """
+        if not client.queue.full():
+            client.queue.put_nowait(message)
+            return
+
+        if self.slow_consumer_policy == "disconnect":
+            logger.warning("Evicting a slow WebSocket consumer with %s "
+                           "queued messages.", client.queue.qsize())
+            self._evict(client, status.WS_1013_TRY_AGAIN_LATER)
+            return
+
+        client.dropped_messages += 1
+        self.dropped_messages += 1
+        if self.slow_consumer_policy == "drop_oldest":
+            client.queue.get_nowait()
+            client.queue.put_nowait(message)
+
+    async def _write(self, client: WebSocketClient) -> None:
+        """
+        Send the queued messages of a client, until it is disconnected or
+        evicted.
+        """
+        while True:
+            message = await client.queue.get()
+            try:
+                with trace("websocket.send", message_size=len(message)):
+                    await asyncio.wait_for(
+                        client.websocket.send_text(message),
+                        self.send_timeout)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning("Evicting a WebSocket consumer that could "
+                               "not be sent a message: %r", e)
+                self._evict(client, status.WS_1011_INTERNAL_ERROR,
+                            cancel_writer=False)
+                return
+
+    def _evict(self, client: WebSocketClient, code: int,
+               cancel_writer: bool = True) -> None:
+        """
+        Remove a client, stop its writer and close its socket in the
+        background.
+        """
+        if self.active_connections.pop(client.websocket, None) is None:
+            return
+
+        self.evicted_connections += 1
+        if cancel_writer:
+            client.writer.cancel()
+        closing = asyncio.create_task(self._close(client.websocket, code))
+        self._closing.add(closing)
+        closing.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close(websocket: WebSocket, code: int) -> None:
+        """
+        Close an evicted socket, which may already be closed.
+        """
+        try:
+            await websocket.close(code=code)
+        except Exception:  # pylint: disable=broad-exception-caught
+            pass
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Shared fixtures of the test suit.
+
+The database dependencies of the application are overridden with a SQLite
+database, and the API key dependency with a test application, for every
+test. The tests reading or writing the database use the `database`
+fixture, which gives each test empty tables and empty caches of its own.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from src.api.v1_routes import user_routes
+from src.core import auth
+from src.db.config.base import Base
+from src.db.connectors.postgres_db import get_pg_db, get_pg_read_db, \
+    get_pg_read_session_factory, get_pg_session_factory
+from src.db.connectors.sqlite_db import SQLiteConnector
+from src.main import app
+from src.utils import sql_instrumentation
+
+TEST_DB_PATH = "src/db/test_data_storage.db"
+TEST_DB_URL = f"sqlite:///{TEST_DB_PATH}"
+
+# Ensure the directory exists
+os.makedirs(os.path.dirname(TEST_DB_PATH), exist_ok=True)
+
+sqlite_connector = SQLiteConnector(TEST_DB_URL)
+sql_instrumentation.listen(sqlite_connector.sqlite_engine)
+
+
+async def _run_metadata(method) -> None:
+    """
+    Runs a metadata method (create_all/drop_all) on the async test engine.
+    """
+    async with sqlite_connector.sqlite_engine.begin() as connection:
+        await connection.run_sync(method)
+    await sqlite_connector.sqlite_engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def dependency_overrides(monkeypatch):
+    """
+    Override the database dependencies with the SQLite database and the
+    API key dependency with a test application, for the test only.
+    """
+    overrides = {
+        get_pg_db: sqlite_connector.get_sqlite_db,
+        get_pg_session_factory: lambda: sqlite_connector.async_session_local,
+        get_pg_read_db: sqlite_connector.get_sqlite_db,
+        get_pg_read_session_factory:
+            lambda: sqlite_connector.async_session_local,
+        auth.get_api_key: lambda: auth.AuthenticatedApplication(
+            "test_application", rate_limit=1000.0, rate_limit_burst=1000),
+    }
+    for dependency, override in overrides.items():
+        monkeypatch.setitem(app.dependency_overrides, dependency, override)
+
+
+@pytest.fixture
+def database() -> SQLiteConnector:
+    """
+    Create all the database tables, with empty caches, and drop them after
+    the test.
+
+    :return: The connector of the test database.
+    :rtype: SQLiteConnector
+    """
+    asyncio.run(_run_metadata(Base.metadata.drop_all))
+    asyncio.run(_run_metadata(Base.metadata.create_all))
+    for cache in (user_routes.user_cache, user_routes.user_alias_cache,
+                  auth.api_key_cache, auth.invalid_api_key_cache,
+                  auth.access_token_cache):
+        cache.clear()
+
+    yield sqlite_connector
+
+    asyncio.run(_run_metadata(Base.metadata.drop_all))
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Test suit for the API key authentication of the FastAPI application.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from src.core import auth
+from src.core.auth import AuthenticatedApplication, access_token_cache, \
+    authenticate_api_key, hash_api_key, verify_access_token
+from src.db.connectors.sqlite_db import SQLiteConnector
+from src.db.models.v1_models.applications_model import ApplicationModel
+from src.main import app
+from src.utils.ttl_cache import TTLCache
+
+pytestmark = pytest.mark.usefixtures("database")
+
+client = TestClient(app)
+
+ADMIN_KEY = "test_admin_key"
+ADMIN_HEADERS = {"x-admin-key": ADMIN_KEY}
+JWT_SECRET_KEY = "a_test_secret_key_of_at_least_32_characters"
+
+
+class CountingSessionFactory:
+    """
+    A session factory counting the sessions opened, i.e. the cache misses.
+    """
+
+    def __init__(self, database: SQLiteConnector):
+        self.database = database
+        self.sessions = 0
+
+    def __call__(self):
+        self.sessions += 1
+        return self.database.async_session_local()
+
+
+def _authenticate(session_factory: CountingSessionFactory,
+                  *api_keys: str) -> list:
+    """
+    Authenticate the API keys in order, returning the application id or
+    the status code of the error of each.
+    """
+    async def run():
+        results = []
+        for api_key in api_keys:
+            try:
+                results.append((await authenticate_api_key(
+                    query_api_key=None, header_api_key=api_key,
+                    session_factory=session_factory)).id)
+            except HTTPException as e:
+                results.append(e.status_code)
+        await session_factory.database.sqlite_engine.dispose()
+        return results
+
+    return asyncio.run(run())
+
+
+def test_api_key_lifecycle(monkeypatch, database):
+    """
+    Test that the API key of a new application is stored hashed, that it
+    is cached after the first lookup, and that it is revoked at once when
+    the application is deactivated.
+    """
+    monkeypatch.setattr(auth.settings, "auth_admin_api_key", ADMIN_KEY)
+    monkeypatch.setattr(auth.settings, "app_jwt_secret_key", JWT_SECRET_KEY)
+    monkeypatch.setattr(auth.settings, "auth_api_key_revocation_interval",
+                        3600.0)
+    response = client.post("/api/v1/applications", headers=ADMIN_HEADERS,
+                           json={"id": "chosen_id", "is_active": False,
+                                 "name": "an_application",
+                                 "description": "An application",
+                                 "url": "https://example.com"})
+    assert response.status_code == 201
+    application = response.json()
+    assert application["id"] != "chosen_id"
+    assert application["is_active"] is True
+    api_key = application["api_key"]
+
+    async def stored_api_key():
+        async with database.async_session_local() as db:
+            stored = await db.scalar(select(ApplicationModel.api_key))
+        await database.sqlite_engine.dispose()
+        return stored
+
+    assert asyncio.run(stored_api_key()) == hash_api_key(api_key) != api_key
+
+    session_factory = CountingSessionFactory(database)
+    assert _authenticate(session_factory, api_key, api_key) == [
+        application["id"], application["id"]]
+    assert session_factory.sessions == 1
+
+    response = client.post("/api/v1/auth/token",
+                           headers={"x-api-key": api_key})
+    assert response.status_code == 200
+    access_token = response.json()["access_token"]
+    hits = access_token_cache.hits
+    assert verify_access_token(access_token).id == application["id"]
+    assert verify_access_token(access_token).id == application["id"]
+    assert access_token_cache.hits == hits + 1
+    with pytest.raises(HTTPException):
+        verify_access_token(access_token[:-2] + "xx")
+    assert client.post("/api/v1/auth/token", headers={
+        "authorization": f"Bearer {access_token}"}).status_code == 401
+
+    response = client.post(
+        f"/api/v1/applications/{application['id']}/deactivate",
+        headers=ADMIN_HEADERS)
+    assert response.status_code == 204
+    assert _authenticate(session_factory, api_key) == [401]
+
+    response = client.post(
+        f"/api/v1/applications/{application['id']}/deactivate",
+        headers=ADMIN_HEADERS)
+    assert response.status_code == 404
+
+
+def test_revocations_reach_every_worker(monkeypatch, database):
+    """
+    Test that deactivating an application evicts its API key from the
+    caches of the workers that did not handle the deactivation.
+    """
+    monkeypatch.setattr(auth.settings, "auth_admin_api_key", ADMIN_KEY)
+    monkeypatch.setattr(auth.settings, "auth_api_key_revocation_interval",
+                        0.0)
+    response = client.post("/api/v1/applications", headers=ADMIN_HEADERS,
+                           json={"name": "an_application",
+                                 "description": "An application",
+                                 "url": "https://example.com"})
+    application = response.json()
+    api_key_hash = hash_api_key(application["api_key"])
+
+    caches = [TTLCache(max_size=10, ttl=60.0) for _ in range(2)]
+    revocations = [auth.ApiKeyRevocations(cache) for cache in caches]
+
+    async def poll():
+        for worker in revocations:
+            await worker.poll(database.async_session_local)
+        await database.sqlite_engine.dispose()
+
+    for cache in caches:
+        cache.set(api_key_hash, AuthenticatedApplication(application["id"]))
+    asyncio.run(poll())
+    assert all(cache.get(api_key_hash) for cache in caches)
+
+    response = client.post(
+        f"/api/v1/applications/{application['id']}/deactivate",
+        headers=ADMIN_HEADERS)
+    assert response.status_code == 204
+    assert all(cache.get(api_key_hash) for cache in caches)
+
+    asyncio.run(poll())
+    assert not any(cache.get(api_key_hash) for cache in caches)
+
+
+def test_access_tokens_require_a_secret_key(monkeypatch):
+    """
+    Test that no access token is issued or accepted while the secret key
+    is unset or too short.
+    """
+    monkeypatch.setattr(auth.settings, "app_jwt_secret_key", JWT_SECRET_KEY)
+    application = AuthenticatedApplication("an_application")
+    access_token = auth.create_access_token(application)
+
+    for secret_key in ("", "a_secret_key"):
+        monkeypatch.setattr(auth.settings, "app_jwt_secret_key", secret_key)
+        with pytest.raises(HTTPException) as error:
+            auth.create_access_token(application)
+        assert error.value.status_code == 503
+        with pytest.raises(HTTPException) as error:
+            verify_access_token(access_token)
+        assert error.value.status_code == 401
+
+
+@pytest.mark.parametrize("admin_key, headers", [
+    ("", ADMIN_HEADERS),
+    (ADMIN_KEY, {}),
+    (ADMIN_KEY, {"x-admin-key": "wrong_admin_key"}),
+])
+def test_application_management_requires_admin_key(monkeypatch, admin_key,
+                                                   headers):
+    """
+    Test that the applications can not be managed without the admin key,
+    nor at all while the admin key is not set.
+    """
+    monkeypatch.setattr(auth.settings, "auth_admin_api_key", admin_key)
+    response = client.post("/api/v1/applications", headers=headers, json={
+        "name": "an_application", "description": "An application",
+        "url": "https://example.com"})
+    assert response.status_code == 403
+    response = client.post("/api/v1/applications/an_id/deactivate",
+                           headers=headers)
+    assert response.status_code == 403
+
+
+def test_unknown_api_keys_are_cached(database):
+    """
+    Test that unknown and missing API keys are rejected, and that an
+    unknown key is only looked up once.
+    """
+    session_factory = CountingSessionFactory(database)
+
+    assert _authenticate(session_factory, "unknown", "unknown", None) == [
+        401, 401, 401]
+    assert session_factory.sessions == 1
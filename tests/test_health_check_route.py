@@ -3,10 +3,18 @@
 
 
 """
-Test suit for the Health Check route in the FastAPI application.
+Test suit for the Health Check routes in the FastAPI application.
 """
 
+import asyncio
+import logging
+from types import SimpleNamespace
+
 from fastapi.testclient import TestClient
+
+from src.api.health_check_routes import check_routes
+from src.db.connectors import mongo_db
+from src.db.connectors.mongo_db import MongoDBConnector
 from src.main import app
 
 client = TestClient(app)
@@ -20,3 +28,70 @@ def test_app_healt_check() -> None:
     assert response.status_code == 200
     assert response.headers["content-type"] == "application/json"
     assert response.json() == "Server is OK"
+
+
+def test_app_readiness_check(monkeypatch) -> None:
+    """
+    Test that the readiness check reports every dependency, fails when one
+    is not reachable in time, and caches its result.
+    """
+    calls = []
+
+    async def reachable() -> None:
+        calls.append("postgres")
+
+    async def unreachable() -> None:
+        calls.append("mongo")
+        await asyncio.sleep(1)
+
+    monkeypatch.setattr(check_routes.settings, "health_check_timeout", 0.05)
+    monkeypatch.setitem(check_routes.READINESS_CHECKS, "postgres", reachable)
+    monkeypatch.setitem(check_routes.READINESS_CHECKS, "mongo", unreachable)
+    check_routes.readiness_cache.clear()
+
+    response = client.get("/api/utils/health_check/ready")
+    assert response.status_code == 503
+    body = response.json()
+    assert body["status"] == "not_ready"
+    assert body["checks"]["postgres"]["status"] == "ok"
+    assert body["checks"]["mongo"] == {
+        "status": "error", "error": "Timed out",
+        "latency_ms": body["checks"]["mongo"]["latency_ms"]}
+    assert body["checks"]["mongo"]["latency_ms"] < 1000
+
+    assert client.get("/api/utils/health_check/ready").json() == body
+    assert calls == ["postgres", "mongo"]
+
+    check_routes.readiness_cache.clear()
+    monkeypatch.setitem(check_routes.READINESS_CHECKS, "mongo", reachable)
+    response = client.get("/api/utils/health_check/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+def test_mongo_ping_is_quiet(monkeypatch, capsys, caplog) -> None:
+    """
+    Test that the Mongo readiness probe pings the application client
+    without logging or printing anything.
+    """
+    commands = []
+
+    async def command(name):
+        commands.append(name)
+
+    connector = object.__new__(MongoDBConnector)
+    connector._client = SimpleNamespace(  # pylint: disable=protected-access
+        admin=SimpleNamespace(command=command))
+    monkeypatch.setattr(MongoDBConnector, "_instance", connector)
+
+    mongo_logger = mongo_db.logger
+    mongo_logger.addHandler(caplog.handler)
+    try:
+        with caplog.at_level(logging.INFO, logger=mongo_logger.name):
+            asyncio.run(check_routes._ping_mongo())  # pylint: disable=W0212
+    finally:
+        mongo_logger.removeHandler(caplog.handler)
+
+    assert commands == ["ping"]
+    assert not caplog.records
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Test suit for the import time budget of the FastAPI application.
+
+The application is imported in a fresh interpreter with `-X importtime`,
+which reports the cumulative import time of every module, so a slow import
+added anywhere below `src.main` fails the budget. The budget can be raised
+for slow machines with the `IMPORT_TIME_BUDGET_MS` environment variable.
+"""
+
+import os
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "2000"))
+
+# Modules only needed once a database is used, which are imported lazily...
+LAZY_MODULES = ("motor", "pymongo", "psycopg", "psycopg_pool", "asyncpg")
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """
+    Import a module in a fresh interpreter with `-X importtime`.
+
+    :param module: The module to import.
+    :type module: str
+    :return: The cumulative import time in microseconds of every module
+        imported, keyed by module name.
+    :rtype: dict[str, int]
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True)
+
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        import_times[name.strip()] = int(cumulative)
+    return import_times
+
+
+def test_app_import_time_budget() -> None:
+    """
+    Test that importing the application stays within the time budget and
+    does not import the database drivers.
+    """
+    import_times = _import_times("src.main")
+
+    assert not [name for name in LAZY_MODULES if name in import_times]
+    assert import_times["src.main"] / 1000 < IMPORT_TIME_BUDGET_MS
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Test suit for the InsertCoalescer utility of the FastAPI application.
+"""
+
+import asyncio
+
+import pytest
+
+from src.utils.insert_coalescer import InsertCoalescer
+
+
+def test_concurrent_rows_are_flushed_as_one_batch() -> None:
+    """
+    Test that rows submitted within the window share a single flush, and
+    that every caller gets its own result or its own exception.
+    """
+    batches = []
+
+    async def flush(rows: list[int]) -> list:
+        batches.append(rows)
+        return [ValueError(row) if row % 2 else row * 10 for row in rows]
+
+    async def run() -> list:
+        coalescer = InsertCoalescer(flush, window=0.01, max_batch_size=100)
+        return await asyncio.gather(
+            *(coalescer.submit(row) for row in range(6)),
+            return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert batches == [[0, 1, 2, 3, 4, 5]]
+    assert [result if isinstance(result, int) else type(result)
+            for result in results] == [0, ValueError, 20, ValueError, 40,
+                                       ValueError]
+
+
+def test_max_batch_size_flushes_without_waiting() -> None:
+    """
+    Test that a full batch is flushed before the window ends.
+    """
+    batches = []
+
+    async def flush(rows: list[int]) -> list:
+        batches.append(rows)
+        return rows
+
+    async def run() -> list:
+        coalescer = InsertCoalescer(flush, window=60, max_batch_size=2)
+        return await asyncio.wait_for(asyncio.gather(
+            *(coalescer.submit(row) for row in range(4))), timeout=1)
+
+    assert asyncio.run(run()) == [0, 1, 2, 3]
+    assert batches == [[0, 1], [2, 3]]
+
+
+def test_failed_flush_is_raised_to_every_caller() -> None:
+    """
+    Test that an error of the whole batch is raised to all its callers.
+    """
+    async def flush(rows: list[int]) -> list:
+        raise RuntimeError(f"Failed to write {len(rows)} rows")
+
+    async def run() -> None:
+        coalescer = InsertCoalescer(flush, window=0.01, max_batch_size=100)
+        await coalescer.submit(1)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
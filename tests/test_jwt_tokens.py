@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Test suit for the JWT encoding and verification of the FastAPI application.
+"""
+
+import pytest
+
+from src.utils.jwt_tokens import InvalidTokenError, decode_jwt, encode_jwt
+
+
+def test_encode_and_decode() -> None:
+    """
+    Test that a token round trips and is rejected once expired.
+    """
+    token = encode_jwt({"sub": "id", "exp": 1000}, "secret", "HS256")
+
+    assert decode_jwt(token, "secret", "HS256", now=999) == {
+        "sub": "id", "exp": 1000}
+    with pytest.raises(InvalidTokenError, match="Expired"):
+        decode_jwt(token, "secret", "HS256", now=1000)
+
+
+@pytest.mark.parametrize("secret, algorithm, message", [
+    ("another_secret", "HS256", "signature"),
+    ("secret", "HS512", "algorithm"),
+])
+def test_decode_rejects_foreign_tokens(secret, algorithm, message) -> None:
+    """
+    Test that tokens signed with another secret or algorithm are rejected.
+    """
+    token = encode_jwt({"exp": 1000}, secret, algorithm)
+
+    with pytest.raises(InvalidTokenError, match=message):
+        decode_jwt(token, "secret", "HS256", now=0)
+
+
+def test_decode_rejects_unsigned_and_malformed_tokens() -> None:
+    """
+    Test that unsigned and malformed tokens are rejected.
+    """
+    unsigned = encode_jwt({"exp": 1000}, "secret", "HS256").split(".")
+    unsigned[0] = "eyJhbGciOiJub25lIn0"  # {"alg":"none"}
+
+    for token in (".".join(unsigned[:2]) + ".", "not.a.token", "token"):
+        with pytest.raises(InvalidTokenError):
+            decode_jwt(token, "secret", "HS256", now=0)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Test suit for the logger configuration of the FastAPI application.
+"""
+
+import logging
+
+import orjson
+
+from src.core.env_config import get_settings
+from src.core.logger_config import SamplingFilter, init_logger, \
+    shutdown_logger
+
+settings = get_settings()
+
+
+def _record(name: str, level: int = logging.INFO) -> logging.LogRecord:
+    """
+    Make a log record of a logger.
+    """
+    return logging.LogRecord(name, level, __file__, 1, "message", None, None)
+
+
+def test_sampling_filter() -> None:
+    """
+    Test that the sampled loggers and their children keep one in every
+    `1 / rate` records below WARNING, and that other loggers keep all.
+    """
+    sampling_filter = SamplingFilter({"app.web_socket": 0.25, "app.off": 0})
+
+    kept = [sampling_filter.filter(_record("app.web_socket.send"))
+            for _ in range(8)]
+    assert kept == [True, False, False, False] * 2
+
+    assert not sampling_filter.filter(_record("app.off"))
+    assert sampling_filter.filter(_record("app.off", logging.WARNING))
+    assert all(sampling_filter.filter(_record("app")) for _ in range(4))
+
+
+def test_logger_writes_json_lines_through_the_queue(tmp_path,
+                                                    monkeypatch) -> None:
+    """
+    Test that the records are written to the log file by the queue
+    listener, as JSON lines when enabled.
+    """
+    monkeypatch.setattr(settings, "file_logger_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "file_logger_json", True)
+    monkeypatch.setattr(settings, "file_logger_level", "INFO")
+    try:
+        logger = init_logger(settings.app_logger_name)
+        logger.info("Hello %s", "queue")
+        shutdown_logger(settings.app_logger_name)
+
+        [log_file] = tmp_path.iterdir()
+        [entry] = [orjson.loads(line)
+                   for line in log_file.read_text().splitlines()]
+        assert entry["message"] == "Hello queue"
+        assert entry["level"] == "INFO"
+        assert entry["name"] == settings.app_logger_name
+    finally:
+        monkeypatch.undo()
+        init_logger(settings.app_logger_name)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Test suit for the request logging middleware of the FastAPI application.
+"""
+
+import logging
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.core.env_config import get_settings
+from src.middlewares.logger import LoggerMiddleware
+
+app = FastAPI()
+app.add_middleware(LoggerMiddleware)
+
+
+@app.get("/stream")
+async def stream() -> StreamingResponse:
+    """
+    A streamed response of three chunks.
+    """
+    async def chunks():
+        for chunk in (b"one\n", b"two\n", b"three\n"):
+            yield chunk
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+class ListHandler(logging.Handler):
+    """
+    A log handler keeping the formatted messages.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+def test_logger_middleware_logs_streamed_responses() -> None:
+    """
+    Test that a streamed response passes through the middleware whole and
+    is logged once with its method, path, status and size.
+    """
+    client = TestClient(app)
+    logger = logging.getLogger(get_settings().app_logger_name)
+    handler = ListHandler()
+    level = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    try:
+        response = client.get("/stream")
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(level)
+
+    assert response.status_code == 200
+    assert response.text == "one\ntwo\nthree\n"
+
+    [message] = [m for m in handler.messages if "/stream" in m]
+    method, path, status_code, duration, size = message.split()
+    assert (method, path, status_code, size) == ("GET", "/stream", "200",
+                                                 "14B")
+    assert duration.endswith("ms")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Test suit for the connection pool metrics of the FastAPI application.
+"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core import auth
+from src.main import app
+from src.utils.pool_metrics import InstrumentedAsyncAdaptedQueuePool, \
+    LatencyHistogram
+
+client = TestClient(app)
+
+
+def test_latency_histogram_is_cumulative() -> None:
+    """
+    Test that the histogram buckets count the observations up to their
+    bound.
+    """
+    histogram = LatencyHistogram(buckets=(0.01, 0.1))
+    for seconds in (0.005, 0.05, 0.05, 1.0):
+        histogram.observe(seconds)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"0.01": 1, "0.1": 3, "+Inf": 4}
+    assert snapshot["count"] == 4
+    assert snapshot["max"] == 1.0
+
+
+def test_pool_metrics_follow_checkouts_and_recycles() -> None:
+    """
+    Test that checkouts, open connections and reconnects are measured and
+    that the metrics survive the disposal of the engine.
+    """
+    async def run() -> tuple[dict, dict]:
+        engine = create_async_engine(
+            "sqlite+aiosqlite:///src/db/test_data_storage.db",
+            poolclass=InstrumentedAsyncAdaptedQueuePool, pool_size=2)
+        engine.pool.metrics.listen(engine.pool)
+
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            checked_out = engine.pool.metrics.snapshot(engine.pool)
+            await connection.invalidate()
+
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+        await engine.dispose()
+        snapshot = engine.pool.metrics.snapshot(engine.pool)
+        return checked_out, snapshot
+
+    checked_out, snapshot = asyncio.run(run())
+
+    assert checked_out["checked_out"] == 1
+    assert checked_out["connection_age"]["count"] == 1
+    assert snapshot["checkout_latency"]["count"] == 2
+    assert snapshot["recycles"] == 1
+    assert snapshot["connection_age"]["count"] == 0
+    assert snapshot["waiters"] == 0
+
+
+def test_pool_metrics_route(monkeypatch) -> None:
+    """
+    Test the pool metrics endpoint, without pools opened by the lifespan,
+    which requires the admin key.
+    """
+    monkeypatch.setattr(auth.settings, "auth_admin_api_key", "admin_key")
+    assert client.get("/api/utils/metrics/pools").status_code == 403
+
+    response = client.get("/api/utils/metrics/pools",
+                          headers={"x-admin-key": "admin_key"})
+    assert response.status_code == 200
+    assert response.json() == {"pools": {}}
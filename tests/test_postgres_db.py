@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Test suit for the pool sizing and read replica routing of the Postgres
+session manager.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.testclient import TestClient
+
+from src.core.env_config import Settings
+from src.db.connectors import postgres_db
+from src.db.connectors.postgres_db import WRITE_TIME_COOKIE, \
+    get_pg_read_session_factory, get_pool_limits, mark_client_write, \
+    session_manager, settings
+from src.middlewares.read_your_writes import ReadYourWritesMiddleware
+
+
+def _replica(checked_out: int) -> tuple:
+    """
+    Make a fake replica engine and session maker pair.
+    """
+    engine = SimpleNamespace(
+        pool=SimpleNamespace(checkedout=lambda: checked_out))
+    return engine, object()
+
+
+def _request(api_key: str, cookie: str = "") -> Request:
+    """
+    Make a request sent with an API key, and a cookie header if given.
+    """
+    headers = [(b"x-api-key", api_key.encode())]
+    if cookie:
+        headers.append((b"cookie", cookie.encode()))
+    return Request({"type": "http", "query_string": b"", "headers": headers,
+                    "client": ("127.0.0.1", 1234)})
+
+
+def test_replica_selection(monkeypatch) -> None:
+    """
+    Test that reads go round-robin over idle replicas and avoid the busy
+    ones.
+    """
+    idle_a, idle_b, busy = _replica(0), _replica(0), _replica(5)
+    monkeypatch.setattr(session_manager, "pgsql_db_engine", object())
+    monkeypatch.setattr(session_manager, "read_replicas",
+                        [idle_a, idle_b, busy])
+
+    selected = {session_manager.get_read_session_maker() for _ in range(6)}
+    assert selected == {idle_a[1], idle_b[1]}
+
+
+def test_read_your_writes(monkeypatch) -> None:
+    """
+    Test that a client reads from the primary after its own write, while
+    other clients keep reading from the replicas.
+    """
+    replica = _replica(0)
+    monkeypatch.setattr(session_manager, "pgsql_db_engine", object())
+    monkeypatch.setattr(session_manager, "session_maker", object())
+    monkeypatch.setattr(session_manager, "read_replicas", [replica])
+    postgres_db.recent_writers.clear()
+
+    assert get_pg_read_session_factory(_request("writer")) is replica[1]
+
+    mark_client_write(_request("writer"))
+
+    assert get_pg_read_session_factory(_request("writer")) is \
+        session_manager.session_maker
+    assert get_pg_read_session_factory(_request("reader")) is replica[1]
+
+
+def test_read_your_writes_across_workers(monkeypatch) -> None:
+    """
+    Test that a write handled by one worker sends the client a cookie with
+    which another worker reads from the primary, until the window ends.
+    """
+    replica = _replica(0)
+    monkeypatch.setattr(session_manager, "pgsql_db_engine", object())
+    monkeypatch.setattr(session_manager, "session_maker", object())
+    monkeypatch.setattr(session_manager, "read_replicas", [replica])
+
+    async def write(scope, receive, send):
+        mark_client_write(Request(scope))
+        await PlainTextResponse("written")(scope, receive, send)
+
+    response = TestClient(ReadYourWritesMiddleware(write)).post("/")
+    cookie = f"{WRITE_TIME_COOKIE}={response.cookies[WRITE_TIME_COOKIE]}"
+
+    # The other worker does not know the writer...
+    postgres_db.recent_writers.clear()
+
+    assert get_pg_read_session_factory(_request("writer", cookie)) is \
+        session_manager.session_maker
+    assert get_pg_read_session_factory(_request("writer")) is replica[1]
+
+    monkeypatch.setattr(settings, "pg_db_read_your_writes_window", 0.0)
+    assert get_pg_read_session_factory(_request("writer", cookie)) is \
+        replica[1]
+    assert get_pg_read_session_factory(
+        _request("writer", f"{WRITE_TIME_COOKIE}=4102444800")) is replica[1]
+
+
+def test_pool_limits_fit_the_connections_budget(monkeypatch) -> None:
+    """
+    Test that the pools of all the workers fit in the connections budget.
+    """
+    monkeypatch.setattr(settings, "pg_db_connection_pool_size", 100)
+    monkeypatch.setattr(settings, "pg_db_max_overflow", 20)
+    monkeypatch.setattr(settings, "pg_db_max_connections", 90)
+
+    monkeypatch.setattr(settings, "app_workers", 1)
+    assert get_pool_limits() == (90, 0)
+
+    monkeypatch.setattr(settings, "app_workers", 4)
+    assert get_pool_limits() == (22, 0)
+
+    monkeypatch.setattr(settings, "pg_db_connection_pool_size", 10)
+    assert get_pool_limits() == (10, 12)
+
+
+def test_warm_up_survives_unreachable_database(monkeypatch) -> None:
+    """
+    Test that pre-warming a pool whose database is unreachable does not
+    raise, and returns the connections that were opened.
+    """
+    closed = []
+
+    class FakeConnection:
+        """
+        A connection that can be opened once.
+        """
+
+        def __init__(self, reachable: bool):
+            self.reachable = reachable
+
+        async def start(self):
+            """
+            Open the connection, or fail like an unreachable database.
+            """
+            if not self.reachable:
+                raise ConnectionRefusedError("Connection refused")
+            return self
+
+        async def close(self):
+            """
+            Return the connection to the pool.
+            """
+            closed.append(self)
+
+    primary = SimpleNamespace(connect=lambda: FakeConnection(True))
+    replica = SimpleNamespace(connect=lambda: FakeConnection(False))
+    monkeypatch.setattr(session_manager, "pgsql_db_engine", primary)
+    monkeypatch.setattr(session_manager, "read_replicas",
+                        [(replica, object())])
+    monkeypatch.setattr(settings, "pg_db_pool_min_size", 2)
+
+    asyncio.run(session_manager.warm_up())
+    assert len(closed) == 2
+
+
+def test_workers_follow_web_concurrency(monkeypatch) -> None:
+    """
+    Test that the workers splitting the connections budget are read from
+    WEB_CONCURRENCY, the workers of the uvicorn command line, first.
+    """
+    monkeypatch.setenv("APP_WORKERS", "2")
+    assert Settings().app_workers == 2
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "8")
+    assert Settings().app_workers == 8
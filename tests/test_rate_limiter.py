@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Test suit for the rate limiting of the FastAPI application.
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.core import auth, rate_limit
+from src.db.models.v1_models.rate_limit_buckets_model import \
+    RateLimitBucketModel
+from src.main import app
+from src.utils.rate_limiter import InMemoryRateLimitBackend, \
+    RateLimitBackend, SqlRateLimitBackend
+from src.utils.ttl_cache import TTLCache
+
+client = TestClient(app)
+
+
+class FakeClock:
+    """
+    A clock that only moves when told to.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _sql_backend(tmp_path, clock: FakeClock) -> SqlRateLimitBackend:
+    """
+    Create a SQL backend on a SQLite database, as a local stand-in for the
+    shared Postgres database.
+    """
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'buckets.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(RateLimitBucketModel.__table__.create)
+    session_maker = async_sessionmaker(engine)
+    return SqlRateLimitBackend(lambda: session_maker, clock=clock)
+
+
+@pytest.mark.parametrize("backend_name", ["memory", "sql"])
+def test_token_bucket(tmp_path, backend_name) -> None:
+    """
+    Test that a bucket allows a burst, then the refill rate, and tells how
+    long to wait when it is empty, with every backend.
+    """
+    clock = FakeClock()
+
+    async def run():
+        backend = InMemoryRateLimitBackend(max_size=10, clock=clock) \
+            if backend_name == "memory" else await _sql_backend(tmp_path,
+                                                                clock)
+        results = [await backend.acquire("a", rate=2, burst=3)
+                   for _ in range(4)]
+        results.append(await backend.acquire("b", rate=2, burst=3))
+        clock.now += 0.25
+        results.append(await backend.acquire("a", rate=2, burst=3))
+        clock.now += 0.25
+        results.append(await backend.acquire("a", rate=2, burst=3))
+        return results
+
+    assert asyncio.run(run()) == [0, 0, 0, 0.5, 0, 0.25, 0]
+
+
+def test_rate_limited_route_returns_retry_after(monkeypatch) -> None:
+    """
+    Test that a client over its limit gets a 429 with a Retry-After header.
+    """
+    monkeypatch.setattr(rate_limit, "probe_rate_limit_backend",
+                        InMemoryRateLimitBackend(max_size=10))
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_ip_rate", 0.1)
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_ip_burst", 1)
+
+    assert client.get("/api/utils/health_check").status_code == 200
+    response = client.get("/api/utils/health_check")
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "10"
+
+
+def test_failed_authentications_are_rate_limited(monkeypatch) -> None:
+    """
+    Test that failed authentications take tokens from the bucket of the
+    client IP, and that an address out of tokens is rejected before its API
+    key is looked up.
+    """
+    lookups = []
+
+    async def unknown_api_key(api_key, session_factory):
+        lookups.append(api_key)
+
+    monkeypatch.delitem(app.dependency_overrides, auth.get_api_key,
+                        raising=False)
+    monkeypatch.setattr(auth, "_authenticate", unknown_api_key)
+    monkeypatch.setattr(rate_limit, "rate_limit_backend",
+                        InMemoryRateLimitBackend(max_size=10))
+    monkeypatch.setattr(rate_limit, "blocked_addresses",
+                        TTLCache(max_size=10, ttl=0))
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_ip_rate", 0.1)
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_ip_burst", 2)
+
+    status_codes = [
+        client.get("/api/v1/users",
+                   headers={"x-api-key": f"guess_{index}"}).status_code
+        for index in range(4)]
+
+    assert status_codes == [401, 401, 429, 429]
+    assert len(lookups) == 3
+
+
+class UnreachableRateLimitBackend(RateLimitBackend):
+    """
+    A backend whose database is down.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        self.calls += 1
+        raise ConnectionRefusedError("Connection refused")
+
+
+def test_failing_backend_lets_requests_through(monkeypatch) -> None:
+    """
+    Test that the health probes never use the shared backend, and that the
+    other requests are let through while the shared backend fails.
+    """
+    backend = UnreachableRateLimitBackend()
+    monkeypatch.setattr(rate_limit, "rate_limit_backend", backend)
+
+    response = client.get("/api/utils/health_check")
+    assert response.status_code == 200
+    assert backend.calls == 0
+
+    async def unknown_api_key(api_key, session_factory):
+        return None
+
+    monkeypatch.delitem(app.dependency_overrides, auth.get_api_key,
+                        raising=False)
+    monkeypatch.setattr(auth, "_authenticate", unknown_api_key)
+    response = client.get("/api/v1/users", headers={"x-api-key": "unknown"})
+    assert response.status_code == 401
+    assert backend.calls == 1
+
+    asyncio.run(rate_limit.rate_limit_by_api_key(
+        auth.AuthenticatedApplication("an_application")))
+    assert backend.calls == 2
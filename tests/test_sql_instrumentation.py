@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Test suit for the SQL instrumentation of the FastAPI application.
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.utils import sql_instrumentation
+from src.utils.sql_instrumentation import start_request_sql_stats, \
+    statement_shape
+
+
+class ListHandler(logging.Handler):
+    """
+    A log handler keeping the formatted messages.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+def test_statement_shape() -> None:
+    """
+    Test that statements differing only in their IN lists share a shape.
+    """
+    assert statement_shape(
+        "SELECT id\n  FROM users WHERE id IN (?, ?, ?)") == \
+        statement_shape("SELECT id FROM users WHERE id IN (?)") == \
+        "SELECT id FROM users WHERE id IN (...)"
+
+
+def test_request_sql_stats_and_warnings(monkeypatch) -> None:
+    """
+    Test that the statements of a request are counted, and that slow and
+    repeated statements are logged.
+    """
+    monkeypatch.setattr(sql_instrumentation.settings,
+                        "pg_db_n_plus_one_threshold", 3)
+    monkeypatch.setattr(sql_instrumentation.settings,
+                        "pg_db_slow_query_threshold", 1e-9)
+    handler = ListHandler()
+    sql_instrumentation.logger.addHandler(handler)
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        sql_instrumentation.listen(engine)
+        stats = start_request_sql_stats()
+        async with engine.connect() as connection:
+            for user_id in range(3):
+                await connection.execute(
+                    text("SELECT :user_id AS id"), {"user_id": user_id})
+        await engine.dispose()
+        return stats
+
+    try:
+        stats = asyncio.run(run())
+    finally:
+        sql_instrumentation.logger.removeHandler(handler)
+
+    assert stats.statements == 3
+    assert stats.duration > 0
+    assert stats.shapes == {"SELECT ? AS id": 3}
+    assert stats.log_summary() == "sql=3 sql_rows=0"
+    assert [message for message in handler.messages
+            if message.startswith("Probable N+1 query")] == [
+        "Probable N+1 query, the same statement ran 3 times in one request: "
+        "SELECT ? AS id"]
+    assert len([message for message in handler.messages
+                if message.startswith("Slow query")]) == 3
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Test suit for the tracing of the FastAPI application.
+"""
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core import auth
+from src.main import app
+from src.utils import tracing
+from src.utils.tracing import SpanExporter, span, start_span, trace
+
+client = TestClient(app)
+
+
+@pytest.fixture(name="exporter")
+def fixture_exporter(monkeypatch, tmp_path) -> SpanExporter:
+    """
+    Sample every trace and export the spans to a temporary file.
+    """
+    exporter = SpanExporter(buffer_size=10,
+                            file_path=str(tmp_path / "traces.jsonl"))
+    monkeypatch.setattr(tracing, "exporter", exporter)
+    monkeypatch.setattr(tracing.settings, "tracing_sample_rate", 1.0)
+    yield exporter
+    exporter.close()
+
+
+def test_unsampled_traces_record_nothing(exporter, monkeypatch) -> None:
+    """
+    Test that nothing is recorded outside of a sampled trace.
+    """
+    monkeypatch.setattr(tracing.settings, "tracing_sample_rate", 0.0)
+    with trace("request") as root:
+        with span("child") as child:
+            assert start_span("leaf") is None
+
+    assert root is None and child is None
+    assert not exporter.spans
+
+
+def test_spans_are_nested_and_exported(exporter) -> None:
+    """
+    Test that the spans of a trace share its id and point to their parent,
+    that errors are recorded, and that the spans are written to the file.
+    """
+    with trace("request", path="/") as root:
+        with pytest.raises(ValueError):
+            with span("child"):
+                raise ValueError
+        leaf = start_span("leaf", rows=1)
+        leaf.end()
+
+    spans = exporter.recent(trace_id=root.trace_id)
+    assert [(s["name"], s["parent_id"], s["error"]) for s in spans] == [
+        ("request", None, None),
+        ("leaf", root.span_id, None),
+        ("child", root.span_id, "ValueError")]
+    assert spans[0]["attributes"] == {"path": "/"}
+    assert exporter.recent(limit=1) == spans[:1]
+
+    exporter.close()
+    with open(exporter.file_path, "rb") as trace_file:
+        assert [orjson.loads(line) for line in trace_file] == spans[::-1]
+
+
+def test_traces_route(exporter, monkeypatch) -> None:
+    """
+    Test that a request is traced, and that its spans are served by the
+    traces endpoint, which requires the admin key.
+    """
+    monkeypatch.setattr(auth.settings, "auth_admin_api_key", "admin_key")
+    client.get("/api/utils/health_check")
+    assert client.get("/api/utils/traces/").status_code == 403
+    response = client.get("/api/utils/traces/", params={"limit": 5},
+                          headers={"x-admin-key": "admin_key"})
+
+    assert response.status_code == 200
+    root = next(s for s in exporter.spans if s.parent_id is None)
+    assert (root.name, root.attributes) == ("http.request", {
+        "method": "GET", "path": "/api/utils/health_check",
+        "status_code": 200})
+    spans = response.json()["spans"]
+    assert {s["trace_id"] for s in spans} >= {root.trace_id}
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Test suit for the TTLCache utility of the FastAPI application.
+"""
+
+from src.utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    """
+    A manually advanced clock for the cache expiry.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_hit_miss_and_expiry() -> None:
+    """
+    Test that entries are served until their TTL has passed.
+    """
+    clock = FakeClock()
+    cache = TTLCache(max_size=10, ttl=5, clock=clock)
+
+    assert cache.get("key") is None
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+
+    clock.now = 5
+    assert cache.get("key") is None
+    assert cache.stats() == {"size": 0, "max_size": 10, "ttl": 5, "hits": 1,
+                             "misses": 2, "evictions": 1}
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    """
+    Test that the least recently used entry is evicted when full.
+    """
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_cache_invalidate() -> None:
+    """
+    Test that an invalidated entry is no longer served.
+    """
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_skips_values_read_before_an_invalidation() -> None:
+    """
+    Test that a value read before an invalidation is not cached.
+    """
+    cache = TTLCache(max_size=2, ttl=60)
+    generation = cache.generation
+    cache.invalidate("a")
+    cache.set("a", "stale", generation=generation)
+    assert cache.get("a") is None
+
+    cache.set("a", "fresh", generation=cache.generation)
+    assert cache.get("a") == "fresh"
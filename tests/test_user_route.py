@@ -6,39 +6,52 @@
 Test suit for the User routes in the FastAPI application.
 """
 
-import os
+import asyncio
 
+import orjson
+import pytest
 from fastapi.testclient import TestClient
 
-from src.db.config.base import Base
-from src.db.connectors.postgres_db import get_pg_db
-from src.db.connectors.sqlite_db import SQLiteConnector
+from src.api.v1_routes import user_routes
+from src.api.v1_routes.user_routes import settings, user_cache
+from src.db.schemas.v1_schemas.user_schemas import UserCreate
 from src.main import app
+from src.utils import tracing
 
-# Ensure the directory exists
-os.makedirs(os.path.dirname("src/db/test_data_storage.db"), exist_ok=True)
+pytestmark = pytest.mark.usefixtures("database")
 
-# Initialize SQLiteConnector
-TEST_DB_URL = "sqlite:///src/db/test_data_storage.db"
-sqlite_connector = SQLiteConnector(TEST_DB_URL)
-
-# Override the get_pg_db dependency
-app.dependency_overrides[get_pg_db] = sqlite_connector.get_sqlite_db
 client = TestClient(app)
 
 
-def setup():
+def _user_payload(index: int) -> dict:
     """
-    Creates all the database tables.
+    Returns a valid payload for creating a User.
     """
-    Base.metadata.create_all(sqlite_connector.sqlite_engine)
+    return {
+        "username": f"user_{index}",
+        "email": f"user_{index}@example.com",
+        "password": "a_password",
+        "first_name": "First",
+        "last_name": "Last",
+        "phone_number": "0123456789",
+        "address": "Street 1",
+        "city": "City",
+        "state": "State",
+        "country": "Country",
+        "zip_code": "12345",
+    }
 
 
-def teardown():
+def _create_users(*indexes: int) -> list[dict]:
     """
-    Drop all the database tables.
+    Creates a User for each index, returning the created Users.
     """
-    Base.metadata.drop_all(sqlite_connector.sqlite_engine)
+    users = []
+    for index in indexes:
+        response = client.post("/api/v1/users", json=_user_payload(index))
+        assert response.status_code == 201
+        users.append(response.json())
+    return users
 
 
 def test_users_options_route():
@@ -57,4 +70,348 @@ def test_read_users():
     """
     response = client.get("/api/v1/users")
     assert response.status_code == 200
-    assert response.json() == []
+    assert response.json() == {"data": [], "next": None}
+
+
+def test_read_users_server_timing(monkeypatch):
+    """
+    Test that the phase timings of a request are sent in the Server-Timing
+    header when enabled, and only then.
+    """
+    assert "server-timing" not in client.get("/api/v1/users").headers
+
+    monkeypatch.setattr(settings, "api_server_timing", True)
+    response = client.get("/api/v1/users")
+    assert response.status_code == 200
+
+    phases = [metric.split(";")[0]
+              for metric in response.headers["server-timing"].split(", ")]
+    assert {"db", "serialize", "total"} <= set(phases)
+    assert phases[-1] == "total"
+
+
+def test_read_users_trace(monkeypatch):
+    """
+    Test that the SQL statements of a sampled request are recorded as spans
+    of its trace.
+    """
+    monkeypatch.setattr(tracing.settings, "tracing_sample_rate", 1.0)
+    monkeypatch.setattr(tracing, "exporter", tracing.SpanExporter(
+        buffer_size=100, file_path=None))
+    assert client.get("/api/v1/users").status_code == 200
+
+    spans = tracing.exporter.recent()
+    root = spans[0]
+    assert root["name"] == "http.request"
+    assert {"sql", "serialize"} <= {
+        s["name"] for s in spans if s["parent_id"] == root["span_id"]}
+
+
+def test_read_users_keyset_pagination():
+    """
+    Test paging through the /users route with the `next` cursor.
+    """
+    created_ids = [user["id"] for user in _create_users(*range(5))]
+
+    seen_ids = []
+    response = client.get("/api/v1/users", params={"limit": 2})
+    while True:
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["data"]) <= 2
+        seen_ids.extend(user["id"] for user in page["data"])
+        if page["next"] is None:
+            break
+        response = client.get(
+            "/api/v1/users", params={"limit": 2, "after": page["next"]})
+
+    assert seen_ids == sorted(created_ids)
+
+
+def test_read_users_invalid_cursor():
+    """
+    Test that a malformed cursor is rejected with a 400 response.
+    """
+    response = client.get("/api/v1/users", params={"after": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_export_users_ndjson():
+    """
+    Test the streaming NDJSON export of the /users route.
+    """
+    _create_users(*range(5))
+    response = client.get("/api/v1/users/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = response.content.splitlines()
+    users = [orjson.loads(line) for line in lines]
+    assert len(users) == 5
+    assert [user["id"] for user in users] == sorted(
+        user["id"] for user in users)
+
+
+def test_create_users_bulk():
+    """
+    Test the bulk creation of Users with per-row results.
+    """
+    _create_users(0)
+    rows = [_user_payload(100), _user_payload(0), {"username": "invalid"}]
+    response = client.post("/api/v1/users/bulk", json=rows)
+    assert response.status_code == 207
+
+    body = response.json()
+    assert body["created"] == 1
+    assert [result["status"] for result in body["results"]] == [
+        "created", "conflict", "invalid"]
+
+    ndjson_body = b"\n".join(orjson.dumps(_user_payload(index))
+                             for index in (101, 102))
+    response = client.post(
+        "/api/v1/users/bulk", content=ndjson_body,
+        headers={"content-type": "application/x-ndjson"})
+    assert response.status_code == 201
+    assert response.json()["created"] == 2
+
+    response = client.post("/api/v1/users/bulk",
+                           json=[{**_user_payload(103), "id": None}])
+    assert response.status_code == 201
+    assert response.json()["results"][0]["id"] is not None
+
+
+def test_create_users_ignore_client_timestamps():
+    """
+    Test that the timestamps of created Users are set by the server.
+    """
+    timestamps = {"created_at": "2000-01-01T00:00:00",
+                  "updated_at": "2000-01-01T00:00:00",
+                  "deleted_at": "2000-01-01T00:00:00"}
+    response = client.post("/api/v1/users",
+                           json={**_user_payload(200), **timestamps})
+    assert response.status_code == 201
+    users = [response.json()]
+
+    response = client.post("/api/v1/users/bulk",
+                           json=[{**_user_payload(201), **timestamps}])
+    assert response.status_code == 201
+    response = client.get(
+        f"/api/v1/users/{response.json()['results'][0]['id']}")
+    assert response.status_code == 200
+    users.append(response.json())
+
+    for user in users:
+        assert not user["created_at"].startswith("2000")
+        assert user["updated_at"] == user["created_at"]
+        assert user["deleted_at"] is None
+
+
+def test_read_users_sparse_fieldset():
+    """
+    Test that a sparse fieldset limits the returned User fields.
+    """
+    _create_users(*range(3))
+    response = client.get(
+        "/api/v1/users", params={"fields": "username,email", "limit": 2})
+    assert response.status_code == 200
+
+    page = response.json()
+    assert page["next"] is not None
+    assert all(set(user) == {"username", "email"} for user in page["data"])
+
+    response = client.get("/api/v1/users", params={"fields": "id,unknown"})
+    assert response.status_code == 400
+
+
+def test_read_users_match_user_output():
+    """
+    Test that listed Users match the UserOutput of their creation.
+    """
+    response = client.post("/api/v1/users", json=_user_payload(200))
+    assert response.status_code == 201
+    created_user = response.json()
+
+    response = client.get("/api/v1/users", params={"limit": 500})
+    assert response.status_code == 200
+    assert created_user in response.json()["data"]
+
+
+def test_get_update_and_delete_user():
+    """
+    Test the GET, PATCH and DELETE endpoints of the /users/{id} route.
+    """
+    _create_users(0)
+    response = client.post("/api/v1/users", json=_user_payload(300))
+    assert response.status_code == 201
+    user = response.json()
+
+    response = client.get(f"/api/v1/users/{user['id']}")
+    assert response.status_code == 200
+    assert response.json() == user
+
+    response = client.patch(f"/api/v1/users/{user['id']}",
+                            json={"first_name": "Updated"})
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Updated"
+    assert response.json()["username"] == user["username"]
+
+    response = client.patch(f"/api/v1/users/{user['id']}",
+                            json={"username": "user_0"})
+    assert response.status_code == 409
+
+    response = client.patch(f"/api/v1/users/{user['id']}",
+                            json={"username": None, "email": None})
+    assert response.status_code == 400
+    response = client.patch(f"/api/v1/users/{user['id']}",
+                            json={"deleted_at": "2024-01-01T00:00:00"})
+    assert response.status_code == 400
+    response = client.get(f"/api/v1/users/{user['id']}")
+    assert response.status_code == 200
+    assert response.json()["email"] == user["email"]
+
+    response = client.delete(f"/api/v1/users/{user['id']}")
+    assert response.status_code == 204
+
+    response = client.get(f"/api/v1/users/{user['id']}")
+    assert response.status_code == 404
+    response = client.delete(f"/api/v1/users/{user['id']}")
+    assert response.status_code == 404
+
+
+def test_user_cache_read_through_and_invalidation():
+    """
+    Test that User reads are cached and that writes invalidate the cache.
+    """
+    response = client.post("/api/v1/users", json=_user_payload(400))
+    assert response.status_code == 201
+    user = response.json()
+
+    response = client.get("/api/v1/users/lookup",
+                          params={"username": user["username"]})
+    assert response.status_code == 200
+    assert response.json() == user
+
+    hits = user_cache.hits
+    response = client.get(f"/api/v1/users/{user['id']}")
+    assert response.json() == user
+    response = client.get("/api/v1/users/lookup",
+                          params={"email": user["email"]})
+    assert response.json() == user
+    assert user_cache.hits == hits + 2
+
+    response = client.patch(f"/api/v1/users/{user['id']}",
+                            json={"username": "user_400_renamed"})
+    assert response.status_code == 200
+
+    response = client.get("/api/v1/users/lookup",
+                          params={"username": user["username"]})
+    assert response.status_code == 404
+    response = client.get(f"/api/v1/users/{user['id']}")
+    assert response.json()["username"] == "user_400_renamed"
+
+
+def test_user_cache_is_not_filled_from_replicas(monkeypatch):
+    """
+    Test that Users read from a read replica, which may lag behind the
+    primary database, are not cached.
+    """
+    response = client.post("/api/v1/users", json=_user_payload(410))
+    user = response.json()
+
+    monkeypatch.setattr(user_routes, "is_primary_session",
+                        lambda session: False)
+    response = client.get(f"/api/v1/users/{user['id']}")
+    assert response.json() == user
+    response = client.post("/api/v1/users/batch", json={"ids": [user["id"]]})
+    assert response.json()["data"] == [user]
+    assert user_cache.get(user["id"]) is None
+
+
+def test_batch_lookup_users():
+    """
+    Test looking up a batch of Users by id, in request order with misses.
+    """
+    created_ids = [user["id"] for user in _create_users(500, 501)]
+
+    requested_ids = [created_ids[1], "missing_id", created_ids[0]]
+    response = client.get("/api/v1/users",
+                          params={"ids": ",".join(requested_ids),
+                                  "fields": "id,username"})
+    assert response.status_code == 200
+    assert response.json() == {
+        "data": [{"id": created_ids[1], "username": "user_501"}, None,
+                 {"id": created_ids[0], "username": "user_500"}],
+        "missing": ["missing_id"],
+    }
+
+    response = client.post("/api/v1/users/batch",
+                           json={"ids": requested_ids})
+    assert response.status_code == 200
+    assert [user and user["id"] for user in response.json()["data"]] == [
+        created_ids[1], None, created_ids[0]]
+
+
+def test_conditional_get_user():
+    """
+    Test that unchanged Users are answered with 304 Not Modified.
+    """
+    response = client.post("/api/v1/users", json=_user_payload(600))
+    user_id = response.json()["id"]
+
+    response = client.get(f"/api/v1/users/{user_id}")
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    response = client.get(f"/api/v1/users/{user_id}",
+                          headers={"if-none-match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    response = client.get(f"/api/v1/users/{user_id}",
+                          headers={"if-modified-since": last_modified})
+    assert response.status_code == 304
+
+    client.patch(f"/api/v1/users/{user_id}", json={"city": "Other"})
+    response = client.get(f"/api/v1/users/{user_id}",
+                          headers={"if-none-match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_conditional_get_users_page():
+    """
+    Test that unchanged pages of Users are answered with 304 Not Modified.
+    """
+    response = client.get("/api/v1/users", params={"limit": 3})
+    etag = response.headers["etag"]
+
+    response = client.get("/api/v1/users", params={"limit": 3},
+                          headers={"if-none-match": etag})
+    assert response.status_code == 304
+
+
+def test_create_user_with_insert_coalescing(monkeypatch, database):
+    """
+    Test creating Users through the insert coalescer.
+    """
+    monkeypatch.setattr(settings, "pg_db_insert_coalescing", True)
+
+    response = client.post("/api/v1/users", json=_user_payload(700))
+    assert response.status_code == 201
+    user = response.json()
+    assert client.get(f"/api/v1/users/{user['id']}").json() == user
+
+    response = client.post("/api/v1/users", json=_user_payload(700))
+    assert response.status_code == 409
+
+    coalescer = app.state.user_insert_coalescer
+    pending = coalescer.submit(UserCreate(**_user_payload(701)).model_dump())
+
+    async def shutdown():
+        task = asyncio.ensure_future(pending)
+        await asyncio.sleep(0)
+        await user_routes.close_user_insert_coalescer(app)
+        await database.sqlite_engine.dispose()
+        return task.result()
+
+    coalescer.window = 60
+    assert asyncio.run(shutdown())["username"] == "user_701"
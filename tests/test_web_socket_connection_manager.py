@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Test suit for the queued sends of the WebSocket connection manager.
+"""
+
+import asyncio
+
+from src.utils.web_socket_connection_manager import \
+    WebSocketConnectionManager
+
+
+class FakeWebSocket:
+    """
+    A WebSocket recording the messages sent to it, which can be made slow
+    or broken.
+    """
+
+    def __init__(self, delay: float = 0.0, broken: bool = False):
+        self.delay = delay
+        self.broken = broken
+        self.sent = []
+        self.close_code = None
+
+    async def accept(self) -> None:
+        """
+        Accept the connection.
+        """
+
+    async def send_text(self, message: str) -> None:
+        """
+        Record a message, after the delay of the socket.
+        """
+        if self.broken:
+            raise RuntimeError("Connection reset")
+        await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+    async def close(self, code: int) -> None:
+        """
+        Record the close code.
+        """
+        self.close_code = code
+
+
+async def _settle() -> None:
+    """
+    Let the writer tasks run.
+    """
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_slow_client_does_not_block_broadcast():
+    """
+    A broadcast returns without waiting for a slow client, and the other
+    clients get the message.
+    """
+    async def run():
+        manager = WebSocketConnectionManager(queue_size=10, send_timeout=5)
+        slow, fast = FakeWebSocket(delay=1.0), FakeWebSocket()
+        await manager.connect(slow)
+        await manager.connect(fast)
+
+        await asyncio.wait_for(manager.broadcast("hello"), 0.1)
+        await _settle()
+        assert fast.sent == ["hello"]
+        assert not slow.sent
+        manager.disconnect(slow)
+        manager.disconnect(fast)
+
+    asyncio.run(run())
+
+
+def test_drop_oldest_keeps_latest_messages():
+    """
+    With the `drop_oldest` policy, a full queue drops its oldest message.
+    """
+    async def run():
+        manager = WebSocketConnectionManager(
+            queue_size=2, slow_consumer_policy="drop_oldest")
+        websocket = FakeWebSocket(delay=0.01)
+        await manager.connect(websocket)
+
+        await manager.broadcast("1")
+        await _settle()  # "1" is being sent, the queue is empty...
+        for message in ("2", "3", "4"):
+            await manager.broadcast(message)
+        await asyncio.sleep(0.1)
+
+        assert websocket.sent == ["1", "3", "4"]
+        assert manager.dropped_messages == 1
+        manager.disconnect(websocket)
+
+    asyncio.run(run())
+
+
+def test_drop_newest_keeps_queued_messages():
+    """
+    With the `drop_newest` policy, a full queue drops the new message.
+    """
+    async def run():
+        manager = WebSocketConnectionManager(
+            queue_size=2, slow_consumer_policy="drop_newest")
+        websocket = FakeWebSocket(delay=0.01)
+        await manager.connect(websocket)
+
+        await manager.broadcast("1")
+        await _settle()
+        for message in ("2", "3", "4"):
+            await manager.broadcast(message)
+        await asyncio.sleep(0.1)
+
+        assert websocket.sent == ["1", "2", "3"]
+        assert manager.dropped_messages == 1
+        manager.disconnect(websocket)
+
+    asyncio.run(run())
+
+
+def test_disconnect_policy_evicts_slow_client():
+    """
+    With the `disconnect` policy, a client with a full queue is evicted
+    and closed with 1013 Try Again Later.
+    """
+    async def run():
+        manager = WebSocketConnectionManager(
+            queue_size=1, slow_consumer_policy="disconnect")
+        websocket = FakeWebSocket(delay=1.0)
+        await manager.connect(websocket)
+
+        for message in ("1", "2", "3"):
+            await manager.broadcast(message)
+        await _settle()
+
+        assert websocket not in manager.active_connections
+        assert websocket.close_code == 1013
+        assert manager.evicted_connections == 1
+        manager.disconnect(websocket)
+
+    asyncio.run(run())
+
+
+def test_broken_client_is_evicted():
+    """
+    A client whose send fails is evicted without affecting the others.
+    """
+    async def run():
+        manager = WebSocketConnectionManager()
+        broken, healthy = FakeWebSocket(broken=True), FakeWebSocket()
+        await manager.connect(broken)
+        await manager.connect(healthy)
+
+        await manager.broadcast("hello")
+        await _settle()
+        await manager.broadcast("again")
+        await _settle()
+
+        assert list(manager.active_connections) == [healthy]
+        assert broken.close_code == 1011
+        assert healthy.sent == ["hello", "again"]
+        manager.disconnect(healthy)
+
+    asyncio.run(run())